@@ -1,13 +1,22 @@
 # Main.py + Azure Insights
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, PlainTextResponse, Response
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import os
 import logging
 import uvicorn
 import sys
 from pathlib import Path
 import threading
+import asyncio
+import json
+import tempfile
+import math
+import time
+import hmac
 
 # Configuration des logs - Azure a besoin d'INFO
 logging.basicConfig(level=logging.INFO)
@@ -20,22 +29,83 @@ logging.getLogger("uvicorn.access").addFilter(
 )
 logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
+# Encodeur JSON rapide pour les réponses produites par le serveur (repli sur json si absent)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Charger les variables d'environnement
 from dotenv import load_dotenv
 load_dotenv('/app/.env')
 
 # Import des services (GARDER LES ORIGINAUX)
-from services.dagshub_service import DagsHubService
+from services.dagshub_service import DagsHubService, ensure_numpy_export
 from services.dash_ui_service import DashUIService
 from services.azure_insights_service import AzureInsightsService
+from services.batching_service import MicroBatchScheduler
+from services.request_coalescing import RequestCoalescer
+from services.inference_executor import InferenceExecutor
+from services.admission_control import AdmissionController, OverloadedError
+from services.prefork_server import PreforkServer, get_process_info, mark_worker_ready
+from services.threading_config import get_threading_config
+from services.stage_timing import start_timer
+from services.job_service import JobService
+from services.file_scoring import FileScoringService, detect_format
+from services.model_registry import ModelRegistry, ModelNotAllowedError, ModelLoadError
+from services.model_swap import ModelSwapper, ReloadInProgressError, RollbackUnavailableError
+from services.msgpack_protocol import MsgPackRoute, MsgPackResponse, wants_msgpack
+from services.metrics import REGISTRY, METRICS_ENABLED, MetricsMiddleware, set_model_run_id
 
 # Variables pour éviter la duplication
 _startup_displayed = False
 
+# Taille maximale d'un lot pour /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Scoring en flux NDJSON : taille des paquets envoyés au modèle et taille maximale d'une ligne
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# Micro-batching des requêtes /predict concurrentes (BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+MICRO_BATCHING_ENABLED = os.getenv("MICRO_BATCHING_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Contrôle d'admission : 429 quand l'attente estimée dépasse ADMISSION_LATENCY_BUDGET_MS
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Requêtes /predict identiques en cours regroupées en un seul calcul (single-flight)
+REQUEST_COALESCING_ENABLED = os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Jobs de scoring asynchrones persistés dans SQLite (JOBS_DB_PATH, JOB_CHUNK_SIZE)
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Scoring de fichiers CSV/Parquet : répertoire autorisé pour les chemins locaux (désactivé si vide)
+FILE_SCORING_DIR = os.getenv("FILE_SCORING_DIR", "")
+
+# Runs MLflow supplémentaires sélectionnables par requête (MODEL_RUN_IDS, MODEL_MEMORY_BUDGET_MB)
+MODEL_REGISTRY_ENABLED = os.getenv("MODEL_REGISTRY_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Nombre de workers : au-delà de 1, le modèle est préchargé puis partagé par fork (API_WORKERS)
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# Jeton exigé (en-tête X-Admin-Token) par le rechargement et le retour arrière du modèle (désactivés si vide)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Interface Dash lancée par l'API (désactivée dans les workers pré-fork : processus dédié)
+DASH_UI_ENABLED = os.getenv("DASH_UI_ENABLED", "true").lower() in ["true", "1", "yes"]
+
 # Services globaux - IMPORTANT : azure_insights_service DOIT être global
 dagshub_service = None
 dash_ui_service = None
 azure_insights_service = None
+batch_scheduler = None
+request_coalescer = None
+admission_controller = None
+inference_executor = None
+job_service = None
+file_scoring_service = None
+model_registry = None
+model_swapper = None
 
 def display_simple_startup_info():
     """Affichage simplifiÃ© pour Ã©viter la duplication"""
@@ -102,10 +172,17 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Corps MessagePack (Content-Type: application/msgpack) acceptés comme du JSON par les routes déclarées ensuite
+app.router.route_class = MsgPackRoute
+
+# Durée des requêtes par endpoint pour /metrics (middleware ASGI : flux de réponse non tamponnés)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialisation au démarrage avec Azure Insights"""
-    global dagshub_service, dash_ui_service, azure_insights_service
+    global dagshub_service, dash_ui_service, azure_insights_service, batch_scheduler, request_coalescer, admission_controller, inference_executor, job_service, file_scoring_service, model_registry, model_swapper
     
     try:
         # Affichage des informations (non dupliqué)
@@ -137,14 +214,20 @@ async def startup_event():
             print("[!] Azure Insights non configuré (mode dégradé)")
         
         # 2. Service DagsHub (GARDER LE SERVICE ORIGINAL)
-        print("2. Chargement du service DagsHub...")
-        dagshub_service = DagsHubService()
-        
-        print("3. Test de connexion...")
-        model_loaded = dagshub_service.test_connection()
+        if dagshub_service is None:
+            print("2. Chargement du service DagsHub...")
+            dagshub_service = DagsHubService()
+            
+            print("3. Test de connexion...")
+            model_loaded = dagshub_service.test_connection()
+        else:
+            # Mode pré-fork : modèle chargé par le processus parent, pages partagées
+            print("2-3. Service DagsHub préchargé par le processus parent")
+            model_loaded = dagshub_service.model is not None
         
         if model_loaded:
             print("[✓] Modèle chargé avec succès")
+            set_model_run_id((dagshub_service.model_info or {}).get("run_id") or dagshub_service.model_run_id)
             
             # Vérification du statut de configuration (si disponible)
             if hasattr(dagshub_service, 'get_config_status'):
@@ -164,16 +247,66 @@ async def startup_event():
         else:
             print("[X] Échec du chargement du modèle")
         
-        # 3. Interface Dash (passer le service Azure Insights)
-        print("4. Démarrage de l'interface Dash...")
-        dash_ui_service = DashUIService(
-            api_base_url="http://localhost:8000",
-            azure_insights_service=azure_insights_service
-        )
+        # Exécuteur dédié : l'inférence ne bloque plus la boucle asyncio
+        inference_executor = InferenceExecutor()
+        get_threading_config().configure_anyio()
+        
+        # Micro-batching des prédictions concurrentes
+        if MICRO_BATCHING_ENABLED and dagshub_service.model is not None:
+            batch_scheduler = MicroBatchScheduler(_serving_predict_batch, executor=inference_executor)
+            batch_scheduler.start()
+            print(f"[✓] Micro-batching actif (lot max: {batch_scheduler.max_batch_size}, fenêtre: {batch_scheduler.max_wait_ms}ms)")
+        
+        # Prédictions identiques en vol partagées (devant le micro-batching ou l'exécuteur)
+        if REQUEST_COALESCING_ENABLED and dagshub_service.model is not None:
+            submit_fn = batch_scheduler.submit if batch_scheduler else (
+                lambda text: inference_executor.submit(dagshub_service.predict, text)
+            )
+            request_coalescer = RequestCoalescer(submit_fn, lambda text: dagshub_service.text_key(text))
+        
+        # Autres modèles chargés à la demande, à côté du modèle par défaut
+        if MODEL_REGISTRY_ENABLED and dagshub_service.model is not None:
+            model_registry = ModelRegistry(
+                dagshub_service, inference_executor, default_scheduler=batch_scheduler, micro_batching=MICRO_BATCHING_ENABLED
+            )
+            if model_registry.allowed_run_ids:
+                print(f"[✓] Registre de modèles : {len(model_registry.allowed_run_ids)} runs sélectionnables "
+                      f"(budget: {model_registry.memory_budget / 1024 / 1024:.0f} Mo)")
         
-        # Démarrage en arrière-plan
-        dash_ui_service.run_in_thread(host='0.0.0.0', port=8050, debug=False)
-        print("[✓] Interface Dash démarrée")
+        # Rechargement à chaud du modèle servi (/admin/model/reload)
+        if dagshub_service.model is not None:
+            model_swapper = ModelSwapper(lambda: dagshub_service, _activate_service)
+        
+        # Rejet rapide des requêtes dont l'attente estimée dépasse le budget de latence
+        if ADMISSION_CONTROL_ENABLED:
+            admission_controller = AdmissionController(inference_executor, batch_scheduler)
+            print(f"[✓] Contrôle d'admission actif (budget: {admission_controller.latency_budget * 1000:.0f}ms)")
+        
+        # Jobs de scoring en arrière-plan (reprise des jobs inachevés)
+        if JOBS_ENABLED and dagshub_service.model is not None:
+            job_service = JobService(_serving_predict_batch, is_busy=_interactive_busy, executor=inference_executor)
+            job_service.start()
+            print(f"[✓] Jobs de scoring actifs ({job_service.db_path})")
+        
+        # Scoring de fichiers CSV/Parquet par paquets
+        if dagshub_service.model is not None:
+            file_scoring_service = FileScoringService(
+                _serving_predict_batch,
+                model_run_id=lambda: (dagshub_service.model_info or {}).get("run_id") or dagshub_service.model_run_id,
+                executor=inference_executor
+            )
+        
+        # 3. Interface Dash (passer le service Azure Insights)
+        if DASH_UI_ENABLED:
+            print("4. Démarrage de l'interface Dash...")
+            dash_ui_service = DashUIService(
+                api_base_url="http://localhost:8000",
+                azure_insights_service=azure_insights_service
+            )
+            
+            # Démarrage en arrière-plan
+            dash_ui_service.run_in_thread(host='0.0.0.0', port=8050, debug=False)
+            print("[✓] Interface Dash démarrée")
         
         # Résumé final avec Azure
         print("\nSTATUT FINAL:")
@@ -200,6 +333,7 @@ async def startup_event():
             )
             print("\n[AZURE] Événement de démarrage loggé")
         
+        mark_worker_ready()
         print("\nAPI prête!")
         print("=" * 60)
         
@@ -208,10 +342,58 @@ async def startup_event():
         print(f"[X] ERREUR: {e}")
         print("=" * 60)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre des services d'inférence"""
+    if job_service:
+        job_service.stop()
+    if model_registry:
+        model_registry.shutdown()
+    if batch_scheduler:
+        batch_scheduler.stop()
+    if inference_executor:
+        inference_executor.shutdown()
+
+def _serving_predict_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Prédiction par le modèle servi au moment de l'appel (référence relue : rechargement à chaud)"""
+    return dagshub_service.predict_batch(texts)
+
+def _activate_service(service):
+    """Publie un nouveau modèle servi : une seule affectation de référence, lue par chaque appel"""
+    global dagshub_service
+    dagshub_service = service
+    set_model_run_id((service.model_info or {}).get("run_id") or service.model_run_id)
+    if model_registry:
+        model_registry.set_default(service)
+
+def _interactive_busy() -> bool:
+    """Requêtes interactives en attente ou exécuteur saturé : les jobs cèdent la place"""
+    if inference_executor is None:
+        return False
+    stats = inference_executor.get_stats()
+    return stats['queue_depth'] > 0 or stats['active_workers'] >= stats['max_workers']
+
+def preload_dagshub_service() -> bool:
+    """Chargement unique du modèle dans le processus parent (mode pré-fork)"""
+    global dagshub_service
+    
+    dagshub_service = DagsHubService()
+    model_loaded = dagshub_service.test_connection()
+    
+    # Aucun thread ne doit être actif au moment du fork
+    config_status = dagshub_service.wait_for_config()
+    print(f"[{'✓' if model_loaded else 'X'}] Préchargement: modèle {'chargé' if model_loaded else 'absent'}, configuration {config_status}")
+    return model_loaded
+
+def run_dash_ui():
+    """Interface Dash dans un processus dédié (mode pré-fork)"""
+    DashUIService(api_base_url="http://localhost:8000").run_server(host='0.0.0.0', port=8050, debug=False)
+
 # Modèles Pydantic
 class PredictRequest(BaseModel):
     text: str
     user_id: Optional[str] = "anonymous"
+    prediction_id: Optional[str] = None  # Identifiant client renvoyé tel quel (feedback)
 
 class PredictResponse(BaseModel):
     text: str
@@ -223,11 +405,61 @@ class PredictResponse(BaseModel):
     azure_logged: bool = False
     preprocessing_info: Optional[Dict[str, Any]] = None
     config_status: Optional[Dict[str, Any]] = None
+    prediction_id: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # Durées par étape (ms), avec timings=true
+
+# Profils de réponse de /predict : "full" (défaut) ou "lean" (label, confiance, identifiant)
+PREDICT_RESPONSE_FIELDS = tuple(name for name in PredictResponse.model_fields if name != "timings")
+LEAN_RESPONSE_FIELDS = ("sentiment", "confidence", "prediction_id")
+
+class PredictBatchRequest(BaseModel):
+    texts: List[str]
+    user_id: Optional[str] = "anonymous"
+
+class ModelReloadRequest(BaseModel):
+    run_id: Optional[str] = None  # Run à publier (défaut : run servi, ex. artifacts mis à jour)
+    min_agreement: Optional[float] = None  # Accord minimal des labels avec le modèle servi (corpus de référence)
+
+class PredictBatchItem(BaseModel):
+    text: str
+    processed_text: str
+    sentiment: str
+    confidence: float
+    raw_score: Optional[float] = None
+    error: Optional[str] = None
+
+class PredictBatchResponse(BaseModel):
+    results: List[PredictBatchItem]
+    count: int
+    model_info: Dict[str, Any]
+    user_id: str
+    azure_logged: bool = False
+    timings: Optional[Dict[str, float]] = None  # Durées par étape (ms), avec timings=true
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    user_id: Optional[str] = None
+    total: int
+    processed: int
+    errors: int
+    chunks_total: int
+    chunks_done: int
+    progress: float
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
+class JobListResponse(BaseModel):
+    jobs: List[JobResponse]
+    stats: Dict[str, Any]
 
 class HealthResponse(BaseModel):
     status: str
     message: str
     model_loaded: bool
+    ready: Optional[bool] = None
     config_loaded: bool
     config_status: Dict[str, Any]
     tokenizer_loaded: Optional[bool] = None
@@ -235,6 +467,7 @@ class HealthResponse(BaseModel):
     input_shape: Optional[str] = None
     version_compatibility: Optional[Dict[str, Any]] = None
     azure_insights: Optional[Dict[str, Any]] = None
+    inference: Optional[Dict[str, Any]] = None
 
 class RootResponse(BaseModel):
     message: str
@@ -304,6 +537,111 @@ async def healthcheck():
     """Endpoint simple pour tests CI/CD - indépendant du service API"""
     return {"status": "ok", "service": "p7-tweet-api"}
 
+def _collect_service_metrics():
+    """Statistiques des services au moment de l'export /metrics (nom, type, aide, échantillons)"""
+    if dagshub_service is not None:
+        yield "model_ready", "gauge", "Modèle chargé et préchauffé (1) ou non (0)", [
+            ({}, int(dagshub_service.model is not None and dagshub_service.warmup_status == "ready"))
+        ]
+        yield "model_load_duration_seconds", "gauge", "Durée du chargement du modèle (préchauffage compris)", [
+            ({}, dagshub_service.load_seconds)
+        ]
+        warmup = dagshub_service.warmup_report or {}
+        yield "model_warmup_duration_seconds", "gauge", "Durée du préchauffage des formes d'entrée", [
+            ({}, warmup["total_ms"] / 1000 if warmup.get("total_ms") is not None else None)
+        ]
+        dedup = dagshub_service.dedup_stats
+        yield "inference_rows_total", "counter", "Textes reçus par le scoring, doublons du lot compris", [
+            ({}, dedup['rows'])
+        ]
+        yield "inference_duplicate_rows_total", "counter", "Textes du lot calculés une seule fois (doublons)", [
+            ({}, dedup['duplicate_rows'])
+        ]
+        
+        cache = dagshub_service.prediction_cache
+        if cache is not None:
+            stats = cache.get_stats()
+            yield "cache_lookups_total", "counter", "Consultations du cache de prédictions par niveau et résultat", [
+                ({'tier': tier, 'result': result}, stats[f'{tier}_{result}'])
+                for tier in ("text", "token") for result in ("hits", "misses")
+            ]
+            yield "cache_entries", "gauge", "Entrées du cache de prédictions par niveau", [
+                ({'tier': "text"}, stats['text_entries']), ({'tier': "token"}, stats['token_entries'])
+            ]
+            yield "cache_size_bytes", "gauge", "Mémoire estimée du cache de prédictions", [({}, stats['size_kb'] * 1024)]
+            yield "cache_evictions_total", "counter", "Entrées retirées du cache par motif", [
+                ({'reason': "capacity"}, stats['evictions']),
+                ({'reason': "ttl"}, stats['expirations']),
+                ({'reason': "invalidation"}, stats['invalidations'])
+            ]
+    
+    if inference_executor is not None:
+        stats = inference_executor.get_stats()
+        yield "queue_depth", "gauge", "Tâches ou requêtes en attente par file", [
+            ({'queue': "executor"}, stats['queue_depth']),
+            ({'queue': "micro_batching"}, batch_scheduler.queue_depth() if batch_scheduler else 0)
+        ]
+        yield "executor_active_workers", "gauge", "Threads d'inférence occupés", [({}, stats['active_workers'])]
+        yield "executor_tasks_total", "counter", "Tâches de l'exécuteur d'inférence par résultat", [
+            ({'outcome': outcome}, stats[outcome]) for outcome in ("submitted", "completed", "failed", "rejected")
+        ]
+        yield "executor_task_duration_seconds_ewma", "gauge", "Durée moyenne lissée d'une tâche d'inférence", [
+            ({}, stats['task_ms_ewma'] / 1000 if stats['task_ms_ewma'] is not None else None)
+        ]
+    
+    if batch_scheduler is not None:
+        stats = batch_scheduler.get_stats()
+        yield "micro_batches_total", "counter", "Lots formés par le micro-batching", [({}, stats['batches_count'])]
+        yield "micro_batch_requests_total", "counter", "Requêtes regroupées par le micro-batching", [({}, stats['requests_count'])]
+    
+    if request_coalescer is not None:
+        stats = request_coalescer.get_stats()
+        yield "coalesced_requests_total", "counter", "Requêtes /predict servies par un calcul identique déjà en vol", [
+            ({}, stats['coalesced'])
+        ]
+    
+    if admission_controller is not None:
+        stats = admission_controller.get_stats()
+        yield "admission_requests_total", "counter", "Décisions du contrôle d'admission", [
+            ({'decision': "admitted"}, stats['admitted']),
+            ({'decision': "shed_budget"}, stats['shed_budget']),
+            ({'decision': "shed_queue_full"}, stats['shed_queue_full']),
+            ({'decision': "shed_executor_full"}, stats['shed_executor_full'])
+        ]
+        yield "admission_estimated_wait_seconds", "gauge", "Attente estimée d'une nouvelle requête", [
+            ({}, stats['estimated_wait_ms'] / 1000)
+        ]
+    
+    if model_registry is not None:
+        stats = model_registry.get_stats()
+        yield "registry_model_memory_bytes", "gauge", "Mémoire estimée de chaque modèle chargé", [
+            ({'model': model['run_id']}, model['memory_mb'] * 1024 * 1024) for model in stats['loaded']
+        ]
+        yield "registry_events_total", "counter", "Chargements, échecs et évictions du registre de modèles", [
+            ({'event': event}, stats[event]) for event in ("loads", "load_failures", "evictions")
+        ]
+    
+    if job_service is not None:
+        yield "jobs", "gauge", "Jobs de scoring par statut", [
+            ({'status': status}, count) for status, count in job_service.get_stats()['jobs_by_status'].items()
+        ]
+
+REGISTRY.register_collector(_collect_service_metrics)
+
+@app.get("/metrics", include_in_schema=True)
+async def metrics():
+    """Métriques au format texte Prometheus (latences, tailles de lot, files, cache, télémétrie)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Métriques désactivées (METRICS_ENABLED)")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/models", include_in_schema=True)
+async def list_models():
+    """Modèles sélectionnables et modèles chargés (mémoire, dernière utilisation)"""
+    if not model_registry:
+        raise HTTPException(status_code=503, detail="Registre de modèles non disponible")
+    return FastJSONResponse(content=model_registry.get_stats())
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check de l'API - statut complet des services"""
@@ -337,6 +675,14 @@ async def health_check():
         if not model_loaded:
             status = "critical"
             message = "Modèle non chargé"
+        elif not health_data.get("ready", True):
+            # Toutes les formes d'entrée ne sont pas encore préchauffées
+            if health_data.get("inference", {}).get("warmup", {}).get("status") == "failed":
+                status = "degraded"
+                message = "Modèle chargé, préchauffage échoué"
+            else:
+                status = "warming"
+                message = "Préchauffage du modèle en cours"
         elif config_status.get("status") == "failed":
             status = "degraded"
             message = "Modèle chargé, configuration échouée"
@@ -350,29 +696,168 @@ async def health_check():
             status = "functional"
             message = "API opérationnelle (configuration par défaut)"
         
+        # Statut du pipeline d'inférence
+        inference_status = {
+            "backend": health_data.get("inference", {}),
+            "cache": health_data.get("prediction_cache", {}),
+            "micro_batching": batch_scheduler.get_stats() if batch_scheduler else {"enabled": False},
+            "coalescing": request_coalescer.get_stats() if request_coalescer else {"enabled": False},
+            "admission": admission_controller.get_stats() if admission_controller else {"enabled": False},
+            "executor": inference_executor.get_stats() if inference_executor else None,
+            "jobs": job_service.get_stats() if job_service else {"enabled": False},
+            "file_scoring": file_scoring_service.get_stats() if file_scoring_service else {"enabled": False},
+            "models": model_registry.get_stats() if model_registry else {"enabled": False},
+            "model_swap": model_swapper.get_stats() if model_swapper else {"enabled": False},
+            "process": get_process_info(),
+            "threading": get_threading_config().get_report()
+        }
+        
         return HealthResponse(
             status=status,
             message=message,
             model_loaded=model_loaded,
+            ready=health_data.get("ready", model_loaded),
             config_loaded=config_loaded,
             config_status=config_status,
             tokenizer_loaded=health_data.get("tokenizer_loaded", False),
             vocab_size=health_data.get("vocab_size", None),
             input_shape=health_data.get("input_shape", None),
             version_compatibility=health_data.get("version_compatibility", {}),
-            azure_insights=azure_status
+            azure_insights=azure_status,
+            inference=inference_status
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur health check: {str(e)}")
 
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Surcharge : 429 immédiat avec le délai conseillé avant un nouvel essai"""
+    retry_after = max(1, math.ceil(exc.retry_after or 1))
+    return FastJSONResponse(
+        status_code=429,
+        content={"detail": f"Service surchargé: {str(exc)}", "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)}
+    )
+
+def _admit():
+    """Contrôle d'admission avant toute mise en file - lève OverloadedError (429 via overloaded_handler)
+
+    admit() compare seulement l'attente estimée (durée moyenne lissée des tâches) au budget, sans réserver
+    de place : la borne stricte reste la file de l'exécuteur (InferenceQueueFullError, aussi un OverloadedError).
+    """
+    if admission_controller:
+        admission_controller.admit()
+
+def _record_inference(timer, since: float, stage_timings: Optional[Dict[str, float]]) -> float:
+    """Temps d'inférence réparti entre l'attente (file, micro-batching) et les étapes du modèle"""
+    now = time.perf_counter()
+    timer.add("queue", max(0.0, now - since - sum((stage_timings or {}).values()) / 1000))
+    timer.merge(stage_timings)
+    return now
+
+async def _run_inference(fn, *args):
+    """Exécute un appel au modèle sur l'exécuteur dédié (ou le pool par défaut avant démarrage)"""
+    if inference_executor:
+        return await inference_executor.run(fn, *args)
+    return await run_in_threadpool(fn, *args)
+
+async def _select_model(http_request: Request, model_run_id: Optional[str]):
+    """Modèle demandé (paramètre model_run_id ou en-tête X-Model-Run-Id), chargé si besoin - None : modèle par défaut"""
+    run_id = model_run_id or http_request.headers.get("x-model-run-id")
+    if not run_id or run_id == dagshub_service.model_run_id:
+        return None
+    if not model_registry or not model_registry.is_allowed(run_id):
+        raise HTTPException(status_code=404, detail=f"Modèle inconnu: {run_id}")
+    
+    entry = model_registry.peek(run_id)
+    if entry is not None:
+        return entry
+    try:
+        # Premier appel : chargement hors de la boucle asyncio (requêtes simultanées : un seul chargement)
+        return await run_in_threadpool(model_registry.get, run_id)
+    except ModelNotAllowedError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoadError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON encodée par orjson, sans revalidation Pydantic du contenu"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+# Ordre des colonnes d'un résultat de lot encodé en tableau (réponse MessagePack)
+BATCH_RESULT_FIELDS = ("text", "processed_text", "sentiment", "confidence", "raw_score", "error")
+
+def _prediction_response(http_request: Request, payload: Dict[str, Any], compact_results: bool = False) -> Response:
+    """Réponse JSON, ou MessagePack si l'en-tête Accept le demande (lot : un tableau par résultat)"""
+    headers = {"Vary": "Accept"}
+    if not wants_msgpack(http_request):
+        return FastJSONResponse(content=payload, headers=headers)
+    if compact_results:
+        payload = {
+            **payload,
+            "fields": list(BATCH_RESULT_FIELDS),
+            "results": [[result[field] for field in BATCH_RESULT_FIELDS] for result in payload["results"]]
+        }
+    return MsgPackResponse(content=payload, headers=headers)
+
+def _dumps_line(item: Dict[str, Any]) -> bytes:
+    """Ligne NDJSON encodée (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(item, ensure_ascii=False).encode("utf-8")
+
+def _resolve_response_fields(http_request: Request, profile: Optional[str], fields: Optional[str]) -> Optional[List[str]]:
+    """Champs de réponse demandés (paramètre de requête, sinon en-tête) - None pour la réponse complète"""
+    fields = fields or http_request.headers.get("x-response-fields")
+    profile = (profile or http_request.headers.get("x-response-profile") or "full").lower()
+    
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in PREDICT_RESPONSE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Champs inconnus: {', '.join(unknown)} (disponibles: {', '.join(PREDICT_RESPONSE_FIELDS)})"
+            )
+        return selected
+    
+    if profile == "lean":
+        return list(LEAN_RESPONSE_FIELDS)
+    if profile != "full":
+        raise HTTPException(status_code=400, detail=f"Profil de réponse inconnu: {profile} (full, lean)")
+    return None
+
 @app.post("/predict", response_model=PredictResponse)
-async def predict_sentiment(request: PredictRequest):
+async def predict_sentiment(request: PredictRequest, http_request: Request,
+                            profile: Optional[str] = None, fields: Optional[str] = None, timings: bool = False,
+                            model_run_id: Optional[str] = None):
     """Prédiction de sentiment avec logging Azure GARANTI"""
     if not dagshub_service or not dagshub_service.model:
         raise HTTPException(status_code=503, detail="Modèle non disponible")
     
+    timer = start_timer()
+    response_fields = _resolve_response_fields(http_request, profile, fields)
+    _admit()
+    model = await _select_model(http_request, model_run_id)
+    
     try:
-        result = dagshub_service.predict(request.text)
+        if model is not None:
+            # Autre run : sa propre file de micro-batching
+            result = await asyncio.wrap_future(model.submit(request.text))
+        elif request_coalescer:
+            # Calcul partagé avec les requêtes identiques en cours, puis micro-batching
+            result = await asyncio.wrap_future(request_coalescer.submit(request.text))
+        elif batch_scheduler:
+            # Regroupé avec les requêtes concurrentes, sans bloquer la boucle asyncio
+            result = await asyncio.wrap_future(batch_scheduler.submit(request.text))
+        else:
+            result = await _run_inference(dagshub_service.predict, request.text)
+        if timer is not None:
+            started = _record_inference(timer, timer.started, result.get("stage_timings"))
         azure_logged = False
         
         # CRITIQUE : Log dans Azure Insights - TOUJOURS essayer
@@ -387,8 +872,8 @@ async def predict_sentiment(request: PredictRequest):
                     'prediction_timestamp': __import__('datetime').datetime.utcnow().isoformat()
                 }
                 
-                # Appel explicite de log_prediction
-                azure_logged = azure_insights_service.log_prediction(prediction_data)
+                # Appel explicite de log_prediction (flush bloquant => hors boucle asyncio)
+                azure_logged = await run_in_threadpool(azure_insights_service.log_prediction, prediction_data)
                 
                 if azure_logged:
                     logger.info(f"[AZURE] Prédiction loggée pour user {request.user_id}")
@@ -399,23 +884,388 @@ async def predict_sentiment(request: PredictRequest):
                 logger.error(f"[AZURE] Erreur logging prédiction: {azure_error}")
         else:
             logger.warning("[AZURE] Service Azure non disponible")
+        if timer is not None:
+            started = timer.mark("azure", started)
         
-        return PredictResponse(
-            text=result["text"],
-            processed_text=result.get("processed_text", ""),
-            sentiment=result["sentiment"],
-            confidence=result["confidence"],
-            model_info=result.get("model_info", {}),
-            user_id=request.user_id,
-            azure_logged=azure_logged,
-            preprocessing_info=result.get("preprocessing_info"),
-            config_status=result.get("config_status")
-        )
+        # Contenu produit par le serveur : même forme que PredictResponse, sérialisé directement
+        payload = {
+            "text": result["text"],
+            "processed_text": result.get("processed_text", ""),
+            "sentiment": result["sentiment"],
+            "confidence": result["confidence"],
+            "model_info": result.get("model_info") or {},
+            "user_id": request.user_id,
+            "azure_logged": azure_logged,
+            "preprocessing_info": result.get("preprocessing_info"),
+            "config_status": result.get("config_status"),
+            "prediction_id": request.prediction_id
+        }
+        
+        if response_fields is not None:
+            payload = {field: payload[field] for field in response_fields}
+            if request.prediction_id is None:
+                payload.pop("prediction_id", None)  # Identifiant renvoyé seulement s'il est fourni
+        
+        if timer is None:
+            return _prediction_response(http_request, payload)
         
+        if timings:
+            payload["timings"] = timer.as_dict()
+        response = _prediction_response(http_request, payload)
+        timer.mark("response", started)
+        response.headers["Server-Timing"] = timer.header()
+        return response
+        
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Erreur prédiction: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
+@app.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_sentiment_batch(request: PredictBatchRequest, http_request: Request, timings: bool = False,
+                                  model_run_id: Optional[str] = None):
+    """Prédiction de sentiment d'un lot de textes en une seule passe du modèle"""
+    if not dagshub_service or not dagshub_service.model:
+        raise HTTPException(status_code=503, detail="Modèle non disponible")
+    
+    if len(request.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux: {len(request.texts)} textes (maximum {MAX_BATCH_SIZE})"
+        )
+    
+    timer = start_timer()
+    _admit()
+    model = await _select_model(http_request, model_run_id)
+    service = model.service if model is not None else dagshub_service
+    
+    try:
+        results = await _run_inference(service.predict_batch, request.texts)
+        if timer is not None:
+            started = _record_inference(timer, timer.started, results[0].get("stage_timings") if results else None)
+        model_info = service.model_info or {}
+        azure_logged = False
+        
+        # Un seul événement Azure agrégé pour tout le lot
+        if azure_insights_service:
+            try:
+                azure_logged = await run_in_threadpool(azure_insights_service.log_batch_prediction, {
+                    'results': results,
+                    'model_info': model_info,
+                    'user_id': request.user_id
+                })
+            except Exception as azure_error:
+                logger.error(f"[AZURE] Erreur logging batch: {azure_error}")
+        if timer is not None:
+            started = timer.mark("azure", started)
+        
+        # Même forme que PredictBatchResponse, sans construire un modèle Pydantic par texte
+        payload = {
+            "results": [
+                {
+                    "text": result["text"],
+                    "processed_text": result.get("processed_text", ""),
+                    "sentiment": result["sentiment"],
+                    "confidence": result["confidence"],
+                    "raw_score": result.get("raw_score"),
+                    "error": result.get("error")
+                }
+                for result in results
+            ],
+            "count": len(results),
+            "model_info": model_info,
+            "user_id": request.user_id,
+            "azure_logged": azure_logged
+        }
+        
+        if timer is None:
+            return _prediction_response(http_request, payload, compact_results=True)
+        
+        if timings:
+            payload["timings"] = timer.as_dict()
+        response = _prediction_response(http_request, payload, compact_results=True)
+        timer.mark("response", started)
+        response.headers["Server-Timing"] = timer.header()
+        return response
+        
+    except OverloadedError:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur prédiction batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse qui lit le corps de la requête pendant l'envoi de la réponse
+
+    StreamingResponse écoute la déconnexion via receive() en parallèle et consomme alors
+    les messages du corps encore attendus par request.stream(). Ici seul le générateur
+    lit receive() (request.stream() lève ClientDisconnect si le client se déconnecte).
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _parse_stream_line(raw: bytes, line_number: int) -> Dict[str, Any]:
+    """Décode une ligne NDJSON : objet {"text", "id"?} ou chaîne JSON"""
+    item_id = None
+    try:
+        payload = json.loads(raw)
+        if isinstance(payload, dict):
+            item_id = payload.get("id")
+            text = payload.get("text")
+        else:
+            text = payload
+        if not isinstance(text, str):
+            raise ValueError("champ 'text' (chaîne) manquant")
+        return {"line": line_number, "id": item_id, "text": text}
+    except Exception as e:
+        return {"line": line_number, "id": item_id, "error": f"Ligne invalide: {e}"}
+
+async def _iter_ndjson_items(request: Request):
+    """Lignes NDJSON du corps de la requête décodées au fil de l'eau (longueur de ligne bornée)"""
+    buffer = b""
+    line_number = 0
+    discarding = False  # Ligne trop longue : ignorée jusqu'au prochain saut de ligne
+    
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        
+        for raw in lines:
+            line_number += 1
+            if discarding or len(raw) > STREAM_MAX_LINE_BYTES:
+                discarding = False
+                yield {"line": line_number, "id": None, "error": f"Ligne trop longue (> {STREAM_MAX_LINE_BYTES} octets)"}
+            elif raw.strip():
+                yield _parse_stream_line(raw, line_number)
+        
+        # Mémoire bornée : une ligne sans fin n'est pas accumulée
+        if len(buffer) > STREAM_MAX_LINE_BYTES:
+            buffer = b""
+            discarding = True
+    
+    # Dernière ligne sans saut de ligne final
+    if discarding:
+        line_number += 1
+        yield {"line": line_number, "id": None, "error": f"Ligne trop longue (> {STREAM_MAX_LINE_BYTES} octets)"}
+    elif buffer.strip():
+        line_number += 1
+        yield _parse_stream_line(buffer, line_number)
+
+async def _score_stream_chunk(items: List[Dict[str, Any]], user_id: str) -> bytes:
+    """Évalue un paquet de lignes en une passe et retourne les lignes NDJSON de résultat"""
+    valid = [item for item in items if "error" not in item]
+    
+    try:
+        results = await _run_inference(dagshub_service.predict_batch, [item["text"] for item in valid]) if valid else []
+        for item, result in zip(valid, results):
+            if result.get("error"):
+                item["error"] = result["error"]
+            else:
+                item["sentiment"] = result["sentiment"]
+                item["confidence"] = result["confidence"]
+                item["raw_score"] = result.get("raw_score")
+        
+        if azure_insights_service and results:
+            await run_in_threadpool(azure_insights_service.log_batch_prediction, {
+                'results': results,
+                'model_info': dagshub_service.model_info or {},
+                'user_id': user_id
+            })
+    except Exception as e:
+        # Erreur du paquet : signalée sur chacune de ses lignes, le flux continue
+        logger.error(f"Erreur scoring flux: {e}")
+        for item in valid:
+            item["error"] = f"Erreur: {str(e)}"
+    
+    lines = []
+    for item in items:
+        item.pop("text", None)
+        lines.append(_dumps_line(item))
+    return b"\n".join(lines) + b"\n"
+
+@app.post("/predict/stream", include_in_schema=True)
+async def predict_sentiment_stream(request: Request, user_id: str = "anonymous"):
+    """
+    Scoring d'un flux NDJSON (une ligne {"text": ..., "id": ...} par tweet).
+    Les résultats sont renvoyés en NDJSON au fil de l'eau, par paquets de STREAM_CHUNK_SIZE.
+    """
+    if not dagshub_service or not dagshub_service.model:
+        raise HTTPException(status_code=503, detail="Modèle non disponible")
+    _admit()
+    
+    async def generate():
+        chunk = []
+        async for item in _iter_ndjson_items(request):
+            chunk.append(item)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield await _score_stream_chunk(chunk, user_id)
+                chunk = []
+        
+        if chunk:
+            yield await _score_stream_chunk(chunk, user_id)
+    
+    return DuplexStreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    if not job_service:
+        raise HTTPException(status_code=503, detail="Jobs de scoring non disponibles")
+    job = job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job inconnu: {job_id}")
+    return job
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: PredictBatchRequest):
+    """Crée un job de scoring asynchrone à partir d'une liste de textes - retourne son identifiant"""
+    if not job_service:
+        raise HTTPException(status_code=503, detail="Jobs de scoring non disponibles")
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="Aucun texte à évaluer")
+    
+    job = await run_in_threadpool(job_service.submit_texts, request.texts, request.user_id)
+    return FastJSONResponse(content=job, status_code=202)
+
+@app.post("/jobs/stream", response_model=JobResponse, status_code=202)
+async def submit_job_stream(request: Request, user_id: str = "anonymous"):
+    """
+    Crée un job de scoring à partir d'un flux NDJSON (même format que /predict/stream).
+    Les lignes sont persistées par paquets pendant la réception : la mémoire reste bornée.
+    """
+    if not job_service:
+        raise HTTPException(status_code=503, detail="Jobs de scoring non disponibles")
+    
+    job_id = await run_in_threadpool(job_service.create_job, user_id)
+    chunk = []
+    chunk_index = 0
+    
+    try:
+        async for item in _iter_ndjson_items(request):
+            chunk.append(item)
+            if len(chunk) >= job_service.chunk_size:
+                await run_in_threadpool(job_service.add_chunk, job_id, chunk_index, chunk)
+                chunk_index += 1
+                chunk = []
+        if chunk:
+            await run_in_threadpool(job_service.add_chunk, job_id, chunk_index, chunk)
+    except Exception as e:
+        await run_in_threadpool(job_service.fail_job, job_id, f"Réception interrompue: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Réception du flux interrompue: {str(e)}")
+    
+    job = await run_in_threadpool(job_service.finalize_job, job_id)
+    return FastJSONResponse(content=job, status_code=202)
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs(limit: int = 50):
+    """Derniers jobs de scoring"""
+    if not job_service:
+        raise HTTPException(status_code=503, detail="Jobs de scoring non disponibles")
+    jobs = await run_in_threadpool(job_service.list_jobs, limit)
+    return FastJSONResponse(content={"jobs": jobs, "stats": job_service.get_stats()})
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Statut et progression d'un job"""
+    return FastJSONResponse(content=await run_in_threadpool(_get_job_or_404, job_id))
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Annule un job en file ou en cours (les paquets déjà évalués restent disponibles)"""
+    job = await run_in_threadpool(_get_job_or_404, job_id)
+    if not await run_in_threadpool(job_service.cancel_job, job_id):
+        raise HTTPException(status_code=409, detail=f"Job déjà terminé ({job['status']})")
+    return FastJSONResponse(content=await run_in_threadpool(job_service.get_job, job_id))
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, partial: bool = False):
+    """
+    Résultats d'un job en NDJSON, dans l'ordre des lignes soumises.
+    Avant la fin du job, partial=true renvoie les paquets déjà évalués.
+    """
+    job = await run_in_threadpool(_get_job_or_404, job_id)
+    if job["status"] != "completed" and not partial:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job['status']} ({job['processed']}/{job['total']}) - utilisez partial=true"
+        )
+    
+    async def generate():
+        chunk_index = -1
+        while True:
+            chunk = await run_in_threadpool(job_service.get_result_chunk, job_id, chunk_index)
+            if chunk is None:
+                break
+            chunk_index, rows = chunk
+            yield b"\n".join(_dumps_line(row) for row in rows) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson", headers={"X-Job-Status": job["status"]})
+
+def _resolve_local_path(path: str) -> Path:
+    """Chemin local limité au répertoire FILE_SCORING_DIR"""
+    if not FILE_SCORING_DIR:
+        raise HTTPException(status_code=403, detail="Chemins locaux désactivés (FILE_SCORING_DIR non défini)")
+    base = Path(FILE_SCORING_DIR).resolve()
+    resolved = (base / path).resolve()
+    if not resolved.is_relative_to(base):
+        raise HTTPException(status_code=403, detail=f"Chemin hors de {FILE_SCORING_DIR}: {path}")
+    return resolved
+
+@app.post("/files/score")
+async def score_file(file: Optional[UploadFile] = File(None), path: Optional[str] = None, output: Optional[str] = None,
+                     text_column: Optional[str] = None, format: Optional[str] = None):
+    """
+    Scoring d'un fichier CSV ou Parquet par paquets de FILE_CHUNK_SIZE lignes.
+    Fichier envoyé (multipart, champ "file") : le Parquet évalué est renvoyé en réponse.
+    Chemin local (path, dans FILE_SCORING_DIR) : le Parquet est écrit sur disque (output) et un rapport est renvoyé.
+    """
+    if not file_scoring_service:
+        raise HTTPException(status_code=503, detail="Modèle non disponible")
+    if (file is None) == (path is None):
+        raise HTTPException(status_code=400, detail="Fournir soit un fichier (file), soit un chemin local (path)")
+    _admit()
+    
+    try:
+        if path is not None:
+            source = _resolve_local_path(path)
+            if not source.is_file():
+                raise HTTPException(status_code=404, detail=f"Fichier introuvable: {path}")
+            fmt = detect_format(source.name, format)
+            destination = _resolve_local_path(output or f"{source.stem}.scored.parquet")
+            if destination == source:
+                raise HTTPException(status_code=400, detail=f"La sortie doit être différente de l'entrée: {output}")
+            report = await run_in_threadpool(file_scoring_service.score_file, str(source), str(destination), fmt, text_column)
+            return FastJSONResponse(content={**report, "input": str(source), "output": str(destination)})
+        
+        # Fichier envoyé : déjà stocké sur disque par Starlette au-delà de 1 Mo
+        fmt = detect_format(file.filename, format)
+        fd, destination = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            report = await run_in_threadpool(file_scoring_service.score_file, file.file, destination, fmt, text_column)
+        except Exception:
+            os.remove(destination)
+            raise
+        
+        return FileResponse(
+            destination,
+            media_type="application/vnd.apache.parquet",
+            filename=f"{Path(file.filename or 'input').stem}.scored.parquet",
+            headers={"X-Rows": str(report["rows"]), "X-Row-Errors": str(report["errors"]),
+                     "X-Model-Run-Id": str(report["model_run_id"] or "")},
+            background=BackgroundTask(os.remove, destination)
+        )
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur scoring fichier: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/feedback", include_in_schema=True)
 async def log_feedback(feedback_data: FeedbackRequest):
@@ -427,7 +1277,7 @@ async def log_feedback(feedback_data: FeedbackRequest):
         global dagshub_service  # accès au run_id du modèle
 
         # Convertir le modèle Pydantic en dict
-        feedback_dict = feedback_data.dict()
+        feedback_dict = feedback_data.model_dump()
 
         # Ajouter timestamp si manquant
         if not feedback_dict.get('timestamp'):
@@ -448,7 +1298,7 @@ async def log_feedback(feedback_data: FeedbackRequest):
         azure_logged = False
         if azure_insights_service:
             try:
-                azure_logged = azure_insights_service.log_feedback(feedback_dict)
+                azure_logged = await run_in_threadpool(azure_insights_service.log_feedback, feedback_dict)
                 if azure_logged:
                     logger.info(f"[AZURE] Feedback loggé avec run_id={feedback_dict['model_run_id']}")
                 else:
@@ -458,7 +1308,7 @@ async def log_feedback(feedback_data: FeedbackRequest):
         else:
             logger.warning("[AZURE] Service Azure non disponible pour feedback")
 
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "message": "Feedback enregistré",
             "azure_logged": azure_logged,
@@ -466,7 +1316,7 @@ async def log_feedback(feedback_data: FeedbackRequest):
             "prediction_id": feedback_dict.get('prediction_id'),
             "user_id": feedback_dict.get('user_id'),
             "model_run_id": feedback_dict.get('model_run_id')  # renvoyé aussi dans la réponse
-        }
+        })
 
     except Exception as e:
         logger.error(f"Erreur enregistrement feedback: {e}")
@@ -502,6 +1352,52 @@ async def get_azure_insights_status():
     
     return azure_insights_service.get_service_status()
 
+def _get_model_swapper() -> ModelSwapper:
+    if not model_swapper:
+        raise HTTPException(status_code=503, detail="Rechargement du modèle non disponible")
+    return model_swapper
+
+def _require_model_admin(http_request: Request) -> ModelSwapper:
+    """Swapper d'un appel d'administration autorisé (jeton ADMIN_TOKEN, processus unique)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Administration du modèle désactivée (ADMIN_TOKEN non défini)")
+    token = http_request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Jeton d'administration invalide (en-tête X-Admin-Token)")
+    
+    # Chaque worker pré-fork sert son propre snapshot : une bascule partielle mélangerait deux modèles
+    if get_process_info()['mode'] == 'prefork':
+        raise HTTPException(status_code=409, detail="Rechargement indisponible en mode pré-fork (API_WORKERS > 1) : redémarrez les workers")
+    return _get_model_swapper()
+
+@app.get("/admin/model", include_in_schema=True)
+async def get_model_swap_status():
+    """Snapshot servi, snapshot précédent et état du dernier rechargement"""
+    return FastJSONResponse(content=_get_model_swapper().get_stats())
+
+@app.post("/admin/model/reload", status_code=202, include_in_schema=True)
+async def reload_model(http_request: Request, request: ModelReloadRequest = None):
+    """Construit, préchauffe et valide un nouveau snapshot en arrière-plan, puis le publie"""
+    swapper = _require_model_admin(http_request)
+    run_id = request.run_id if request else None
+    if run_id and run_id != dagshub_service.model_run_id and not (model_registry and model_registry.is_allowed(run_id)):
+        raise HTTPException(status_code=404, detail=f"Modèle inconnu: {run_id} (MODEL_RUN_IDS)")
+    
+    try:
+        report = swapper.reload(run_id, request.min_agreement if request else None)
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return FastJSONResponse(status_code=202, content=report)
+
+@app.post("/admin/model/rollback", include_in_schema=True)
+async def rollback_model(http_request: Request):
+    """Restaure immédiatement le snapshot précédent"""
+    swapper = _require_model_admin(http_request)
+    try:
+        return FastJSONResponse(content=swapper.rollback())
+    except RollbackUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 # Point d'entrée principal
 if __name__ == "__main__":
     # Configuration depuis les variables d'environnement
@@ -516,6 +1412,28 @@ if __name__ == "__main__":
     if reload_mode:
         print("[!] Mode développement - Auto-reload activé")
     
+    if API_WORKERS > 1 and not reload_mode:
+        # TensorFlow n'est pas fork-safe : le moteur NumPy est chargé depuis son export, construit au besoin
+        # dans un processus séparé, pour que TensorFlow ne soit jamais initialisé avant le fork
+        preload_start = time.perf_counter()
+        if os.getenv("INFERENCE_BACKEND", "compiled").lower() == "numpy":
+            export_path = ensure_numpy_export(os.getenv("NUMPY_ENGINE_PATH"))
+            if export_path:
+                os.environ["NUMPY_ENGINE_PATH"] = export_path
+        
+        preload_dagshub_service()
+        preload_seconds = time.perf_counter() - preload_start
+        
+        if dagshub_service.inference_engine_name == "numpy" and "tensorflow" not in sys.modules:
+            print(f"[✓] Mode pré-fork: {API_WORKERS} workers partageant le modèle")
+            sidecar = run_dash_ui if DASH_UI_ENABLED else None
+            DASH_UI_ENABLED = False
+            PreforkServer(app, host, port, API_WORKERS, sidecar=sidecar, preload_seconds=preload_seconds).run()
+            sys.exit(0)
+        
+        print(f"[!] Mode pré-fork ignoré (backend {dagshub_service.inference_engine_name}, TensorFlow chargé): "
+              "utilisez INFERENCE_BACKEND=numpy avec un modèle convertible - démarrage en processus unique")
+    
     uvicorn.run(
         app, 
         host=host, 
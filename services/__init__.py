@@ -1,4 +1,9 @@
 # Fichier __init__.py pour le package services
+
+# Limites de threads BLAS/OpenMP posées avant le chargement de NumPy et TensorFlow
+from .threading_config import get_threading_config
+get_threading_config().apply_environment()
+
 from .dagshub_service import DagsHubService
 from .dash_ui_service import DashUIService
 
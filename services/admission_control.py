@@ -0,0 +1,95 @@
+# Contrôle d'admission : rejet rapide des requêtes quand l'attente estimée dépasse le budget de latence
+import os
+import math
+import logging
+import threading
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class OverloadedError(Exception):
+    """Requête refusée pour surcharge - retry_after : délai conseillé avant un nouvel essai (s)"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionRejectedError(OverloadedError):
+    """Levée quand l'attente estimée dépasse le budget ou que la file de micro-batching est pleine"""
+    pass
+
+class AdmissionController:
+    """Estime l'attente d'une nouvelle requête et la refuse si elle dépasse le budget de latence
+
+    L'attente est estimée à partir de la durée moyenne (lissée) d'une tâche d'inférence et des
+    tâches déjà en file : celles de l'exécuteur et les lots à venir du micro-batching.
+    Mieux vaut refuser tout de suite (429 + Retry-After) qu'accepter une requête dont le
+    client aura abandonné l'attente (ex: timeout de 10 s de l'interface Dash).
+    """
+
+    def __init__(self, executor, scheduler=None, latency_budget_ms: float = None, max_queue: int = None):
+        self.executor = executor
+        self.scheduler = scheduler
+
+        # Configuration depuis les variables d'environnement (budget 0 : seule la borne de file s'applique)
+        budget_ms = latency_budget_ms if latency_budget_ms is not None else float(os.getenv("ADMISSION_LATENCY_BUDGET_MS", "2000"))
+        self.latency_budget = budget_ms / 1000
+        self.max_queue = max_queue or int(os.getenv("ADMISSION_MAX_QUEUE", "1024"))
+
+        # Statistiques
+        self._lock = threading.Lock()
+        self.stats = {
+            'admitted': 0,
+            'shed_budget': 0,
+            'shed_queue_full': 0
+        }
+
+    def _scheduler_depth(self) -> int:
+        return self.scheduler.queue_depth() if self.scheduler is not None else 0
+
+    def estimate_wait(self) -> float:
+        """Attente estimée (s) avant qu'une nouvelle requête soit évaluée"""
+        depth = self._scheduler_depth()
+        extra_tasks = math.ceil(depth / self.scheduler.max_batch_size) if depth else 0
+        return self.executor.estimate_wait(extra_tasks)
+
+    def admit(self) -> float:
+        """Admet la requête (retourne l'attente estimée) ou lève AdmissionRejectedError"""
+        depth = self._scheduler_depth()
+        wait = self.estimate_wait()
+
+        if depth >= self.max_queue:
+            with self._lock:
+                self.stats['shed_queue_full'] += 1
+            raise AdmissionRejectedError(f"File de prédiction pleine ({depth} en attente)", retry_after=max(wait, 1.0))
+
+        if self.latency_budget > 0 and wait > self.latency_budget:
+            with self._lock:
+                self.stats['shed_budget'] += 1
+            # Délai pour que la file actuelle repasse sous le budget
+            raise AdmissionRejectedError(
+                f"Attente estimée {wait * 1000:.0f} ms > budget {self.latency_budget * 1000:.0f} ms",
+                retry_after=wait - self.latency_budget
+            )
+
+        with self._lock:
+            self.stats['admitted'] += 1
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        executor_stats = self.executor.get_stats()
+        with self._lock:
+            shed = self.stats['shed_budget'] + self.stats['shed_queue_full'] + executor_stats['rejected']
+            return {
+                'enabled': True,
+                'latency_budget_ms': self.latency_budget * 1000,
+                'max_queue': self.max_queue,
+                'estimated_wait_ms': round(self.estimate_wait() * 1000, 1),
+                'queue_depth': {
+                    'micro_batching': self._scheduler_depth(),
+                    'executor': executor_stats['queue_depth']
+                },
+                **self.stats,
+                'shed_executor_full': executor_stats['rejected'],
+                'shed_total': shed
+            }
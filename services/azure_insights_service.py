@@ -3,8 +3,10 @@ import os
 import json
 import logging
 from datetime import datetime
+from functools import wraps
 from typing import Dict, Any, Optional
 import logging
+from services.metrics import TELEMETRY_EVENTS
 
 # Import avec gestion d'erreur
 try:
@@ -16,6 +18,18 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+def _track_telemetry(event: str):
+    """Compte chaque envoi dans /metrics : sent, failed ou skipped (service désactivé)"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            outcome = None if self.enabled and self.azure_logger else "skipped"
+            result = method(self, *args, **kwargs)
+            TELEMETRY_EVENTS.inc(event=event, outcome=outcome or ("sent" if result else "failed"))
+            return result
+        return wrapper
+    return decorator
+
 class AzureInsightsService:
     """Service Azure Insights avec debug complet"""
     
@@ -139,6 +153,7 @@ class AzureInsightsService:
             self.usage_stats['logs_failed'] += 1
             self.usage_stats['last_error'] = f"Connection test failed: {str(e)}"
     
+    @_track_telemetry("prediction")
     def log_prediction(self, prediction_data: Dict[str, Any]):
         """Log de prédiction avec debug complet"""
         print(f"[DEBUG] log_prediction appelé - enabled: {self.enabled}")
@@ -194,6 +209,48 @@ class AzureInsightsService:
             return False
     
 
+    @_track_telemetry("batch_prediction")
+    def log_batch_prediction(self, batch_data: Dict[str, Any]):
+        """Log d'un lot de prédictions en un seul événement agrégé"""
+        if not self.enabled or not self.azure_logger:
+            return False
+
+        try:
+            results = batch_data.get('results', [])
+            batch_size = len(results)
+
+            self.usage_stats['predictions_count'] += batch_size
+            self.usage_stats['last_prediction'] = datetime.utcnow()
+
+            sentiments = [r.get('sentiment') for r in results]
+            log_data = {
+                'event_type': 'batch_prediction',
+                'batch_size': batch_size,
+                'positive_count': sentiments.count('positive'),
+                'negative_count': sentiments.count('negative'),
+                'error_count': sum(1 for r in results if r.get('error')),
+                'mean_confidence': (sum(float(r.get('confidence', 0)) for r in results) / batch_size) if batch_size else 0.0,
+                'timestamp': datetime.utcnow().isoformat(),
+                'user_id': batch_data.get('user_id', 'anonymous'),
+                'model_name': (batch_data.get('model_info') or {}).get('name', 'unknown'),
+                'session_id': id(self)
+            }
+
+            self.azure_logger.info('Batch Prediction Made', extra={'custom_dimensions': log_data})
+
+            for handler in self.azure_logger.handlers:
+                if hasattr(handler, 'flush'):
+                    handler.flush()
+
+            self.usage_stats['logs_sent'] += 1
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur log batch prediction: {e}")
+            self.usage_stats['logs_failed'] += 1
+            self.usage_stats['last_error'] = f"Log batch prediction failed: {str(e)}"
+            return False
+
     def _get_version_string(self):
         """Récupère la version au format Branch-CommitID depuis version_info.json"""
         try:
@@ -210,6 +267,7 @@ class AzureInsightsService:
         except Exception:
             return "unknown-unknown"
 
+    @_track_telemetry("feedback")
     def log_feedback(self, feedback_data: Dict[str, Any]):
         """
         Enregistre un feedback utilisateur dans Azure Application Insights
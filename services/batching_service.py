@@ -0,0 +1,151 @@
+# Service de micro-batching des prédictions
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchScheduler:
+    """Regroupe les prédictions concurrentes en lots pour une seule passe du modèle"""
+
+    def __init__(self, predict_batch_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch_size: int = None, max_wait_ms: float = None, executor=None):
+        # Fonction de prédiction par lot (ex: DagsHubService.predict_batch)
+        self.predict_batch_fn = predict_batch_fn
+        # Exécuteur optionnel (InferenceExecutor) : les lots y sont exécutés en parallèle
+        self.executor = executor
+
+        # Configuration depuis les variables d'environnement
+        self.max_batch_size = max_batch_size or int(os.getenv("BATCH_MAX_SIZE", "32"))
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("BATCH_WINDOW_MS", "5"))
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+
+        # Statistiques
+        self.stats = {
+            'requests_count': 0,
+            'batches_count': 0,
+            'largest_batch': 0,
+            'errors_count': 0
+        }
+
+    def start(self):
+        """Démarre le thread de traitement des lots"""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._worker_loop, name="micro-batch-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"[✓] Micro-batching démarré (taille max: {self.max_batch_size}, fenêtre: {self.max_wait_ms}ms)")
+
+    def stop(self):
+        """Arrête le thread de traitement (les requêtes en attente sont encore servies)"""
+        if not self._running:
+            return
+
+        self._running = False
+        self._queue.put(None)  # Réveille le thread
+        if self._thread:
+            self._thread.join(timeout=5)
+        logger.info("[-] Micro-batching arrêté")
+
+    def submit(self, text: str) -> Future:
+        """Soumet un texte et retourne un Future résolu avec son propre résultat"""
+        if not self._running:
+            raise RuntimeError("Micro-batching non démarré")
+
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def queue_depth(self) -> int:
+        """Requêtes en attente d'un lot"""
+        return self._queue.qsize()
+
+    def _collect_batch(self, first_item) -> list:
+        """Collecte les requêtes arrivées pendant la fenêtre, jusqu'à la taille maximale"""
+        batch = [first_item]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Signal d'arrêt : on le remet pour la boucle principale
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _worker_loop(self):
+        """Boucle principale : une passe avant par lot collecté"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                if not self._running and self._queue.empty():
+                    break
+                continue
+
+            batch = self._collect_batch(item)
+            # Ignorer les requêtes abandonnées par l'appelant
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            self.stats['requests_count'] += len(batch)
+            self.stats['batches_count'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+            if self.executor is None:
+                self._run_batch(batch)
+                continue
+
+            try:
+                self.executor.submit(self._run_batch, batch)
+            except Exception as e:
+                self._fail_batch(batch, e)
+
+    def _run_batch(self, batch: list):
+        """Une passe avant pour le lot, puis distribution des résultats"""
+        try:
+            results = self.predict_batch_fn([text for text, _ in batch])
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            self._fail_batch(batch, e)
+
+    def _fail_batch(self, batch: list, error: Exception):
+        """Propage l'erreur à toutes les requêtes du lot"""
+        self.stats['errors_count'] += 1
+        logger.error(f"[X] Erreur micro-batch ({len(batch)} requêtes): {error}")
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du micro-batching"""
+        batches = self.stats['batches_count']
+        return {
+            'enabled': self._running,
+            'max_batch_size': self.max_batch_size,
+            'window_ms': self.max_wait_ms,
+            'queue_depth': self.queue_depth(),
+            'requests_count': self.stats['requests_count'],
+            'batches_count': batches,
+            'largest_batch': self.stats['largest_batch'],
+            'mean_batch_size': round(self.stats['requests_count'] / batches, 2) if batches else 0.0,
+            'errors_count': self.stats['errors_count']
+        }
@@ -7,27 +7,52 @@ import tempfile
 import numpy as np
 import time
 import requests
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, List, Optional
 import mlflow
 from mlflow.tracking import MlflowClient
 import pkg_resources
 import sys
+import subprocess
 import threading
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from services.numpy_lstm_engine import pad_sequences_post
+from services.prediction_cache import PredictionCache, normalize_text
+from services.threading_config import get_threading_config
+from services.stage_timing import start_timer
+from services.metrics import INFERENCE_BATCH_SIZE, INFERENCE_MODEL_ROWS, INFERENCE_MODEL_DURATION
 
 logger = logging.getLogger(__name__)
 
+# Coût mémoire approximatif d'un mot du vocabulaire (dictionnaires du tokenizer)
+_VOCAB_ENTRY_BYTES = 256
+
 class DagsHubService:
     """Service universel avec chargement non-bloquant de la configuration"""
     
-    def __init__(self):
+    def __init__(self, model_run_id: str = None):
         # Configuration depuis les variables d'environnement
         self.username = os.getenv("DAGSHUB_USERNAME")
         self.repo = os.getenv("DAGSHUB_REPO") 
         self.token = os.getenv("DAGSHUB_TOKEN")
-        self.model_run_id = os.getenv("MODEL_RUN_ID")
+        self.model_run_id = model_run_id or os.getenv("MODEL_RUN_ID")
+        
+        # Répertoire local d'artifacts (même arborescence que le run MLflow) : aucun accès DagsHub
+        self.artifacts_dir = os.getenv("MODEL_ARTIFACTS_DIR")
+        # Export NumPy du moteur (chargé sans TensorFlow aux démarrages suivants)
+        self.numpy_engine_path = os.getenv("NUMPY_ENGINE_PATH")
+        # Cache des flatbuffers TFLite convertis (clé : run_id)
+        self.tflite_model_dir = os.getenv("TFLITE_MODEL_DIR")
+        
+        if self.model_run_id != os.getenv("MODEL_RUN_ID"):
+            # Autre run (registre multi-modèles) : artifacts dans <MODEL_ARTIFACTS_DIR>/<run_id>, sinon DagsHub
+            run_dir = os.path.join(self.artifacts_dir, self.model_run_id) if self.artifacts_dir else None
+            self.artifacts_dir = run_dir if run_dir and os.path.isdir(run_dir) else None
+            if self.numpy_engine_path:
+                root, ext = os.path.splitext(self.numpy_engine_path)
+                self.numpy_engine_path = f"{root}.{self.model_run_id}{ext}"
         
-        self._setup_mlflow()
+        if not self.artifacts_dir:
+            self._setup_mlflow()
         
         # Variables du modèle TensorFlow et tokenizer
         self.model = None
@@ -36,12 +61,49 @@ class DagsHubService:
         self.model_info = None
         self.model_type = "LSTM"
         self.version_compatibility = None
+        self.default_max_len = 100  # Utilisé tant que la configuration n'est pas chargée
+        
+        # Chemin d'inférence : "compiled" (tf.function), "tflite", "numpy" ou "keras" (Model.predict)
+        self.inference_backend = os.getenv("INFERENCE_BACKEND", "compiled").lower()
+        self.inference_xla = os.getenv("INFERENCE_XLA", "false").lower() in ["true", "1", "yes"]
+        self.warmup_batch_sizes = [
+            int(size) for size in os.getenv("INFERENCE_WARMUP_BATCH_SIZES", "1,8,32").split(",") if size.strip()
+        ]
+        self.inference_engine = None
+        self.inference_engine_name = "keras"
+        self.backend_parity = None
+        
+        # Préchauffage de toutes les formes (lot x palier) avant de se déclarer prêt
+        self.warmup_status = "pending"  # pending, warming, ready, failed
+        self.warmup_report = None
+        self._warmup_lock = threading.Lock()
+        self.load_seconds = None  # Durée du dernier load_model (préchauffage compris)
+        
+        # Quantification post-entraînement ("off", "float16" ou "int8") des backends numpy et tflite
+        self.quantization_mode = os.getenv("QUANTIZATION_MODE", "off").lower()
+        self.quantization_min_agreement = float(os.getenv("QUANTIZATION_MIN_AGREEMENT", "0.99"))
+        self.quantization_report = None
+        
+        # Regroupement par longueur : "exact" (modèle qui masque le padding), "approximate" ou "off"
+        self.bucketing_mode = os.getenv("BUCKETING_MODE", "exact").lower()
+        self.bucketing_min_agreement = float(os.getenv("BUCKETING_MIN_AGREEMENT", "0.99"))
+        self.bucketer = None
+        self.bucketing_report = None
+        
+        # Cache des prédictions (niveau texte normalisé + niveau séquence de tokens)
+        cache_enabled = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ["true", "1", "yes"]
+        self.prediction_cache = PredictionCache() if cache_enabled else None
+        
+        # Doublons d'un même lot : lignes servies par le calcul d'une autre ligne
+        self._dedup_lock = threading.Lock()
+        self.dedup_stats = {'rows': 0, 'duplicate_rows': 0}
         
         # État de chargement de la configuration
         self.config_loading_status = "not_started"  # not_started, loading, success, failed
         self.config_loading_error = None
         self.config_load_attempts = 0
         self.max_config_attempts = 2
+        self._config_thread = None
         
         # Configuration retry et timeouts
         self.max_retries = 3
@@ -58,9 +120,20 @@ class DagsHubService:
         mlflow.set_tracking_uri(mlflow_uri)
         logger.info(f"[✓] MLflow configuré: {mlflow_uri}")
     
+    def _get_tensorflow_version(self) -> str:
+        """Version de TensorFlow sans l'importer (le moteur NumPy sert sans TensorFlow)"""
+        if "tensorflow" in sys.modules:
+            return sys.modules["tensorflow"].__version__
+        
+        for package in ("tensorflow-cpu", "tensorflow"):
+            try:
+                return pkg_resources.get_distribution(package).version
+            except:
+                continue
+        return "unknown"
+    
     def _get_current_environment_versions(self) -> dict:
         """Récupère les versions actuelles de l'environnement d'exécution"""
-        import tensorflow as tf
         import numpy as np
         import pandas as pd
         
@@ -81,7 +154,7 @@ class DagsHubService:
             fastapi_version = "unknown"
             
         return {
-            "tensorflow_version": tf.__version__,
+            "tensorflow_version": self._get_tensorflow_version(),
             "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
             "numpy_version": np.__version__,
             "pandas_version": pd.__version__,
@@ -91,8 +164,20 @@ class DagsHubService:
             "platform": "Docker Container"
         }
     
+    def _fetch_artifact(self, artifact_path: str, temp_dir: str) -> str:
+        """Chemin local d'un artifact : répertoire MODEL_ARTIFACTS_DIR, sinon téléchargement MLflow"""
+        if self.artifacts_dir:
+            local_path = os.path.join(self.artifacts_dir, artifact_path)
+            if not os.path.exists(local_path):
+                raise FileNotFoundError(f"Artifact absent de {self.artifacts_dir}: {artifact_path}")
+            return local_path
+        return MlflowClient().download_artifacts(self.model_run_id, artifact_path, temp_dir)
+    
     def _check_config_file_exists(self) -> bool:
         """Vérifie rapidement si le fichier de configuration existe dans les artifacts"""
+        if self.artifacts_dir:
+            return os.path.exists(os.path.join(self.artifacts_dir, "model_config.json"))
+        
         try:
             client = MlflowClient()
             
@@ -118,6 +203,10 @@ class DagsHubService:
     
     def _download_config_with_timeout(self) -> dict:
         """Télécharge la configuration avec timeout et méthodes de fallback"""
+        if self.artifacts_dir:
+            with open(os.path.join(self.artifacts_dir, "model_config.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
         def download_via_mlflow():
             """Méthode de téléchargement via client MLflow"""
             try:
@@ -176,50 +265,61 @@ class DagsHubService:
             self.config_loading_status = "loading"
             self.config_load_attempts += 1
             
-            try:
-                logger.info(f"Tentative {self.config_load_attempts}/{self.max_config_attempts} de chargement de la configuration...")
-                
-                # Vérification rapide de l'existence
-                if not self._check_config_file_exists():
-                    raise Exception("Fichier model_config.json non trouvé dans les artifacts")
-                
-                # Téléchargement avec timeout
-                config_data = self._download_config_with_timeout()
-                
-                # Traitement réussi
-                self.model_config = config_data
-                self.config_loading_status = "success"
-                self.config_loading_error = None
-                
-                # Analyse de compatibilité des versions
-                model_environment = config_data.get("environment", {})
-                current_environment = self._get_current_environment_versions()
-                
-                self.version_compatibility = self._analyze_version_compatibility(
-                    model_environment, current_environment
-                )
-                
-                # Extraction des informations du modèle
-                self.model_info = self._extract_model_info(config_data)
-                
-                logger.info(f"[✓] Configuration chargée avec succès")
-                logger.info(f"   - Modèle: {self.model_info['name']}")
-                logger.info(f"   - Type: {self.model_info['type']}")
-                logger.info(f"   - Compatibilité: {self.model_info['compatibility_status']}")
-                
-            except Exception as e:
-                self.config_loading_status = "failed"
-                self.config_loading_error = str(e)
-                logger.error(f"[X] Échec du chargement de la configuration: {e}")
-                
-                # Créer des informations par défaut
-                self._create_default_model_info()
+            # Chargements simultanés bornés (CONFIG_LOADER_THREADS) : attente d'une place libre
+            with get_threading_config().config_loader_slots:
+                try:
+                    logger.info(f"Tentative {self.config_load_attempts}/{self.max_config_attempts} de chargement de la configuration...")
+                    
+                    # Vérification rapide de l'existence
+                    if not self._check_config_file_exists():
+                        raise Exception("Fichier model_config.json non trouvé dans les artifacts")
+                    
+                    # Téléchargement avec timeout
+                    config_data = self._download_config_with_timeout()
+                    
+                    # Analyse de compatibilité des versions
+                    model_environment = config_data.get("environment", {})
+                    current_environment = self._get_current_environment_versions()
+                    
+                    self.version_compatibility = self._analyze_version_compatibility(
+                        model_environment, current_environment
+                    )
+                    
+                    # Publication en dernier : predict ne voit la configuration qu'une fois complète
+                    self.model_info = self._extract_model_info(config_data)
+                    self.model_config = config_data
+                    self.config_loading_error = None
+                    self.config_loading_status = "success"
+                    
+                    logger.info(f"[✓] Configuration chargée avec succès")
+                    logger.info(f"   - Modèle: {self.model_info['name']}")
+                    logger.info(f"   - Type: {self.model_info['type']}")
+                    logger.info(f"   - Compatibilité: {self.model_info['compatibility_status']}")
+                    
+                    # Préchauffage déjà fait avec le max_len par défaut : formes du max_len configuré
+                    self._rewarm_for_config()
+                    
+                except Exception as e:
+                    self.config_loading_status = "failed"
+                    self.config_loading_error = str(e)
+                    logger.error(f"[X] Échec du chargement de la configuration: {e}")
+                    
+                    # Créer des informations par défaut
+                    self._create_default_model_info()
         
         # Lancement du thread en arrière-plan
         thread = threading.Thread(target=load_config_thread, daemon=True)
         thread.start()
+        self._config_thread = thread
         return thread
     
+    def wait_for_config(self, timeout: float = None) -> str:
+        """Attend la fin du chargement de configuration (avant un fork : le thread n'y survit pas)"""
+        thread = self._config_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout if timeout is not None else self.config_timeout)
+        return self.config_loading_status
+    
     def _extract_model_info(self, config_data):
         """Extrait les informations du modèle depuis la configuration chargée"""
         return {
@@ -411,11 +511,12 @@ class DagsHubService:
         # Chargement non-bloquant de la configuration
         self.load_model_config()
         
-        for attempt in range(self.max_retries):
+        # Artifacts locaux : une seule tentative (aucune erreur réseau à attendre)
+        max_retries = 1 if self.artifacts_dir else self.max_retries
+        
+        for attempt in range(max_retries):
             try:
-                logger.info(f"Tentative {attempt + 1}/{self.max_retries} de chargement du modèle...")
-                
-                client = MlflowClient()
+                logger.info(f"Tentative {attempt + 1}/{max_retries} de chargement du modèle...")
                 
                 with tempfile.TemporaryDirectory() as temp_dir:
                     # Déterminer les noms de fichiers depuis la config ou utiliser les défauts
@@ -430,12 +531,12 @@ class DagsHubService:
                     
                     # Chargement du modèle TensorFlow
                     logger.info(f"Téléchargement du modèle: {model_file}")
-                    model_path = client.download_artifacts(self.model_run_id, model_file, temp_dir)
+                    model_path = self._fetch_artifact(model_file, temp_dir)
                     self.model = self._load_model_with_compatibility(model_path)
                     
                     # Chargement du tokenizer
                     logger.info(f"Téléchargement du tokenizer: {tokenizer_file}")
-                    tokenizer_path = client.download_artifacts(self.model_run_id, tokenizer_file, temp_dir)
+                    tokenizer_path = self._fetch_artifact(tokenizer_file, temp_dir)
                     
                     with open(tokenizer_path, 'rb') as f:
                         self.tokenizer = pickle.load(f)
@@ -456,13 +557,435 @@ class DagsHubService:
             except Exception as e:
                 logger.warning(f"[X] Tentative {attempt + 1} échouée: {e}")
                 
-                if attempt < self.max_retries - 1:
+                if attempt < max_retries - 1:
                     logger.info(f"[-] Attente de {self.retry_delay}s avant nouvelle tentative...")
                     time.sleep(self.retry_delay)
         
         logger.error("[X] Échec de tous les chargements")
         return False
     
+    def _get_inference_params(self):
+        """Retourne (max_len, preprocessing_mode) depuis la configuration ou les défauts"""
+        # Lecture unique : le thread de configuration peut modifier l'attribut en parallèle
+        model_config = self.model_config
+        if model_config and self.config_loading_status == "success":
+            max_len = model_config.get("hyperparameters", {}).get("max_len", 100)
+            preprocessing_mode = model_config.get("preprocessing", {}).get("mode", "none")
+        else:
+            max_len = self.default_max_len
+            preprocessing_mode = "none"
+        return max_len, preprocessing_mode
+    
+    @staticmethod
+    def _score_to_sentiment(raw_score: float):
+        """Convertit le score brut en (sentiment, confiance)"""
+        # CORRECTION: Calcul correct du sentiment et de la confiance
+        if raw_score > 0.5:
+            return "positive", raw_score  # Confiance = probabilité positive
+        return "negative", 1 - raw_score  # Confiance = probabilité négative (1 - prob_positive)
+    
+    def _build_prediction_result(self, text: str, sequence: List[int], raw_score: float,
+                                 max_len: int, preprocessing_mode: str) -> Dict[str, Any]:
+        """Construit le dictionnaire de résultat d'une prédiction"""
+        sentiment, confidence = self._score_to_sentiment(raw_score)
+        tokens_count = len(sequence) if sequence else 0
+        
+        return {
+            "text": text,
+            "processed_text": f"Tokens: {tokens_count}, Padding: {max_len}",
+            "sentiment": sentiment,
+            "confidence": confidence,  # Maintenant cohérent avec le sentiment prédit
+            "raw_score": raw_score,    # Score brut pour debug si nécessaire
+            "model_info": self.model_info,
+            "preprocessing_info": {
+                "mode": preprocessing_mode,
+                "original_length": len(text),
+                "tokens_count": tokens_count,
+                "padded_length": max_len,
+                "unknown_tokens": sum(1 for token in sequence if token == 1) if sequence else 0,
+                "max_len_from_config": max_len,
+                "config_status": self.config_loading_status
+            },
+            "config_status": self.get_config_status()
+        }
+    
+    def _build_error_result(self, text: str, error: Exception) -> Dict[str, Any]:
+        """Résultat neutre renvoyé en cas d'erreur de prédiction"""
+        return {
+            "text": text,
+            "processed_text": "Erreur de traitement",
+            "sentiment": "neutral",
+            "confidence": 0.5,
+            "model_info": self.model_info,
+            "config_status": self.get_config_status(),
+            "error": str(error)
+        }
+    
+    def _setup_inference_backend(self):
+        """Prépare le chemin d'inférence configuré une fois le modèle chargé"""
+        self._reset_prediction_cache()
+        self.inference_engine = None
+        self.inference_engine_name = "keras"
+        self.backend_parity = None
+        self.quantization_report = None
+        
+        # Repli sur le chemin compilé si le backend demandé échoue
+        candidates = [self.inference_backend]
+        if self.inference_backend not in ("compiled", "keras"):
+            candidates.append("compiled")
+        
+        for backend in candidates:
+            if backend == "keras":
+                break
+            try:
+                engine = self._apply_quantization(self._build_inference_engine(backend), backend)
+                self.inference_engine = engine
+                self.inference_engine_name = backend
+                logger.info(f"[✓] Chemin d'inférence actif: {backend}")
+                break
+            except Exception as e:
+                logger.warning(f"[!] Chemin d'inférence '{backend}' indisponible: {e}")
+        
+        if self.inference_engine is None:
+            logger.info("Chemin d'inférence: keras (Model.predict)")
+        
+        self._setup_bucketing()
+    
+    def warmup_inference(self) -> dict:
+        """Passe chaque taille de lot x palier de longueur dans le chemin d'inférence (traçage, conversions, buffers)"""
+        with self._warmup_lock:
+            return self._warmup_shapes()
+    
+    def _rewarm_for_config(self):
+        """Configuration arrivée après le préchauffage : nouveau passage si max_len a changé"""
+        with self._warmup_lock:
+            report = self.warmup_report
+            if report is None or self.model is None:
+                return  # Préchauffage pas encore lancé : il lira le max_len configuré
+            max_len, _ = self._get_inference_params()
+            if report["max_len"] == max_len:
+                return
+        
+        logger.info(f"[-] max_len {report['max_len']} -> {max_len} (configuration chargée) : nouveau préchauffage")
+        self.warmup_inference()
+    
+    def _warmup_shapes(self) -> dict:
+        """Un passage de préchauffage sur le max_len courant (verrou tenu)"""
+        # Instance déjà prête : elle le reste pendant un nouveau passage (formes de l'ancien max_len déjà servies)
+        if self.warmup_status != "ready":
+            self.warmup_status = "warming"
+        max_len, _ = self._get_inference_params()
+        lengths = self.bucketer.bucket_lengths(max_len) if self.bucketer is not None else [max_len]
+        timings = {}
+        start = time.perf_counter()
+        
+        try:
+            for length in lengths:
+                for batch_size in self.warmup_batch_sizes:
+                    shape_start = time.perf_counter()
+                    self._run_model(np.zeros((batch_size, length), dtype=np.int32))
+                    timings[f"{batch_size}x{length}"] = round((time.perf_counter() - shape_start) * 1000, 2)
+            self.warmup_status = "ready"
+            error = None
+        except Exception as e:
+            self.warmup_status = "failed"
+            error = str(e)
+            logger.error(f"[X] Préchauffage échoué: {e}")
+        
+        self.warmup_report = {
+            "status": self.warmup_status,
+            "backend": self.inference_engine_name,
+            "batch_sizes": self.warmup_batch_sizes,
+            "max_len": max_len,
+            "lengths": lengths,
+            "shapes_ms": timings,
+            "total_ms": round((time.perf_counter() - start) * 1000, 2),
+            "error": error
+        }
+        if self.warmup_status == "ready":
+            logger.info(f"[✓] Préchauffage: {len(timings)} formes en {self.warmup_report['total_ms']}ms "
+                        f"(plus lente: {max(timings, key=timings.get)} {max(timings.values())}ms)")
+        return self.warmup_report
+    
+    def _model_masks_padding(self) -> bool:
+        """Vrai si l'Embedding masque le token 0 : le padding 'post' n'influence alors pas la sortie"""
+        if hasattr(self.model, "mask_zero"):
+            return bool(self.model.mask_zero)  # Moteur NumPy
+        for layer in getattr(self.model, "layers", []):
+            if type(layer).__name__ == "Embedding":
+                return bool(layer.get_config().get("mask_zero", False))
+        return False
+    
+    def _setup_bucketing(self):
+        """Active le regroupement par longueur après vérification sur le corpus de référence"""
+        from services.length_bucketing import LengthBucketer
+        from services.reference_corpus import load_reference_texts, parity_report
+        
+        self.bucketer = None
+        self.bucketing_report = {"mode": self.bucketing_mode, "active": False}
+        
+        if self.bucketing_mode not in ("exact", "approximate"):
+            return
+        
+        masks_padding = self._model_masks_padding()
+        self.bucketing_report["model_masks_padding"] = masks_padding
+        if self.bucketing_mode == "exact" and not masks_padding:
+            # Sans masque, les pas de padding modifient l'état final du LSTM
+            self.bucketing_report["reason"] = "Le modèle ne masque pas le padding : mode exact impossible"
+            logger.info("[-] Regroupement par longueur désactivé (padding non masqué par le modèle)")
+            return
+        
+        try:
+            bucketer = LengthBucketer()
+            max_len, _ = self._get_inference_params()
+            sequences = self.tokenizer.texts_to_sequences(load_reference_texts())
+            
+            reference = self._run_model(pad_sequences_post(sequences, max_len))
+            bucketed = self._run_bucketed(bucketer, sequences, max_len)
+            report = parity_report(reference, bucketed)
+            
+            if self.bucketing_mode == "exact":
+                tolerance = float(os.getenv("BUCKETING_TOLERANCE", "1e-5"))
+                passed = report["max_abs_diff"] <= tolerance and report["label_agreement"] == 1.0
+                report["tolerance"] = tolerance
+            else:
+                passed = report["label_agreement"] >= self.bucketing_min_agreement
+                report["min_agreement"] = self.bucketing_min_agreement
+            
+            self.bucketing_report.update(report)
+            if not passed:
+                self.bucketing_report["reason"] = "Écart avec le padding complet au-delà du seuil"
+                logger.warning(f"[!] Regroupement par longueur refusé: {report}")
+                return
+            
+            self.bucketer = LengthBucketer(bucketer.buckets)  # Statistiques sans le corpus de validation
+            self.bucketing_report["active"] = True
+            logger.info(f"[✓] Regroupement par longueur actif ({self.bucketing_mode}, paliers {bucketer.bucket_lengths(max_len)}): "
+                        f"écart max {report['max_abs_diff']:.2e}, accord labels {report['label_agreement']:.2%}")
+        except Exception as e:
+            self.bucketing_report["reason"] = str(e)
+            logger.warning(f"[!] Regroupement par longueur indisponible: {e}")
+    
+    def _run_bucketed(self, bucketer, sequences: List[List[int]], max_len: int, timer=None) -> np.ndarray:
+        """Une passe avant par palier de longueur - scores (n, 1) dans l'ordre d'entrée"""
+        scores = np.zeros((len(sequences), 1), dtype=np.float32)
+        for bucket, indices in bucketer.group(sequences, max_len).items():
+            started = time.perf_counter() if timer is not None else None
+            padded = pad_sequences_post([sequences[i] for i in indices], bucket)
+            if timer is not None:
+                started = timer.mark("pad", started)
+            scores[indices] = self._run_model(padded)
+            if timer is not None:
+                timer.mark("model", started)
+        return scores
+    
+    def _build_inference_engine(self, backend: str):
+        """Construit le moteur d'inférence demandé (appelable (n, longueur) -> scores (n, 1))"""
+        max_len, _ = self._get_inference_params()
+        
+        if backend == "compiled":
+            from services.compiled_inference import CompiledInferenceFunction
+            return CompiledInferenceFunction(self.model, jit_compile=self.inference_xla)
+        
+        if backend == "tflite":
+            from services.tflite_backend import TFLiteBackend
+            engine = TFLiteBackend(
+                self.model, max_len, self.warmup_batch_sizes,
+                model_dir=self.tflite_model_dir, model_key=self.model_run_id or "model"
+            )
+            self._check_backend_parity(engine, backend, float(os.getenv("TFLITE_PARITY_TOLERANCE", "1e-4")))
+            return engine
+        
+        if backend == "numpy":
+            from services.numpy_lstm_engine import NumpyLSTMEngine, NumpyTokenizer
+            engine = NumpyLSTMEngine.from_keras_model(self.model)
+            self._check_backend_parity(engine, backend, float(os.getenv("NUMPY_PARITY_TOLERANCE", "1e-4")))
+            
+            # Export unique : les démarrages suivants se passent de TensorFlow
+            export_path = self.numpy_engine_path
+            if export_path and not os.path.exists(export_path):
+                engine.save(export_path, NumpyTokenizer.from_keras_tokenizer(self.tokenizer), max_len)
+            return engine
+        
+        raise ValueError(f"Backend d'inférence inconnu: {backend}")
+    
+    def _apply_quantization(self, engine, backend: str):
+        """Remplace le moteur float32 par sa version quantifiée si l'accord sur les labels est suffisant"""
+        from services.reference_corpus import load_reference_texts, parity_report
+        
+        mode = self.quantization_mode
+        self.quantization_report = {"mode": mode, "active": False}
+        if mode in ("off", "none", "float32", ""):
+            return engine
+        
+        try:
+            max_len, _ = self._get_inference_params()
+            if backend == "numpy":
+                candidate = engine.quantize(mode)
+            elif backend == "tflite":
+                from services.tflite_backend import TFLiteBackend
+                candidate = TFLiteBackend(
+                    self.model, max_len, self.warmup_batch_sizes, model_dir=engine.model_dir,
+                    num_threads=engine.num_threads, model_key=engine.model_key, quantization=mode
+                )
+            else:
+                self.quantization_report["reason"] = f"Quantification non disponible pour le backend {backend} (numpy ou tflite)"
+                logger.warning(f"[!] {self.quantization_report['reason']}")
+                return engine
+            
+            # Référence : le moteur float32, déjà validé contre Keras
+            sequences = self.tokenizer.texts_to_sequences(load_reference_texts())
+            padded = pad_sequences_post(sequences, max_len)
+            report = parity_report(engine(padded), candidate(padded))
+            report["min_agreement"] = self.quantization_min_agreement
+            report["float32_kb"] = self._engine_weights_kb(engine)
+            report["quantized_kb"] = self._engine_weights_kb(candidate)
+            self.quantization_report.update(report)
+            
+            if report["label_agreement"] < self.quantization_min_agreement:
+                self.quantization_report["reason"] = "Accord sur les labels inférieur au seuil"
+                logger.warning(f"[!] Quantification {mode} refusée: {report}")
+                return engine
+            
+            self.quantization_report["active"] = True
+            logger.info(f"[✓] Quantification {mode} active: accord labels {report['label_agreement']:.2%}, "
+                        f"écart max {report['max_abs_diff']:.2e}, poids {report['float32_kb']} -> {report['quantized_kb']} Ko")
+            return candidate
+            
+        except Exception as e:
+            self.quantization_report["reason"] = str(e)
+            logger.warning(f"[!] Quantification {mode} indisponible: {e}")
+            return engine
+    
+    @staticmethod
+    def _engine_weights_kb(engine) -> float:
+        """Taille des poids servis (tableaux NumPy ou flatbuffers TFLite chargés)"""
+        if hasattr(engine, "nbytes"):
+            return round(engine.nbytes / 1024, 1)
+        return engine.get_stats().get("model_size_kb")
+    
+    def _check_backend_parity(self, engine, backend: str, tolerance: float):
+        """Compare le moteur au modèle Keras sur le corpus de référence - lève une erreur si écart"""
+        from services.reference_corpus import load_reference_texts, parity_report
+        
+        max_len, _ = self._get_inference_params()
+        sequences = self.tokenizer.texts_to_sequences(load_reference_texts())
+        padded = pad_sequences_post(sequences, max_len)
+        
+        reference = self.model.predict(padded, batch_size=len(padded), verbose=0)
+        report = parity_report(reference, engine(padded))
+        report["tolerance"] = tolerance
+        report["passed"] = report["max_abs_diff"] <= tolerance and report["label_agreement"] == 1.0
+        self.backend_parity = report
+        
+        if not report["passed"]:
+            raise ValueError(f"Parité {backend} insuffisante: {report}")
+        logger.info(f"[✓] Parité {backend}/keras: écart max {report['max_abs_diff']:.2e} sur {report['samples']} textes")
+    
+    def _run_model(self, padded) -> np.ndarray:
+        """Passe avant sur un tableau (n, max_len) - retourne les scores (n, 1)"""
+        if self.inference_engine is not None:
+            return self.inference_engine(padded)
+        return self.model.predict(padded, batch_size=len(padded), verbose=0)
+    
+    def get_inference_status(self) -> dict:
+        """Statut du chemin d'inférence"""
+        return {
+            "backend": self.inference_engine_name,
+            "requested_backend": self.inference_backend,
+            "engine": self.inference_engine.get_stats() if self.inference_engine is not None else None,
+            "warmup": self.warmup_report or {"status": self.warmup_status},
+            "parity": self.backend_parity,
+            "quantization": self.quantization_report or {"mode": self.quantization_mode, "active": False},
+            "bucketing": {
+                **(self.bucketing_report or {"mode": self.bucketing_mode, "active": False}),
+                **(self.bucketer.get_stats() if self.bucketer is not None else {})
+            },
+            "batch_deduplication": dict(self.dedup_stats)
+        }
+    
+    def _reset_prediction_cache(self):
+        """Vide le cache après (re)chargement du modèle et l'associe au run courant"""
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+            self.prediction_cache.set_scope(self.model_run_id)
+    
+    def text_key(self, text: str) -> str:
+        """Clé d'un texte : deux textes de même clé ont la même tokenisation (cache, dédoublonnage)"""
+        return normalize_text(text, getattr(self.tokenizer, "lower", True))
+    
+    def _score_texts(self, texts: List[str], max_len: int, timer=None):
+        """Tokenise et évalue les textes (cache consulté, doublons calculés une fois) - retourne (séquences, scores bruts)"""
+        cache = self.prediction_cache
+        started = time.perf_counter() if timer is not None else None
+        keys = [self.text_key(text) for text in texts]
+        INFERENCE_BATCH_SIZE.observe(len(texts), model_run_id=self.model_run_id)
+        
+        # Niveau 1 : texte normalisé -> séquence de tokens (un seul calcul par texte distinct du lot)
+        first_by_key = {}
+        for i, key in enumerate(keys):
+            first_by_key.setdefault(key, i)
+        
+        sequence_by_key = {}
+        if cache is not None:
+            for key in first_by_key:
+                sequence = cache.get_sequence(key)
+                if sequence is not None:
+                    sequence_by_key[key] = sequence
+        
+        to_tokenize = [key for key in first_by_key if key not in sequence_by_key]
+        if to_tokenize:
+            tokenized = self.tokenizer.texts_to_sequences([texts[first_by_key[key]] for key in to_tokenize])
+            for key, sequence in zip(to_tokenize, tokenized):
+                sequence_by_key[key] = sequence
+                if cache is not None:
+                    cache.put_sequence(key, sequence)
+        sequences = [sequence_by_key[key] for key in keys]
+        if timer is not None:
+            started = timer.mark("tokenize", started)
+        
+        # Niveau 2 : séquence tronquée à max_len -> score brut (textes différents, mêmes tokens : un seul calcul)
+        token_keys = [PredictionCache.token_key(sequence, max_len) for sequence in sequences]
+        first_by_token = {}
+        for i, token_key in enumerate(token_keys):
+            first_by_token.setdefault(token_key, i)
+        
+        score_by_token = {}
+        if cache is not None:
+            for token_key in first_by_token:
+                score = cache.get_score(token_key)
+                if score is not None:
+                    score_by_token[token_key] = score
+        
+        to_run = [token_key for token_key in first_by_token if token_key not in score_by_token]
+        if timer is not None:
+            started = timer.mark("cache", started)
+        if to_run:
+            # Une seule passe avant (ou une par palier de longueur) pour les séquences distinctes non trouvées en cache
+            model_started = time.perf_counter()
+            run_sequences = [sequences[first_by_token[token_key]] for token_key in to_run]
+            if self.bucketer is not None:
+                predictions = self._run_bucketed(self.bucketer, run_sequences, max_len, timer)
+            else:
+                padded = pad_sequences_post(run_sequences, max_len)
+                if timer is not None:
+                    started = timer.mark("pad", started)
+                predictions = self._run_model(padded)
+                if timer is not None:
+                    timer.mark("model", started)
+            INFERENCE_MODEL_DURATION.observe(time.perf_counter() - model_started, model_run_id=self.model_run_id)
+            INFERENCE_MODEL_ROWS.observe(len(to_run), model_run_id=self.model_run_id)
+            for token_key, prediction in zip(to_run, predictions):
+                score_by_token[token_key] = float(prediction[0])  # Score brut entre 0 et 1
+                if cache is not None:
+                    cache.put_score(token_key, score_by_token[token_key])
+        
+        with self._dedup_lock:
+            self.dedup_stats['rows'] += len(texts)
+            self.dedup_stats['duplicate_rows'] += len(texts) - len(first_by_token)
+        
+        return sequences, [score_by_token[token_key] for token_key in token_keys]
+    
     def predict(self, text: str) -> Dict[str, Any]:
         """Prédiction de sentiment avec calcul correct de la confiance"""
         if not self.model or not self.tokenizer:
@@ -470,77 +993,85 @@ class DagsHubService:
         
         try:
             # Paramètres depuis la configuration ou valeurs par défaut
-            if self.model_config and self.config_loading_status == "success":
-                max_len = self.model_config.get("hyperparameters", {}).get("max_len", 100)
-                preprocessing_mode = self.model_config.get("preprocessing", {}).get("mode", "none")
-            else:
-                max_len = 100
-                preprocessing_mode = "none"
+            max_len, preprocessing_mode = self._get_inference_params()
             
-            # Tokenisation et padding
-            sequences = self.tokenizer.texts_to_sequences([text])
+            # Tokenisation, padding et prédiction
+            timer = start_timer()
+            sequences, scores = self._score_texts([text], max_len, timer)
+            started = time.perf_counter()
             
-            from tensorflow.keras.preprocessing.sequence import pad_sequences
-            padded = pad_sequences(sequences, maxlen=max_len, padding='post', truncating='post')
+            result = self._build_prediction_result(text, sequences[0], scores[0], max_len, preprocessing_mode)
+            if timer is not None:
+                timer.mark("postprocess", started)
+                result["stage_timings"] = timer.as_dict(total=False)
+            return result
             
-            # Prédiction
-            prediction = self.model.predict(padded, verbose=0)
-            raw_score = float(prediction[0][0])  # Score brut entre 0 et 1
+        except Exception as e:
+            logger.error(f"[X] Erreur prédiction: {e}")
+            return self._build_error_result(text, e)
+    
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Prédiction de sentiment d'une liste de textes en un seul appel du modèle"""
+        if not self.model or not self.tokenizer:
+            raise ValueError("Modèle ou tokenizer non chargé")
+        
+        if not texts:
+            return []
+        
+        try:
+            max_len, preprocessing_mode = self._get_inference_params()
             
-            # CORRECTION: Calcul correct du sentiment et de la confiance
-            if raw_score > 0.5:
-                sentiment = "positive"
-                confidence = raw_score  # Confiance = probabilité positive
-            else:
-                sentiment = "negative"
-                confidence = 1 - raw_score  # Confiance = probabilité négative (1 - prob_positive)
-            
-            result = {
-                "text": text,
-                "processed_text": f"Tokens: {len(sequences[0]) if sequences[0] else 0}, Padding: {max_len}",
-                "sentiment": sentiment,
-                "confidence": confidence,  # Maintenant cohérent avec le sentiment prédit
-                "raw_score": raw_score,    # Score brut pour debug si nécessaire
-                "model_info": self.model_info,
-                "preprocessing_info": {
-                    "mode": preprocessing_mode,
-                    "original_length": len(text),
-                    "tokens_count": len(sequences[0]) if sequences[0] else 0,
-                    "padded_length": max_len,
-                    "unknown_tokens": sum(1 for token in sequences[0] if token == 1) if sequences[0] else 0,
-                    "max_len_from_config": max_len,
-                    "config_status": self.config_loading_status
-                },
-                "config_status": self.get_config_status()
-            }
+            # Tokenisation et padding de tout le lot dans un seul tableau (n, max_len)
+            timer = start_timer()
+            sequences, scores = self._score_texts(texts, max_len, timer)
+            started = time.perf_counter()
             
-            return result
+            results = [
+                self._build_prediction_result(text, sequence, score, max_len, preprocessing_mode)
+                for text, sequence, score in zip(texts, sequences, scores)
+            ]
+            if timer is not None:
+                # Étapes du lot entier, partagées par chacun de ses résultats
+                timer.mark("postprocess", started)
+                stage_timings = timer.as_dict(total=False)
+                for result in results:
+                    result["stage_timings"] = stage_timings
+            return results
             
         except Exception as e:
-            logger.error(f"[X] Erreur prédiction: {e}")
-            return {
-                "text": text,
-                "processed_text": "Erreur de traitement",
-                "sentiment": "neutral",
-                "confidence": 0.5,
-                "model_info": self.model_info,
-                "config_status": self.get_config_status(),
-                "error": str(e)
-            }    
+            logger.error(f"[X] Erreur prédiction batch: {e}")
+            return [self._build_error_result(text, e) for text in texts]
     
     def health_check(self) -> dict:
         """Vérification de santé avec statut de configuration"""
         return {
             "model_loaded": self.model is not None,
+            "ready": self.model is not None and self.warmup_status == "ready",
             "tokenizer_loaded": self.tokenizer is not None,  
             "config_loaded": self.model_config is not None,
             "config_status": self.get_config_status(),
             "model_info": self.model_info,
             "input_shape": str(self.model.input_shape) if self.model else None,
             "vocab_size": len(self.tokenizer.word_index) if self.tokenizer else None,
-            "version_compatibility": self.version_compatibility
+            "version_compatibility": self.version_compatibility,
+            "inference": self.get_inference_status(),
+            "prediction_cache": self.prediction_cache.get_stats() if self.prediction_cache is not None else {"enabled": False}
         }
     
+    def memory_footprint_bytes(self) -> int:
+        """Mémoire estimée du modèle chargé : poids servis, modèle Keras, vocabulaire et cache"""
+        total = 0
+        engine = self.inference_engine
+        if engine is not None:
+            total += int((self._engine_weights_kb(engine) or 0) * 1024)
+        if self.model is not None and self.model is not engine and hasattr(self.model, "count_params"):
+            total += self.model.count_params() * 4  # Poids float32 du modèle Keras (partagés par le chemin compilé)
+        if self.tokenizer is not None:
+            total += len(self.tokenizer.word_index) * _VOCAB_ENTRY_BYTES
+        if self.prediction_cache is not None:
+            total += int(self.prediction_cache.get_stats()['size_kb'] * 1024)
+        return total
+    
     def get_model_metadata(self) -> dict:
         """Retourne les métadonnées complètes avec statut de configuration"""
         base_metadata = {
@@ -569,15 +1100,38 @@ class DagsHubService:
     
     def load_model(self) -> bool:
         """Point d'entrée principal non-bloquant pour le chargement du modèle"""
+        started = time.perf_counter()
+        try:
+            return self._load_model()
+        finally:
+            self.load_seconds = time.perf_counter() - started
+    
+    def _load_model(self) -> bool:
         logger.info("=== CHARGEMENT MODÈLE PRINCIPAL ===")
         
+        self.warmup_status = "pending"
+        self.warmup_report = None
+        
+        # Export NumPy déjà disponible : service sans TensorFlow
+        if self._load_numpy_engine_export():
+            self.warmup_inference()
+            return True
+        
+        # Pools TensorFlow dimensionnés avant la première opération (une seule fois par processus)
+        get_threading_config().configure_tensorflow()
+        
         success = self.load_model_from_artifacts()
         
         if not success:
             logger.warning("[!] Échec du chargement, création d'un modèle fallback")
             self._create_fallback_model()
+            self._setup_inference_backend()
+            self.warmup_inference()
             return False
         
+        self._setup_inference_backend()
+        self.warmup_inference()
+        
         logger.info(f"Modèle chargé avec succès !")
         
         # Affichage du statut de configuration
@@ -591,6 +1145,42 @@ class DagsHubService:
         
         return True
     
+    def _load_numpy_engine_export(self) -> bool:
+        """Charge le moteur NumPy et son tokenizer depuis NUMPY_ENGINE_PATH, sans importer TensorFlow"""
+        export_path = self.numpy_engine_path
+        if self.inference_backend != "numpy" or not export_path or not os.path.exists(export_path):
+            return False
+        
+        try:
+            from services.numpy_lstm_engine import NumpyLSTMEngine
+            
+            engine, tokenizer, max_len = NumpyLSTMEngine.load(export_path)
+            if tokenizer is None:
+                raise ValueError("Tokenizer absent de l'export")
+            
+            # Configuration toujours chargée en arrière-plan (métadonnées, max_len)
+            self.load_model_config()
+            
+            if max_len:
+                self.default_max_len = max_len
+            self.tokenizer = tokenizer
+            self._reset_prediction_cache()
+            
+            # Le moteur float32 n'est pas conservé si la version quantifiée est retenue
+            engine = self._apply_quantization(engine, "numpy")
+            self.model = engine
+            self.inference_engine = engine
+            self.inference_engine_name = "numpy"
+            self._setup_bucketing()
+            logger.info(f"[✓] Moteur NumPy chargé depuis {export_path} (sans TensorFlow)")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"[!] Export NumPy inutilisable ({export_path}): {e}")
+            self.model = None
+            self.tokenizer = None
+            return False
+    
     def _create_fallback_model(self):
         """Crée un modèle de fallback minimal si le chargement principal échoue"""
         import tensorflow as tf
@@ -637,4 +1227,50 @@ class DagsHubService:
                 except Exception as e:
                     logger.error(f"[X] Erreur test '{text}': {e}")
         
-        return success
\ No newline at end of file
+        return success
+
+def _build_numpy_export(export_path: str) -> int:
+    """Processus dédié : modèle Keras chargé puis export NumPy écrit avec le max_len de la configuration"""
+    from services.numpy_lstm_engine import NumpyTokenizer
+    
+    service = DagsHubService()
+    if not service.load_model() or service.inference_engine_name != "numpy":
+        logger.error("[X] Export NumPy impossible (modèle absent ou architecture non supportée par le moteur NumPy)")
+        return 1
+    service.wait_for_config()
+    max_len, _ = service._get_inference_params()
+    
+    # Écriture atomique : un export partiel n'est jamais chargé
+    partial_path = f"{export_path}.partial"
+    service.inference_engine.save(partial_path, NumpyTokenizer.from_keras_tokenizer(service.tokenizer), max_len)
+    os.replace(partial_path, export_path)
+    return 0
+
+def ensure_numpy_export(export_path: str = None) -> Optional[str]:
+    """Export NumPy disponible avant un fork, construit dans un processus séparé s'il manque
+    
+    TensorFlow n'est importé que par ce processus : le processus appelant charge ensuite l'export
+    sans TensorFlow et peut forker. Retourne le chemin de l'export, ou None si la conversion échoue.
+    """
+    if export_path and os.path.exists(export_path):
+        return export_path
+    if not export_path:
+        export_path = os.path.join(tempfile.mkdtemp(prefix="numpy_engine_"), "engine.npz")
+    
+    logger.info(f"[-] Construction de l'export NumPy dans un processus dédié: {export_path}")
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {
+        **os.environ,
+        "INFERENCE_BACKEND": "numpy",
+        "NUMPY_ENGINE_PATH": "",     # Pas d'export implicite au chargement : écrit une fois la configuration connue
+        "QUANTIZATION_MODE": "off",  # Export float32, quantifié au chargement selon QUANTIZATION_MODE
+        "BUCKETING_MODE": "off"
+    }
+    code = "import sys; from services.dagshub_service import _build_numpy_export; sys.exit(_build_numpy_export(sys.argv[1]))"
+    result = subprocess.run([sys.executable, "-c", code, export_path], cwd=project_dir, env=env)
+    
+    if result.returncode != 0 or not os.path.exists(export_path):
+        logger.warning(f"[!] Export NumPy non construit (code {result.returncode})")
+        return None
+    logger.info(f"[✓] Export NumPy prêt: {export_path}")
+    return export_path
@@ -12,9 +12,32 @@ import uuid
 import threading
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer
+
+from services.threading_config import get_threading_config
 
 logger = logging.getLogger(__name__)
 
+class _PooledWSGIServer(BaseWSGIServer):
+    """Serveur werkzeug à pool de threads borné (threaded=True crée un thread par requête)"""
+
+    def __init__(self, host, port, app, max_threads: int):
+        super().__init__(host, port, app)
+        self.max_threads = max_threads
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="dash")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
 class DashUIService:
     """Service pour gérer l'interface utilisateur Dash avec design professionnel"""
     
@@ -642,6 +665,9 @@ class DashUIService:
             )
             if response.status_code == 200:
                 return True, response.json()
+            elif response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "1")
+                return False, {"error": f"Service surchargé, réessayez dans {retry_after} s"}
             else:
                 return False, {"error": f"Status {response.status_code}: {response.text}"}
         except Exception as e:
@@ -1486,7 +1512,13 @@ class DashUIService:
     def run_server(self, host='0.0.0.0', port=8050, debug=False):
         """Démarrer le serveur Dash"""
         logger.info(f"Démarrage de l'interface Dash sur {host}:{port}")
-        self.app.run_server(host=host, port=port, debug=debug, threaded=True)
+        if debug:
+            self.app.run_server(host=host, port=port, debug=debug, threaded=True)
+            return
+        
+        server = _PooledWSGIServer(host, port, self.app.server, max_threads=get_threading_config().dash_threads)
+        logger.info(f"Interface Dash: {server.max_threads} threads maximum")
+        server.serve_forever()
     
     def run_in_thread(self, host='0.0.0.0', port=8050, debug=False):
         """Démarrer le serveur Dash dans un thread séparé"""
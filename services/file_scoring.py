@@ -0,0 +1,215 @@
+# Scoring de fichiers colonnaires (CSV / Parquet) par paquets, résultats écrits en Parquet
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Iterator
+
+from services.admission_control import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "parquet")
+
+# Colonnes ajoutées au fichier de sortie (remplacent les colonnes d'entrée de même nom)
+OUTPUT_COLUMNS = ("sentiment", "confidence", "model_run_id", "error")
+
+def detect_format(name: str, fmt: str = None) -> str:
+    """Format d'un fichier d'entrée (imposé, sinon déduit de l'extension)"""
+    fmt = (fmt or Path(name or "").suffix.lstrip(".")).lower()
+    if fmt in ("pq", "parq"):
+        fmt = "parquet"
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Format non supporté: '{fmt or name}' ({', '.join(SUPPORTED_FORMATS)})")
+    return fmt
+
+def iter_input_chunks(source, fmt: str, chunk_size: int) -> Iterator["pyarrow.Table"]:
+    """Lit un fichier CSV ou Parquet (chemin ou fichier ouvert) par paquets de chunk_size lignes"""
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        # Lecture groupe de lignes par groupe de lignes : jamais le fichier entier en mémoire
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield pa.Table.from_batches([batch])
+    else:
+        import pandas as pd
+
+        # Toutes les colonnes en texte (sans conversion des "NA") : schéma identique d'un paquet à l'autre
+        for frame in pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            yield pa.Table.from_pandas(frame, preserve_index=False)
+
+def score_texts(predict_batch_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                texts: List[Optional[str]]) -> List[Dict[str, Any]]:
+    """Prédictions {sentiment, confidence, error} alignées sur texts (valeurs absentes signalées en erreur)"""
+    predictions = [{"sentiment": None, "confidence": None, "error": None} for _ in texts]
+
+    valid = []
+    for i, text in enumerate(texts):
+        if isinstance(text, str):
+            valid.append(i)
+        else:
+            predictions[i]["error"] = "Texte manquant"
+
+    try:
+        results = predict_batch_fn([texts[i] for i in valid]) if valid else []
+        for i, result in zip(valid, results):
+            if result.get("error"):
+                predictions[i]["error"] = result["error"]
+            else:
+                predictions[i]["sentiment"] = result["sentiment"]
+                predictions[i]["confidence"] = float(result["confidence"])
+    except Exception as e:
+        # Erreur du paquet : signalée sur chacune de ses lignes, le fichier continue
+        logger.error(f"Erreur scoring fichier: {e}")
+        for i in valid:
+            predictions[i]["error"] = f"Erreur: {str(e)}"
+
+    return predictions
+
+def append_predictions(table, predictions: List[Dict[str, Any]], model_run_id: Optional[str]):
+    """Paquet d'entrée complété par les colonnes de sortie (OUTPUT_COLUMNS)"""
+    import pyarrow as pa
+
+    table = table.select([name for name in table.column_names if name not in OUTPUT_COLUMNS])
+    table = table.append_column("sentiment", pa.array([p["sentiment"] for p in predictions], type=pa.string()))
+    table = table.append_column("confidence", pa.array([p["confidence"] for p in predictions], type=pa.float64()))
+    table = table.append_column("model_run_id", pa.array([model_run_id] * len(predictions), type=pa.string()))
+    table = table.append_column("error", pa.array([p["error"] for p in predictions], type=pa.string()))
+    return table
+
+class FileScoringService:
+    """Évalue un fichier paquet par paquet avec le chemin batch du modèle et écrit un Parquet
+
+    Chaque paquet lu devient un groupe de lignes du fichier de sortie : la mémoire utilisée
+    dépend de FILE_CHUNK_SIZE et non de la taille du fichier. Les colonnes d'entrée sont
+    conservées, complétées par sentiment, confidence, model_run_id et error. Les appels au
+    modèle passent par l'exécuteur d'inférence en lots de FILE_INFERENCE_BATCH_SIZE : les
+    requêtes interactives s'intercalent entre deux lots au lieu d'attendre tout un paquet.
+    """
+
+    def __init__(self, predict_batch_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                 model_run_id: Callable[[], Optional[str]] = None, chunk_size: int = None, executor=None):
+        self.predict_batch_fn = predict_batch_fn
+        self.model_run_id = model_run_id or (lambda: None)
+        self.executor = executor  # InferenceExecutor partagé avec les requêtes (sinon appel direct)
+
+        # Configuration depuis les variables d'environnement
+        self.chunk_size = chunk_size or int(os.getenv("FILE_CHUNK_SIZE", "8192"))
+        self.inference_batch_size = int(os.getenv("FILE_INFERENCE_BATCH_SIZE", "512"))
+        self.yield_seconds = float(os.getenv("FILE_YIELD_MS", "20")) / 1000
+        self.text_column = os.getenv("FILE_TEXT_COLUMN", "text")
+
+        # Statistiques
+        self._lock = threading.Lock()
+        self.files_scored = 0
+        self.rows_scored = 0
+        self.row_errors = 0
+        self.yields = 0
+        self.last_report = None
+
+    def _predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Prédictions d'un paquet, lot par lot sur l'exécuteur d'inférence (file pleine : nouvel essai)"""
+        if self.executor is None:
+            return self.predict_batch_fn(texts)
+
+        results = []
+        start = 0
+        while start < len(texts):
+            batch = texts[start:start + self.inference_batch_size]
+            try:
+                results.extend(self.executor.submit(self.predict_batch_fn, batch).result())
+            except OverloadedError:
+                # File saturée par le trafic interactif : même lot après une courte pause
+                with self._lock:
+                    self.yields += 1
+                time.sleep(self.yield_seconds)
+                continue
+            start += len(batch)
+        return results
+
+    def _score_table(self, table, text_column: str, model_run_id: Optional[str]):
+        """Ajoute les colonnes de prédiction à un paquet"""
+        predictions = score_texts(self._predict, table.column(text_column).to_pylist())
+        return append_predictions(table, predictions, model_run_id), sum(1 for p in predictions if p["error"])
+
+    def score_file(self, source, destination, fmt: str = None, text_column: str = None) -> Dict[str, Any]:
+        """Évalue source (chemin ou fichier ouvert) et écrit destination (Parquet) - retourne un rapport"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fmt = detect_format(getattr(source, "name", None) or str(source), fmt)
+        if isinstance(source, (str, os.PathLike)) and os.path.exists(destination) and os.path.samefile(source, destination):
+            # ParquetWriter tronquerait l'entrée pendant sa lecture
+            raise ValueError(f"Le fichier de sortie doit être différent de l'entrée: {destination}")
+        text_column = text_column or self.text_column
+        model_run_id = self.model_run_id()
+
+        start = time.perf_counter()
+        writer = None
+        rows = errors = chunks = 0
+        replaced = []
+
+        try:
+            for table in iter_input_chunks(source, fmt, self.chunk_size):
+                if writer is None:
+                    if text_column not in table.column_names:
+                        raise ValueError(f"Colonne '{text_column}' absente (colonnes: {', '.join(table.column_names)})")
+                    replaced = [name for name in table.column_names if name in OUTPUT_COLUMNS]
+                    if replaced:
+                        logger.warning(f"[!] Colonnes d'entrée remplacées en sortie: {', '.join(replaced)}")
+
+                scored, chunk_errors = self._score_table(table, text_column, model_run_id)
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, scored.schema)
+                writer.write_table(scored)  # Un groupe de lignes par paquet
+
+                rows += scored.num_rows
+                errors += chunk_errors
+                chunks += 1
+
+            if writer is None:
+                # Fichier vide : sortie valide avec les seules colonnes de prédiction
+                empty = append_predictions(pa.table({}), [], model_run_id)
+                writer = pq.ParquetWriter(destination, empty.schema)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        seconds = time.perf_counter() - start
+        report = {
+            'format': fmt,
+            'text_column': text_column,
+            'rows': rows,
+            'errors': errors,
+            'chunks': chunks,
+            'chunk_size': self.chunk_size,
+            'model_run_id': model_run_id,
+            'replaced_columns': replaced,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None
+        }
+
+        with self._lock:
+            self.files_scored += 1
+            self.rows_scored += rows
+            self.row_errors += errors
+            self.last_report = report
+
+        logger.info(f"[✓] Fichier évalué: {rows} lignes en {chunks} paquets ({report['seconds']}s, {errors} erreurs)")
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': True,
+                'chunk_size': self.chunk_size,
+                'text_column': self.text_column,
+                'files_scored': self.files_scored,
+                'rows_scored': self.rows_scored,
+                'row_errors': self.row_errors,
+                'yields': self.yields,
+                'last_report': self.last_report
+            }
@@ -0,0 +1,110 @@
+# Exécuteur dédié à l'inférence, hors de la boucle asyncio
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable
+
+from services.threading_config import get_threading_config
+from services.admission_control import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+class InferenceQueueFullError(OverloadedError):
+    """Levée quand la file d'attente de l'exécuteur d'inférence est pleine"""
+    pass
+
+class InferenceExecutor:
+    """Pool de threads borné pour les appels bloquants au modèle"""
+
+    def __init__(self, max_workers: int = None, max_queue: int = None):
+        # Configuration depuis les variables d'environnement
+        self.max_workers = max_workers or get_threading_config().inference_workers
+        self.max_queue = max_queue or int(os.getenv("INFERENCE_MAX_QUEUE", "256"))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0  # Tâches soumises, pas encore démarrées
+        self._active = 0   # Tâches en cours d'exécution
+        self._service_ewma = None  # Durée moyenne (lissée) d'une tâche en secondes
+        self.ewma_alpha = float(os.getenv("INFERENCE_EWMA_ALPHA", "0.2"))
+
+        # Statistiques
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0
+        }
+
+        logger.info(f"[✓] Exécuteur d'inférence: {self.max_workers} workers, file max {self.max_queue}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Soumet une tâche - lève InferenceQueueFullError si la file est pleine"""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.stats['rejected'] += 1
+                raise InferenceQueueFullError(f"File d'inférence pleine ({self._pending} en attente)",
+                                              retry_after=self._estimate_wait_locked())
+            self._pending += 1
+            self.stats['submitted'] += 1
+
+        def tracked():
+            with self._lock:
+                self._pending -= 1
+                self._active += 1
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                with self._lock:
+                    self.stats['completed'] += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.stats['failed'] += 1
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                with self._lock:
+                    self._active -= 1
+                    if self._service_ewma is None:
+                        self._service_ewma = duration
+                    else:
+                        self._service_ewma += self.ewma_alpha * (duration - self._service_ewma)
+
+        return self._executor.submit(tracked)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Exécute la tâche sur le pool et l'attend sans bloquer la boucle asyncio"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _estimate_wait_locked(self, extra_tasks: int = 0) -> float:
+        # Tâches devant une nouvelle tâche, servies par max_workers en parallèle
+        ahead = self._pending + self._active + extra_tasks
+        if not self._service_ewma or ahead < self.max_workers:
+            return 0.0
+        return self._service_ewma * math.ceil((ahead - self.max_workers + 1) / self.max_workers)
+
+    def estimate_wait(self, extra_tasks: int = 0) -> float:
+        """Attente estimée (s) avant le démarrage d'une nouvelle tâche, extra_tasks tâches à venir comprises"""
+        with self._lock:
+            return self._estimate_wait_locked(extra_tasks)
+
+    def shutdown(self):
+        """Arrête le pool après les tâches en cours"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profondeur de file et workers actifs"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._pending,
+                'active_workers': self._active,
+                'task_ms_ewma': round(self._service_ewma * 1000, 2) if self._service_ewma else None,
+                **self.stats
+            }
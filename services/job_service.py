@@ -0,0 +1,363 @@
+# Jobs de scoring asynchrones : file persistante SQLite avec points de reprise par paquet
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from services.admission_control import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,            -- receiving, queued, running, completed, failed, cancelled
+    user_id TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    chunks_total INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,                      -- processus qui traite le job
+    lease_until REAL,                -- au-delà, le job est repris par un autre processus
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    completed_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_chunks (
+    job_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    items TEXT,                      -- lignes à évaluer (JSON), effacées une fois évaluées
+    results TEXT,                    -- point de reprise : NULL tant que le paquet n'est pas évalué
+    PRIMARY KEY (job_id, chunk_index)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+class JobService:
+    """File de jobs de scoring persistée dans SQLite, traitée en arrière-plan par paquets
+
+    Chaque paquet évalué est enregistré avec ses résultats dans la même transaction :
+    après un redémarrage, le job reprend au premier paquet sans résultat. Les paquets sont
+    évalués sur l'exécuteur d'inférence (pool borné partagé avec les requêtes) et le thread
+    de traitement cède la place dès que des requêtes interactives attendent cet exécuteur.
+    """
+
+    def __init__(self, predict_batch_fn: Callable[[List[str]], List[Dict[str, Any]]], db_path: str = None,
+                 chunk_size: int = None, is_busy: Callable[[], bool] = None, executor=None):
+        self.predict_batch_fn = predict_batch_fn
+        self.is_busy = is_busy  # Vrai si le trafic interactif est prioritaire
+        self.executor = executor  # InferenceExecutor : appels au modèle dans le pool borné (sinon sur le thread du job)
+
+        # Configuration depuis les variables d'environnement
+        self.db_path = db_path or os.getenv("JOBS_DB_PATH", "jobs.sqlite3")
+        self.chunk_size = chunk_size or int(os.getenv("JOB_CHUNK_SIZE", "256"))
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+        self.poll_seconds = float(os.getenv("JOB_POLL_SECONDS", "1"))
+        self.yield_seconds = float(os.getenv("JOB_YIELD_MS", "20")) / 1000
+        self.receive_timeout = float(os.getenv("JOB_RECEIVE_TIMEOUT_SECONDS", "300"))
+
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        # Statistiques du processus
+        self.stats = {
+            'chunks_processed': 0,
+            'rows_processed': 0,
+            'jobs_completed': 0,
+            'yields': 0,
+            'resumed_jobs': 0,
+            'abandoned_receptions': 0
+        }
+
+    def start(self):
+        """Démarre le thread de traitement (reprend les jobs inachevés)"""
+        if self._thread is not None:
+            return
+        # Réceptions laissées par un arrêt brutal de ce processus (même hôte et PID, ex: PID 1 d'un conteneur)
+        self._fail_stale_receptions(include_own=True)
+        with self._lock:
+            unfinished = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+        if unfinished:
+            logger.info(f"[-] {unfinished} job(s) à reprendre depuis {self.db_path}")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._worker_loop, name="job-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"[✓] Jobs de scoring: {self.db_path} (paquets de {self.chunk_size})")
+
+    def stop(self):
+        """Arrête le thread après le paquet en cours (le job reprendra au redémarrage)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        with self._lock:
+            # Libère le bail pour une reprise immédiate par le prochain processus
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL WHERE status = 'running' AND owner = ?",
+                    (self.owner,)
+                )
+
+    # Soumission
+
+    def create_job(self, user_id: str = "anonymous") -> str:
+        """Crée un job en réception (ignoré par le traitement jusqu'à finalize_job)"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, user_id, owner, created_at, updated_at) VALUES (?, 'receiving', ?, ?, ?, ?)",
+                (job_id, user_id, self.owner, now, now)
+            )
+        return job_id
+
+    def add_chunk(self, job_id: str, chunk_index: int, items: List[Dict[str, Any]]):
+        """Enregistre un paquet de lignes {"line", "id", "text"} ou {"line", "id", "error"}"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO job_chunks (job_id, chunk_index, items) VALUES (?, ?, ?)",
+                (job_id, chunk_index, json.dumps(items, ensure_ascii=False))
+            )
+            self._conn.execute(
+                "UPDATE jobs SET total = total + ?, chunks_total = chunks_total + 1, updated_at = ? WHERE id = ?",
+                (len(items), time.time(), job_id)
+            )
+
+    def finalize_job(self, job_id: str) -> Dict[str, Any]:
+        """Fin de la réception : le job entre dans la file"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, updated_at = ? WHERE id = ? AND status = 'receiving'",
+                (time.time(), job_id)
+            )
+        return self.get_job(job_id)
+
+    def fail_job(self, job_id: str, error: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def _fail_stale_receptions(self, include_own: bool = False) -> int:
+        """Jobs restés en réception (processus arrêté pendant l'envoi) : échec et paquets supprimés"""
+        now = time.time()
+        with self._lock, self._conn:
+            stale = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'receiving' AND (updated_at < ? OR owner = ?)",
+                (now - self.receive_timeout, self.owner if include_own else None)
+            ).fetchall()]
+            for job_id in stale:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, owner = NULL, updated_at = ? WHERE id = ?",
+                    ("Réception interrompue (processus arrêté pendant l'envoi)", now, job_id)
+                )
+                self._conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (job_id,))
+        if stale:
+            self.stats['abandoned_receptions'] += len(stale)
+            logger.warning(f"[!] {len(stale)} job(s) en réception abandonné(s) marqué(s) en échec")
+        return len(stale)
+
+    def submit_texts(self, texts: List[str], user_id: str = "anonymous") -> Dict[str, Any]:
+        """Crée un job complet à partir d'une liste de textes"""
+        job_id = self.create_job(user_id)
+        for chunk_index, start in enumerate(range(0, len(texts), self.chunk_size)):
+            items = [{"line": start + i + 1, "id": None, "text": text}
+                     for i, text in enumerate(texts[start:start + self.chunk_size])]
+            self.add_chunk(job_id, chunk_index, items)
+        return self.finalize_job(job_id)
+
+    # Consultation
+
+    @staticmethod
+    def _job_to_dict(row) -> Dict[str, Any]:
+        job = {key: row[key] for key in ("status", "user_id", "total", "processed", "errors",
+                                         "chunks_total", "chunks_done", "error")}
+        job["job_id"] = row["id"]
+        job["progress"] = round(row["processed"] / row["total"], 4) if row["total"] else 0.0
+        for key in ("created_at", "updated_at", "completed_at"):
+            job[key] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(row[key])) if row[key] else None
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job_to_dict(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job_to_dict(row) for row in rows]
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Annule un job non terminé (les paquets déjà évalués restent téléchargeables)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('receiving', 'queued', 'running')",
+                (time.time(), job_id)
+            )
+        return cursor.rowcount == 1
+
+    def get_result_chunk(self, job_id: str, after_index: int = -1) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Premier paquet évalué après after_index - (index, lignes) ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunk_index, results FROM job_chunks WHERE job_id = ? AND chunk_index > ? AND results IS NOT NULL "
+                "ORDER BY chunk_index LIMIT 1",
+                (job_id, after_index)
+            ).fetchone()
+        return (row["chunk_index"], json.loads(row["results"])) if row else None
+
+    # Traitement
+
+    def _claim_job(self) -> Optional[str]:
+        """Réserve le job le plus ancien (file, ou bail expiré d'un processus arrêté)"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, status, owner FROM jobs WHERE (status = 'running' AND owner = ?) OR status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY status = 'running' AND owner = ? DESC, created_at LIMIT 1",
+                (self.owner, now, self.owner)
+            ).fetchone()
+            if row is None:
+                return None
+
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ? WHERE id = ? "
+                "AND (status = 'queued' OR (status = 'running' AND (owner = ? OR lease_until < ?)))",
+                (self.owner, now + self.lease_seconds, row["id"], self.owner, now)
+            )
+            if cursor.rowcount != 1:
+                return None
+            if row["status"] == "running" and row["owner"] != self.owner:
+                self.stats['resumed_jobs'] += 1
+                logger.info(f"[-] Reprise du job {row['id']} (précédemment {row['owner']})")
+            return row["id"]
+
+    def _score_items(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Évalue les lignes valides d'un paquet - retourne (lignes de résultat, nombre d'erreurs)"""
+        valid = [item for item in items if "error" not in item]
+        try:
+            results = self._predict([item["text"] for item in valid]) if valid else []
+            for item, result in zip(valid, results):
+                if result.get("error"):
+                    item["error"] = result["error"]
+                else:
+                    item["sentiment"] = result["sentiment"]
+                    item["confidence"] = result["confidence"]
+                    item["raw_score"] = result.get("raw_score")
+        except OverloadedError:
+            raise  # File d'inférence pleine : paquet non évalué, repris au prochain tour
+        except Exception as e:
+            logger.error(f"Erreur scoring job: {e}")
+            for item in valid:
+                item["error"] = f"Erreur: {str(e)}"
+
+        for item in items:
+            item.pop("text", None)
+        return items, sum(1 for item in items if "error" in item)
+
+    def _predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Appel au modèle sur l'exécuteur d'inférence (lève InferenceQueueFullError si sa file est pleine)"""
+        if self.executor is None:
+            return self.predict_batch_fn(texts)
+        return self.executor.submit(self.predict_batch_fn, texts).result()
+
+    def _process_next_chunk(self, job_id: str) -> bool:
+        """Évalue le prochain paquet du job - False quand le job est terminé ou n'est plus à ce processus"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunk_index, items FROM job_chunks WHERE job_id = ? AND results IS NULL ORDER BY chunk_index LIMIT 1",
+                (job_id,)
+            ).fetchone()
+
+        if row is None:
+            now = time.time()
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'completed', completed_at = ?, updated_at = ?, owner = NULL, lease_until = NULL "
+                    "WHERE id = ? AND status = 'running' AND owner = ?",
+                    (now, now, job_id, self.owner)
+                )
+            if cursor.rowcount == 1:
+                self.stats['jobs_completed'] += 1
+                logger.info(f"[✓] Job {job_id} terminé")
+            return False
+
+        rows, errors = self._score_items(json.loads(row["items"]))
+
+        # Résultats et progression dans la même transaction : point de reprise atomique
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET processed = processed + ?, errors = errors + ?, chunks_done = chunks_done + 1, "
+                "updated_at = ?, lease_until = ? WHERE id = ? AND status = 'running' AND owner = ?",
+                (len(rows), errors, now, now + self.lease_seconds, job_id, self.owner)
+            )
+            if cursor.rowcount != 1:
+                return False  # Annulé ou repris ailleurs : résultat abandonné
+            self._conn.execute(
+                "UPDATE job_chunks SET results = ?, items = NULL WHERE job_id = ? AND chunk_index = ?",
+                (json.dumps(rows, ensure_ascii=False), job_id, row["chunk_index"])
+            )
+
+        self.stats['chunks_processed'] += 1
+        self.stats['rows_processed'] += len(rows)
+        return True
+
+    def _worker_loop(self):
+        """Traite les jobs paquet par paquet, en laissant la priorité au trafic interactif"""
+        job_id = None
+        while not self._stop_event.is_set():
+            try:
+                if self.is_busy is not None and self.is_busy():
+                    self.stats['yields'] += 1
+                    self._stop_event.wait(self.yield_seconds)
+                    continue
+
+                if job_id is None:
+                    job_id = self._claim_job()
+                    if job_id is None:
+                        self._fail_stale_receptions()
+                        self._stop_event.wait(self.poll_seconds)
+                        continue
+
+                if not self._process_next_chunk(job_id):
+                    job_id = None
+            except OverloadedError:
+                # Exécuteur saturé par le trafic interactif : même paquet après une courte pause
+                self.stats['yields'] += 1
+                self._stop_event.wait(self.yield_seconds)
+            except Exception as e:
+                logger.error(f"[X] Erreur du traitement des jobs: {e}")
+                job_id = None
+                self._stop_event.wait(self.poll_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Jobs par statut et compteurs du processus"""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            'db_path': self.db_path,
+            'chunk_size': self.chunk_size,
+            'jobs_by_status': counts,
+            **self.stats
+        }
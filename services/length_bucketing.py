@@ -0,0 +1,56 @@
+# Regroupement des séquences par longueur (évite de padder chaque texte à max_len)
+import os
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class LengthBucketer:
+    """Répartit les séquences dans des paliers de longueur exécutés séparément"""
+
+    def __init__(self, buckets: List[int] = None):
+        if buckets is None:
+            buckets = [int(b) for b in os.getenv("INFERENCE_BUCKETS", "16,32,64").split(",") if b.strip()]
+        self.buckets = sorted(set(b for b in buckets if b > 0))
+        self._lock = threading.Lock()
+
+        # Statistiques : lignes par palier et pas de temps LSTM évités
+        self.rows_per_bucket = defaultdict(int)
+        self.steps_saved = 0
+        self.steps_total = 0
+
+    def bucket_lengths(self, max_len: int) -> List[int]:
+        """Paliers effectifs pour un max_len donné (max_len est toujours le dernier)"""
+        return [b for b in self.buckets if b < max_len] + [max_len]
+
+    def bucket_for(self, length: int, max_len: int) -> int:
+        """Plus petit palier contenant la séquence (tronquée à max_len)"""
+        length = min(max(length, 1), max_len)
+        for bucket in self.buckets:
+            if length <= bucket < max_len:
+                return bucket
+        return max_len
+
+    def group(self, sequences: List[List[int]], max_len: int) -> Dict[int, List[int]]:
+        """Indices des séquences regroupés par palier, triés par longueur de palier"""
+        groups = defaultdict(list)
+        for i, sequence in enumerate(sequences):
+            groups[self.bucket_for(len(sequence), max_len)].append(i)
+
+        with self._lock:
+            for bucket, indices in groups.items():
+                self.rows_per_bucket[bucket] += len(indices)
+                self.steps_saved += (max_len - bucket) * len(indices)
+            self.steps_total += max_len * len(sequences)
+
+        return dict(sorted(groups.items()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'buckets': self.buckets,
+                'rows_per_bucket': {str(k): v for k, v in sorted(self.rows_per_bucket.items())},
+                'lstm_steps_saved_ratio': round(self.steps_saved / self.steps_total, 4) if self.steps_total else 0.0
+            }
@@ -0,0 +1,226 @@
+# Métriques locales au format texte Prometheus (sans service externe ni dépendance)
+import os
+import math
+import time
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Tuple
+
+from services.prefork_server import get_process_info
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Étiquettes ajoutées à chaque échantillon : modèle servi et worker pré-fork
+_constant_labels = {'model_run_id': "unknown"}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+def set_model_run_id(model_run_id: str):
+    """Modèle servi : étiquette model_run_id des observations suivantes"""
+    _constant_labels['model_run_id'] = model_run_id or "unknown"
+
+# Identifiant du worker, lu une fois par processus (remis à zéro dans chaque enfant forké)
+_worker_label = None
+
+def _reset_worker_label():
+    global _worker_label
+    _worker_label = None
+
+os.register_at_fork(after_in_child=_reset_worker_label)
+
+def _constant() -> Dict[str, str]:
+    # Sous pré-fork, chaque worker a ses propres compteurs : l'étiquette worker les distingue
+    global _worker_label
+    if _worker_label is None:
+        worker_id = get_process_info()['worker_id']
+        _worker_label = str(worker_id) if worker_id is not None else "0"
+    return {**_constant_labels, 'worker': _worker_label}
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Série de valeurs indexées par étiquettes (celles de l'appel + model_run_id courant)"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple:
+        # model_run_id explicite : observation d'un autre modèle que celui servi par défaut (registre)
+        model_run_id = labels.get('model_run_id') or _constant_labels['model_run_id']
+        return tuple(str(labels.get(name, "")) for name in self.labelnames) + (model_run_id,)
+
+    def _labels(self, key: Tuple) -> Dict[str, str]:
+        labels = dict(zip(self.labelnames, key[:-1]))
+        labels['model_run_id'] = key[-1]
+        return labels
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    samples = Counter.samples
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, 'le': _format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """Métriques alimentées par le code (compteurs, histogrammes) et collectées à la lecture (statistiques des services)"""
+
+    def __init__(self, prefix: str = "tweet_api_"):
+        self.prefix = prefix
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple]]] = []
+
+    def _add(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(self.prefix + name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(self.prefix + name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(self.prefix + name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple]]):
+        """collector() -> (nom, type, aide, [(étiquettes, valeur), ...]) par famille, lu à chaque export"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Export au format texte Prometheus 0.0.4"""
+        constant = _constant()
+        lines = []
+
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels({**labels, 'worker': constant['worker']})} {_format_value(value)}")
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                name = self.prefix + name
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels({**labels, **constant})} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# Métriques alimentées par le chemin de requête
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP par endpoint", ("method", "endpoint", "status")
+)
+INFERENCE_BATCH_SIZE = REGISTRY.histogram(
+    "inference_batch_size", "Textes par appel de scoring (après micro-batching)", buckets=BATCH_SIZE_BUCKETS
+)
+INFERENCE_MODEL_ROWS = REGISTRY.histogram(
+    "inference_model_rows", "Lignes réellement évaluées par le modèle (après cache et doublons)", buckets=BATCH_SIZE_BUCKETS
+)
+INFERENCE_MODEL_DURATION = REGISTRY.histogram(
+    "inference_model_duration_seconds", "Durée des passes avant du modèle (padding compris)"
+)
+TELEMETRY_EVENTS = REGISTRY.counter(
+    "telemetry_events_total", "Événements Application Insights par résultat (sent, failed, skipped)", ("event", "outcome")
+)
+
+class MetricsMiddleware:
+    """Middleware ASGI : durée de chaque requête, étiquetée par gabarit de route (cardinalité bornée)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route renseignée par le routeur FastAPI ; chemins inconnus regroupés (robots, scans)
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                endpoint=getattr(route, "path", None) or "unmatched",
+                status=status[0]
+            )
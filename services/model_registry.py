@@ -0,0 +1,261 @@
+# Registre multi-modèles : runs MLflow chargés à la demande, éviction LRU sous un budget mémoire
+import os
+import gc
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ModelNotAllowedError(Exception):
+    """Run demandé absent de MODEL_RUN_IDS"""
+    pass
+
+class ModelLoadError(Exception):
+    """Chargement d'un run échoué (artifacts absents, DagsHub indisponible)"""
+    pass
+
+class ModelEntry:
+    """Modèle chargé : service (tokenizer, max_len, cache) et file de micro-batching propres"""
+
+    def __init__(self, run_id: str, service, executor, scheduler=None, pinned: bool = False):
+        self.run_id = run_id
+        self.service = service
+        self.executor = executor
+        self.scheduler = scheduler
+        self.pinned = pinned  # Modèle par défaut : jamais évincé
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.requests = 0
+        self.evicted = False
+        self._lock = threading.Lock()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+        self.requests += 1
+
+    def submit(self, text: str) -> Future:
+        """Prédiction d'un texte (micro-batching, ou appel direct si le modèle vient d'être évincé)"""
+        with self._lock:
+            if self.scheduler is not None and not self.evicted:
+                return self.scheduler.submit(text)
+        # Le service reste référencé par l'appelant : la requête se termine sur l'ancien modèle
+        return self.executor.submit(self.service.predict, text)
+
+    def close(self):
+        """Éviction : la file sert encore les requêtes déjà soumises puis s'arrête"""
+        with self._lock:
+            self.evicted = True
+        if self.scheduler is not None and not self.pinned:
+            self.scheduler.stop()
+        if self.service.prediction_cache is not None:
+            self.service.prediction_cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'pinned': self.pinned,
+            'backend': self.service.inference_engine_name,
+            'memory_mb': round(self.service.memory_footprint_bytes() / 1024 / 1024, 1),
+            'load_seconds': round(self.service.load_seconds, 2) if self.service.load_seconds is not None else None,
+            'idle_seconds': round(time.monotonic() - self.last_used, 1),
+            'requests': self.requests,
+            'queue_depth': self.scheduler.queue_depth() if self.scheduler is not None else 0
+        }
+
+class ModelRegistry:
+    """Sert plusieurs runs MLflow côte à côte, sélectionnés par requête (tests A/B, modèles par client)
+
+    Le modèle par défaut (MODEL_RUN_ID) est épinglé. Les runs de MODEL_RUN_IDS sont chargés à leur
+    première requête (un seul chargement pour les requêtes simultanées) ; au-delà du budget
+    MODEL_MEMORY_BUDGET_MB, les modèles les moins récemment utilisés sont évincés.
+    """
+
+    def __init__(self, default_service, executor, default_scheduler=None, allowed_run_ids: List[str] = None,
+                 memory_budget_mb: float = None, micro_batching: bool = True, service_factory=None):
+        self.executor = executor
+        self.micro_batching = micro_batching
+        self.default_run_id = default_service.model_run_id
+
+        # Fabrique du service d'un run (DagsHubService(model_run_id) par défaut)
+        if service_factory is None:
+            from services.dagshub_service import DagsHubService
+            service_factory = DagsHubService
+        self.service_factory = service_factory
+
+        # Configuration depuis les variables d'environnement
+        if allowed_run_ids is None:
+            allowed_run_ids = [run_id.strip() for run_id in os.getenv("MODEL_RUN_IDS", "").split(",") if run_id.strip()]
+        self.configured_run_ids = list(allowed_run_ids)
+        self.allowed_run_ids = [run_id for run_id in allowed_run_ids if run_id != self.default_run_id]
+        budget_mb = memory_budget_mb if memory_budget_mb is not None else float(os.getenv("MODEL_MEMORY_BUDGET_MB", "2048"))
+        self.memory_budget = int(budget_mb * 1024 * 1024)
+
+        self._entries = {}  # run_id -> ModelEntry, ordre d'insertion sans importance (last_used fait foi)
+        self._loading = {}  # run_id -> Future du chargement en cours
+        self._sizes = {}    # run_id -> dernière mémoire mesurée (éviction anticipée avant rechargement)
+        self._lock = threading.Lock()
+
+        self._entries[self.default_run_id] = ModelEntry(
+            self.default_run_id, default_service, executor, default_scheduler, pinned=True
+        )
+
+        # Statistiques
+        self.stats = {
+            'hits': 0,
+            'loads': 0,
+            'load_failures': 0,
+            'evictions': 0
+        }
+
+    def is_allowed(self, run_id: str) -> bool:
+        return run_id == self.default_run_id or run_id in self.allowed_run_ids
+
+    def peek(self, run_id: str) -> Optional[ModelEntry]:
+        """Modèle déjà chargé (marqué comme utilisé), sans attente - None sinon"""
+        with self._lock:
+            entry = self._entries.get(run_id)
+            if entry is not None:
+                entry.touch()
+                self.stats['hits'] += 1
+            return entry
+
+    def get(self, run_id: str) -> ModelEntry:
+        """Modèle du run, chargé si besoin (bloquant) - lève ModelNotAllowedError ou ModelLoadError"""
+        entry = self.peek(run_id)
+        if entry is not None:
+            return entry
+        if not self.is_allowed(run_id):
+            raise ModelNotAllowedError(f"Modèle non autorisé: {run_id} (MODEL_RUN_IDS)")
+
+        with self._lock:
+            loading = self._loading.get(run_id)
+            leader = loading is None
+            if leader:
+                loading = self._loading[run_id] = Future()
+        if not leader:
+            # Chargement déjà lancé par une autre requête
+            entry = loading.result()
+            entry.touch()
+            return entry
+
+        try:
+            entry = self._load(run_id)
+        except Exception as e:
+            error = e if isinstance(e, ModelLoadError) else ModelLoadError(f"Chargement du modèle {run_id} échoué: {e}")
+            with self._lock:
+                del self._loading[run_id]
+                self.stats['load_failures'] += 1
+            loading.set_exception(error)
+            raise error
+
+        with self._lock:
+            self._entries[run_id] = entry
+            del self._loading[run_id]
+            self._sizes[run_id] = entry.service.memory_footprint_bytes()
+            evicted = self._select_evictions(keep=run_id)
+        self._close(evicted)
+
+        entry.touch()
+        loading.set_result(entry)
+        return entry
+
+    def _load(self, run_id: str) -> ModelEntry:
+        # Place libérée avant le chargement si la taille du run est connue (chargé puis évincé)
+        with self._lock:
+            evicted = self._select_evictions(keep=None, incoming=self._sizes.get(run_id, 0))
+        self._close(evicted)
+
+        logger.info(f"[-] Chargement du modèle {run_id}...")
+        try:
+            service = self.service_factory(run_id)
+        except TypeError as e:
+            # Ni artifacts locaux ni DAGSHUB_USERNAME/DAGSHUB_TOKEN : la configuration MLflow reçoit None
+            logger.error(f"[X] Modèle {run_id} non chargeable: {e}")
+            raise ModelLoadError(f"Modèle {run_id} indisponible : identifiants DagsHub absents pour le run {run_id} "
+                                 f"(DAGSHUB_USERNAME, DAGSHUB_TOKEN) et aucun artifact local (MODEL_ARTIFACTS_DIR/{run_id})")
+        # Le modèle fallback n'est pas servi pour un run explicitement demandé
+        if not service.load_model():
+            raise ModelLoadError(f"Modèle {run_id} introuvable ou illisible")
+
+        scheduler = None
+        if self.micro_batching:
+            from services.batching_service import MicroBatchScheduler
+            scheduler = MicroBatchScheduler(service.predict_batch, executor=self.executor)
+            scheduler.start()
+
+        with self._lock:
+            self.stats['loads'] += 1
+        logger.info(f"[✓] Modèle {run_id} chargé en {service.load_seconds:.1f}s "
+                    f"({service.memory_footprint_bytes() / 1024 / 1024:.0f} Mo estimés)")
+        return ModelEntry(run_id, service, self.executor, scheduler)
+
+    def _select_evictions(self, keep: Optional[str], incoming: int = 0) -> List[ModelEntry]:
+        """Retire du registre les modèles les moins récemment utilisés jusqu'à repasser sous le budget (verrou tenu)"""
+        used = sum(entry.service.memory_footprint_bytes() for entry in self._entries.values()) + incoming
+        candidates = sorted(
+            (entry for entry in self._entries.values() if not entry.pinned and entry.run_id != keep),
+            key=lambda entry: entry.last_used
+        )
+
+        evicted = []
+        for entry in candidates:
+            if used <= self.memory_budget:
+                break
+            used -= entry.service.memory_footprint_bytes()
+            del self._entries[entry.run_id]
+            evicted.append(entry)
+            self.stats['evictions'] += 1
+
+        if used > self.memory_budget and keep is not None:
+            logger.warning(f"[!] Budget mémoire des modèles dépassé ({used / 1024 / 1024:.1f} Mo > "
+                           f"{self.memory_budget / 1024 / 1024:.1f} Mo) : aucun autre modèle évinçable")
+        return evicted
+
+    def _close(self, evicted: List[ModelEntry]):
+        """Arrête les files des modèles évincés (hors verrou) et libère leurs poids"""
+        for entry in evicted:
+            logger.info(f"[-] Modèle {entry.run_id} évincé (inutilisé depuis {time.monotonic() - entry.last_used:.0f}s)")
+            entry.close()
+        if evicted:
+            gc.collect()  # Cycles des modèles Keras : mémoire rendue sans attendre le prochain passage du GC
+
+    def set_default(self, service):
+        """Nouveau modèle par défaut (rechargement à chaud) : il reprend la file de micro-batching du précédent"""
+        with self._lock:
+            previous = self._entries.pop(self.default_run_id)
+            self.default_run_id = service.model_run_id
+            self.allowed_run_ids = [run_id for run_id in self.configured_run_ids if run_id != self.default_run_id]
+            # Run déjà chargé comme modèle supplémentaire : remplacé par le snapshot publié
+            replaced = self._entries.pop(self.default_run_id, None)
+            self._entries[self.default_run_id] = ModelEntry(
+                self.default_run_id, service, self.executor, previous.scheduler, pinned=True
+            )
+        if replaced is not None:
+            self._close([replaced])
+
+    def shutdown(self):
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if not entry.pinned]
+            self._entries = {run_id: entry for run_id, entry in self._entries.items() if entry.pinned}
+        for entry in entries:
+            entry.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries.values())
+            loading = list(self._loading)
+            stats = dict(self.stats)
+        models = [entry.get_stats() for entry in entries]
+        return {
+            'enabled': True,
+            'default_run_id': self.default_run_id,
+            'allowed_run_ids': self.allowed_run_ids,
+            'memory_budget_mb': round(self.memory_budget / 1024 / 1024, 1),
+            'memory_used_mb': round(sum(model['memory_mb'] for model in models), 1),
+            'loaded': models,
+            'loading': loading,
+            **stats
+        }
@@ -0,0 +1,177 @@
+# Rechargement à chaud du modèle servi : snapshot complet construit en arrière-plan, bascule atomique, retour arrière
+import math
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ReloadInProgressError(Exception):
+    """Un rechargement est déjà en cours"""
+    pass
+
+class RollbackUnavailableError(Exception):
+    """Aucun snapshot précédent à restaurer"""
+    pass
+
+class ModelSwapper:
+    """Remplace le service servi sans interruption
+
+    Un snapshot est un DagsHubService complet (modèle, tokenizer, configuration, cache) : il est
+    chargé, sa configuration attendue, préchauffé puis validé sur le corpus de référence avant
+    d'être publié. La bascule est une seule affectation de référence (activate_fn) : chaque appel
+    au modèle lit la référence une fois et voit l'ancien ou le nouveau snapshot, jamais un mélange.
+    Le snapshot remplacé reste chargé pour un retour arrière immédiat.
+    """
+
+    def __init__(self, get_current: Callable[[], Any], activate_fn: Callable[[Any], None], service_factory=None):
+        # Lecture du service servi et publication d'un nouveau service (ex: variable globale de main)
+        self.get_current = get_current
+        self.activate_fn = activate_fn
+
+        if service_factory is None:
+            from services.dagshub_service import DagsHubService
+            service_factory = DagsHubService
+        self.service_factory = service_factory
+
+        self.previous = None  # Snapshot remplacé, conservé pour le retour arrière
+        self._thread = None
+        self._swap_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+        # État du dernier rechargement
+        self.status = "idle"  # idle, loading, validating, swapped, failed
+        self.last_report = None
+        self.stats = {
+            'reloads': 0,
+            'swaps': 0,
+            'failures': 0,
+            'rollbacks': 0
+        }
+
+    def reload(self, run_id: str = None, min_agreement: float = None) -> Dict[str, Any]:
+        """Lance la construction d'un snapshot en arrière-plan - lève ReloadInProgressError"""
+        with self._state_lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise ReloadInProgressError(f"Rechargement déjà en cours ({self.status})")
+            run_id = run_id or self.get_current().model_run_id
+            self.status = "loading"
+            self.last_report = {'run_id': run_id, 'started_at': datetime.utcnow().isoformat(), 'status': self.status}
+            self.stats['reloads'] += 1
+            self._thread = threading.Thread(
+                target=self._reload, args=(run_id, min_agreement), name="model-reload", daemon=True
+            )
+            self._thread.start()
+            return dict(self.last_report)
+
+    def _reload(self, run_id: str, min_agreement: Optional[float]):
+        start = time.perf_counter()
+        report = self.last_report
+        try:
+            service = self.service_factory(run_id)
+            # Caches sur disque indexés par run_id et non par version des artifacts : un rechargement
+            # (artifacts mis à jour) repart toujours du modèle Keras, sans lire ni réécrire ces fichiers
+            service.numpy_engine_path = None
+            service.tflite_model_dir = None
+            if not service.load_model():
+                raise ValueError("Chargement échoué (le modèle fallback n'est pas publié)")
+
+            # Configuration complète avant publication : le snapshot n'est plus modifié ensuite
+            config_status = service.wait_for_config()
+            if config_status == "loading":
+                raise ValueError("Configuration toujours en cours de chargement")
+            report['config_status'] = config_status
+
+            # Formes préchauffées avec le max_len définitif
+            self._set_status("validating")
+            service.warmup_inference()
+            if service.warmup_status != "ready":
+                raise ValueError("Préchauffage échoué")
+
+            report['validation'] = self._validate(service, self.get_current(), min_agreement)
+        except Exception as e:
+            with self._state_lock:
+                self.stats['failures'] += 1
+            report['error'] = str(e)
+            report['seconds'] = round(time.perf_counter() - start, 2)
+            self._set_status("failed")
+            logger.error(f"[X] Rechargement du modèle {run_id} refusé: {e}")
+            return
+
+        self._swap(service)
+        report['seconds'] = round(time.perf_counter() - start, 2)
+        report['swapped_at'] = datetime.utcnow().isoformat()
+        self._set_status("swapped")
+        logger.info(f"[✓] Modèle {run_id} publié en {report['seconds']}s (snapshot précédent conservé)")
+
+    @staticmethod
+    def _validate(service, current, min_agreement: Optional[float]) -> Dict[str, Any]:
+        """Corpus de référence : aucune erreur, scores valides ; accord avec le modèle servi (seuil optionnel)"""
+        from services.reference_corpus import load_reference_texts
+
+        texts = load_reference_texts()
+        results = service.predict_batch(texts)
+        errors = [result["error"] for result in results if result.get("error")]
+        if errors:
+            raise ValueError(f"{len(errors)} erreurs sur le corpus de référence: {errors[0]}")
+        invalid = [result for result in results if not (math.isfinite(result["raw_score"]) and 0.0 <= result["raw_score"] <= 1.0)]
+        if invalid:
+            raise ValueError(f"{len(invalid)} scores invalides sur le corpus de référence")
+
+        report = {'samples': len(results)}
+        if current is not None and current.model is not None:
+            reference = current.predict_batch(texts)
+            agreement = sum(a["sentiment"] == b["sentiment"] for a, b in zip(reference, results)) / len(results)
+            report['label_agreement'] = round(agreement, 4)
+            report['min_agreement'] = min_agreement
+            if min_agreement is not None and agreement < min_agreement:
+                raise ValueError(f"Accord avec le modèle servi {agreement:.2%} < {min_agreement:.2%}")
+        return report
+
+    def _swap(self, service):
+        """Bascule atomique : le snapshot servi devient le snapshot précédent"""
+        with self._swap_lock:
+            # L'avant-dernier snapshot n'est plus référencé : libéré par le ramasse-miettes
+            self.previous = self.get_current()
+            self.activate_fn(service)
+            with self._state_lock:
+                self.stats['swaps'] += 1
+
+    def rollback(self) -> Dict[str, Any]:
+        """Restaure immédiatement le snapshot précédent (qui devient à son tour le précédent)"""
+        with self._swap_lock:
+            if self.previous is None:
+                raise RollbackUnavailableError("Aucun snapshot précédent à restaurer")
+            restored, self.previous = self.previous, self.get_current()
+            self.activate_fn(restored)
+            with self._state_lock:
+                self.stats['rollbacks'] += 1
+        logger.info(f"[✓] Retour arrière : modèle {restored.model_run_id} restauré")
+        return self.get_stats()
+
+    def _set_status(self, status: str):
+        with self._state_lock:
+            self.status = status
+            self.last_report['status'] = status
+
+    def _describe(self, service) -> Optional[Dict[str, Any]]:
+        if service is None:
+            return None
+        return {
+            'run_id': service.model_run_id,
+            'model_info': service.model_info,
+            'backend': service.inference_engine_name,
+            'config_status': service.config_loading_status
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._state_lock:
+            return {
+                'status': self.status,
+                'current': self._describe(self.get_current()),
+                'previous': self._describe(self.previous),
+                'last_reload': dict(self.last_report) if self.last_report else None,
+                **self.stats
+            }
@@ -0,0 +1,99 @@
+# Négociation MessagePack : corps de requête décodé avant validation, réponses encodées selon l'en-tête Accept
+import logging
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+# Dépendance optionnelle : sans le paquet, seul JSON est servi (corps MessagePack refusés en 415)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+def _media_type(value: Optional[str]) -> str:
+    return (value or "").split(";")[0].strip().lower()
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return _media_type(content_type) in MSGPACK_MEDIA_TYPES
+
+def wants_msgpack(request: Request) -> bool:
+    """MessagePack préféré à JSON dans l'en-tête Accept (qualité supérieure ou égale)"""
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept")
+    if not accept or "msgpack" not in accept:
+        return False
+
+    msgpack_q = json_q = 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in ("application/json", "application/*", "*/*"):
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+def _default(value: Any) -> Any:
+    """Types NumPy convertis comme par orjson (OPT_SERIALIZE_NUMPY)"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en MessagePack: {type(value).__name__}")
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=_default)
+
+class MsgPackResponse(Response):
+    """Réponse MessagePack (flottants en float64 : mêmes valeurs que la réponse JSON)"""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+class MsgPackRoute(APIRoute):
+    """Route acceptant un corps MessagePack : décodé puis validé par le même modèle Pydantic que le JSON"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                request = await _as_decoded_request(request)
+            return await handler(request)
+
+        return route_handler
+
+async def _as_decoded_request(request: Request) -> Request:
+    """Requête équivalente dont le corps est déjà décodé (FastAPI le lit alors comme un corps JSON)"""
+    if msgpack is None:
+        raise HTTPException(status_code=415, detail="MessagePack non disponible sur ce serveur (paquet msgpack absent)")
+
+    body = await request.body()
+    try:
+        decoded = msgpack.unpackb(body, raw=False) if body else None
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Corps MessagePack invalide: {e}")
+
+    scope = dict(request.scope)
+    scope["headers"] = [(name, value) for name, value in request.scope["headers"] if name != b"content-type"]
+    scope["headers"].append((b"content-type", b"application/json"))
+    decoded_request = Request(scope, request.receive)
+    decoded_request._body = body
+    decoded_request._json = decoded
+    return decoded_request
@@ -0,0 +1,334 @@
+# Moteur d'inférence LSTM en NumPy pur (sans TensorFlow au service)
+import json
+import logging
+import numpy as np
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    """Sigmoïde numériquement stable"""
+    return np.exp(-np.logaddexp(0.0, -x)).astype(np.float32, copy=False)
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    """Sigmoïde linéaire par morceaux (définition Keras)"""
+    return np.clip(x / 6.0 + 0.5, 0.0, 1.0).astype(np.float32, copy=False)
+
+_ACTIVATIONS = {
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'tanh': np.tanh,
+    'linear': lambda x: x
+}
+
+# Quantification post-entraînement des poids les plus volumineux (embedding et kernels LSTM)
+_QUANTIZATION_DTYPES = {None: np.float32, 'float16': np.float16, 'int8': np.int8}
+_QUANTIZED_WEIGHTS = (('embedding', 1), ('kernel', 0), ('recurrent_kernel', 0))  # (poids, axe réduit pour l'échelle)
+
+def quantize_weights(weights: np.ndarray, mode: str, axis: int):
+    """float16 : conversion directe ; int8 : symétrique par ligne/colonne - retourne (poids, échelle ou None)"""
+    if mode == 'float16':
+        return weights.astype(np.float16), None
+    if mode == 'int8':
+        scale = np.max(np.abs(weights), axis=axis) / 127.0
+        scale = np.where(scale == 0, 1.0, scale).astype(np.float32)
+        quantized = np.clip(np.rint(weights / np.expand_dims(scale, axis)), -127, 127).astype(np.int8)
+        return quantized, scale
+    raise ValueError(f"Mode de quantification inconnu: {mode}")
+
+def pad_sequences_post(sequences: List[List[int]], max_len: int) -> np.ndarray:
+    """Équivalent de pad_sequences(padding='post', truncating='post') en int32"""
+    padded = np.zeros((len(sequences), max_len), dtype=np.int32)
+    for i, sequence in enumerate(sequences):
+        truncated = sequence[:max_len]
+        padded[i, :len(truncated)] = truncated
+    return padded
+
+class NumpyTokenizer:
+    """Réimplémentation de texts_to_sequences du Tokenizer Keras à partir de sa configuration exportée"""
+
+    def __init__(self, word_index: Dict[str, int], num_words: int = None, oov_token: str = None,
+                 filters: str = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n', lower: bool = True, split: str = ' '):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self._translate_table = str.maketrans({c: split for c in filters})
+
+    @classmethod
+    def from_keras_tokenizer(cls, tokenizer) -> "NumpyTokenizer":
+        """Extrait la configuration utile d'un Tokenizer Keras"""
+        if getattr(tokenizer, 'char_level', False):
+            raise ValueError("Tokenizer char_level non supporté")
+        return cls(
+            word_index=dict(tokenizer.word_index),
+            num_words=tokenizer.num_words,
+            oov_token=tokenizer.oov_token,
+            filters=tokenizer.filters,
+            lower=tokenizer.lower,
+            split=tokenizer.split
+        )
+
+    def to_config(self) -> Dict[str, Any]:
+        return {
+            'word_index': self.word_index,
+            'num_words': self.num_words,
+            'oov_token': self.oov_token,
+            'filters': self.filters,
+            'lower': self.lower,
+            'split': self.split
+        }
+
+    def text_to_word_sequence(self, text: str) -> List[str]:
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self._translate_table).split(self.split) if word]
+
+    def texts_to_sequences(self, texts: List[str]) -> List[List[int]]:
+        oov_index = self.word_index.get(self.oov_token) if self.oov_token is not None else None
+        sequences = []
+        for text in texts:
+            vector = []
+            for word in self.text_to_word_sequence(text):
+                index = self.word_index.get(word)
+                if index is not None:
+                    if self.num_words and index >= self.num_words:
+                        if oov_index is not None:
+                            vector.append(oov_index)
+                    else:
+                        vector.append(index)
+                elif oov_index is not None:
+                    vector.append(oov_index)
+            sequences.append(vector)
+        return sequences
+
+class NumpyLSTMEngine:
+    """Passe avant Embedding -> LSTM -> Dense(sigmoid) vectorisée en NumPy float32"""
+
+    def __init__(self, embedding: np.ndarray, kernel: np.ndarray, recurrent_kernel: np.ndarray,
+                 bias: np.ndarray, dense_kernel: np.ndarray, dense_bias: np.ndarray, mask_zero: bool = False,
+                 activation: str = 'tanh', recurrent_activation: str = 'sigmoid', dense_activation: str = 'sigmoid',
+                 quantization: str = None, scales: Dict[str, np.ndarray] = None):
+        for name in (activation, recurrent_activation, dense_activation):
+            if name not in _ACTIVATIONS:
+                raise ValueError(f"Activation non supportée: {name}")
+        if quantization not in _QUANTIZATION_DTYPES:
+            raise ValueError(f"Mode de quantification inconnu: {quantization}")
+
+        # Embedding et kernels LSTM éventuellement quantifiés (float16 / int8 + échelles float32)
+        weight_dtype = _QUANTIZATION_DTYPES[quantization]
+        self.quantization = quantization
+        self.embedding = np.ascontiguousarray(embedding, dtype=weight_dtype)
+        self.kernel = np.ascontiguousarray(kernel, dtype=weight_dtype)
+        self.recurrent_kernel = np.ascontiguousarray(recurrent_kernel, dtype=weight_dtype)
+        self.scales = {name: np.ascontiguousarray(scale, dtype=np.float32) for name, scale in (scales or {}).items()}
+        self.bias = np.ascontiguousarray(bias, dtype=np.float32)
+        self.dense_kernel = np.ascontiguousarray(dense_kernel, dtype=np.float32)
+        self.dense_bias = np.ascontiguousarray(dense_bias, dtype=np.float32)
+
+        self.mask_zero = bool(mask_zero)
+        self.activation = activation
+        self.recurrent_activation = recurrent_activation
+        self.dense_activation = dense_activation
+        self.units = self.recurrent_kernel.shape[0]
+        self.stats = {'invocations': 0}
+
+    @property
+    def input_shape(self):
+        """Compatibilité avec model.input_shape de Keras (health check)"""
+        return (None, None)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les poids"""
+        weights = (self.embedding, self.kernel, self.recurrent_kernel, self.bias, self.dense_kernel, self.dense_bias)
+        return sum(w.nbytes for w in weights) + sum(scale.nbytes for scale in self.scales.values())
+
+    def quantize(self, mode: str) -> "NumpyLSTMEngine":
+        """Copie du moteur avec l'embedding et les kernels LSTM quantifiés ('float16' ou 'int8')"""
+        if self.quantization is not None:
+            raise ValueError(f"Moteur déjà quantifié ({self.quantization})")
+
+        weights, scales = {}, {}
+        for name, axis in _QUANTIZED_WEIGHTS:
+            weights[name], scale = quantize_weights(getattr(self, name), mode, axis)
+            if scale is not None:
+                scales[name] = scale
+
+        return NumpyLSTMEngine(
+            bias=self.bias,
+            dense_kernel=self.dense_kernel,
+            dense_bias=self.dense_bias,
+            mask_zero=self.mask_zero,
+            activation=self.activation,
+            recurrent_activation=self.recurrent_activation,
+            dense_activation=self.dense_activation,
+            quantization=mode,
+            scales=scales,
+            **weights
+        )
+
+    def _float_kernel(self, name: str) -> np.ndarray:
+        """Kernel LSTM en float32 (déquantifié à chaque appel : quelques centaines de Ko au plus)"""
+        weights = getattr(self, name)
+        if self.quantization is None:
+            return weights
+        weights = weights.astype(np.float32)
+        if name in self.scales:
+            weights *= self.scales[name]
+        return weights
+
+    @classmethod
+    def from_keras_model(cls, model) -> "NumpyLSTMEngine":
+        """Exporte les poids d'un modèle Embedding -> LSTM -> Dense"""
+        embedding = lstm = dense = None
+
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == 'Embedding' and embedding is None:
+                embedding = layer
+            elif kind == 'LSTM' and lstm is None and embedding is not None:
+                lstm = layer
+            elif kind == 'Dense' and dense is None and lstm is not None:
+                dense = layer
+            elif kind in ('InputLayer', 'Dropout', 'SpatialDropout1D'):
+                continue  # Sans effet en inférence
+            else:
+                raise ValueError(f"Couche non supportée par le moteur NumPy: {kind} ({layer.name})")
+
+        if embedding is None or lstm is None or dense is None:
+            raise ValueError("Architecture attendue: Embedding -> LSTM -> Dense")
+
+        lstm_config = lstm.get_config()
+        if lstm_config.get('return_sequences') or lstm_config.get('go_backwards') or not lstm_config.get('use_bias', True):
+            raise ValueError("Configuration LSTM non supportée (return_sequences/go_backwards/sans biais)")
+        if dense.get_config().get('units') != 1:
+            raise ValueError("Couche de sortie Dense(1) attendue")
+
+        kernel, recurrent_kernel, bias = lstm.get_weights()
+        dense_kernel, dense_bias = dense.get_weights()
+
+        return cls(
+            embedding=embedding.get_weights()[0],
+            kernel=kernel,
+            recurrent_kernel=recurrent_kernel,
+            bias=bias,
+            dense_kernel=dense_kernel,
+            dense_bias=dense_bias,
+            mask_zero=embedding.get_config().get('mask_zero', False),
+            activation=lstm_config.get('activation', 'tanh'),
+            recurrent_activation=lstm_config.get('recurrent_activation', 'sigmoid'),
+            dense_activation=dense.get_config().get('activation', 'sigmoid')
+        )
+
+    def __call__(self, padded) -> np.ndarray:
+        """Passe avant sur un tableau (n, longueur) - retourne les scores (n, 1)"""
+        tokens = np.asarray(padded, dtype=np.int64)
+        batch_size, steps = tokens.shape
+        units = self.units
+        activation = _ACTIVATIONS[self.activation]
+        recurrent_activation = _ACTIVATIONS[self.recurrent_activation]
+
+        # Identifiant hors de l'embedding : erreur explicite, comme Keras (jamais confondu avec le dernier mot)
+        vocab_size = self.embedding.shape[0]
+        if tokens.size and (tokens.min() < 0 or tokens.max() >= vocab_size):
+            invalid = tokens[(tokens < 0) | (tokens >= vocab_size)]
+            raise ValueError(f"Identifiant de token hors vocabulaire: {int(invalid[0])} "
+                             f"({len(invalid)} au total, embedding de {vocab_size} lignes)")
+
+        # Projection d'entrée de tous les pas de temps en une seule multiplication matricielle
+        embedded = np.take(self.embedding, tokens, axis=0)                        # (n, T, D)
+        if self.quantization is not None:
+            # Seules les lignes utilisées de l'embedding sont déquantifiées
+            embedded = embedded.astype(np.float32)
+            if 'embedding' in self.scales:
+                embedded *= np.take(self.scales['embedding'], tokens)[:, :, None]
+        recurrent_kernel = self._float_kernel('recurrent_kernel')
+        input_gates = embedded @ self._float_kernel('kernel') + self.bias          # (n, T, 4U)
+        mask = (tokens != 0)[:, :, None] if self.mask_zero else None
+
+        h = np.zeros((batch_size, units), dtype=np.float32)
+        c = np.zeros((batch_size, units), dtype=np.float32)
+
+        for t in range(steps):
+            z = input_gates[:, t] + h @ recurrent_kernel
+            # Ordre des portes Keras : entrée, oubli, cellule, sortie
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+
+            c_next = f * c + i * g
+            h_next = o * activation(c_next)
+
+            if mask is not None:
+                # Pas masqués : l'état est reporté tel quel (sémantique Keras)
+                c = np.where(mask[:, t], c_next, c)
+                h = np.where(mask[:, t], h_next, h)
+            else:
+                c, h = c_next, h_next
+
+        self.stats['invocations'] += 1
+        return _ACTIVATIONS[self.dense_activation](h @ self.dense_kernel + self.dense_bias)
+
+    def save(self, path: str, tokenizer: NumpyTokenizer = None, max_len: int = None):
+        """Exporte poids, métadonnées et tokenizer dans un fichier .npz"""
+        metadata = {
+            'mask_zero': self.mask_zero,
+            'activation': self.activation,
+            'recurrent_activation': self.recurrent_activation,
+            'dense_activation': self.dense_activation,
+            'quantization': self.quantization,
+            'max_len': max_len,
+            'tokenizer': tokenizer.to_config() if tokenizer else None
+        }
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                embedding=self.embedding,
+                kernel=self.kernel,
+                recurrent_kernel=self.recurrent_kernel,
+                bias=self.bias,
+                dense_kernel=self.dense_kernel,
+                dense_bias=self.dense_bias,
+                metadata=np.array(json.dumps(metadata)),
+                **{f"{name}_scale": scale for name, scale in self.scales.items()}
+            )
+        logger.info(f"[✓] Moteur NumPy exporté: {path} ({self.nbytes / 1024:.0f} Ko de poids)")
+
+    @classmethod
+    def load(cls, path: str):
+        """Charge un export .npz - retourne (moteur, tokenizer ou None, max_len ou None)"""
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data['metadata']))
+            engine = cls(
+                embedding=data['embedding'],
+                kernel=data['kernel'],
+                recurrent_kernel=data['recurrent_kernel'],
+                bias=data['bias'],
+                dense_kernel=data['dense_kernel'],
+                dense_bias=data['dense_bias'],
+                mask_zero=metadata['mask_zero'],
+                activation=metadata['activation'],
+                recurrent_activation=metadata['recurrent_activation'],
+                dense_activation=metadata['dense_activation'],
+                quantization=metadata.get('quantization'),
+                scales={name: data[f"{name}_scale"] for name, _ in _QUANTIZED_WEIGHTS if f"{name}_scale" in data}
+            )
+
+        tokenizer = NumpyTokenizer(**metadata['tokenizer']) if metadata.get('tokenizer') else None
+        return engine, tokenizer, metadata.get('max_len')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du moteur"""
+        return {
+            'units': self.units,
+            'vocab_size': int(self.embedding.shape[0]),
+            'embedding_dim': int(self.embedding.shape[1]),
+            'mask_zero': self.mask_zero,
+            'quantization': self.quantization or 'float32',
+            'weights_kb': round(self.nbytes / 1024, 1),
+            **self.stats
+        }
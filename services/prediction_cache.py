@@ -0,0 +1,148 @@
+# Cache des prédictions à deux niveaux (texte normalisé, séquence de tokens)
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r' +')
+
+# Surcoût approximatif d'une entrée (clé, tuple, OrderedDict) en octets
+_ENTRY_OVERHEAD = 200
+
+def normalize_text(text: str, lower: bool = True) -> str:
+    """Normalisation sans effet sur la tokenisation Keras (casse, espaces multiples)"""
+    if lower:
+        text = text.lower()
+    return _SPACES.sub(' ', text).strip(' ')
+
+class PredictionCache:
+    """Cache LRU avec TTL et borne mémoire devant DagsHubService.predict
+
+    Niveau 1 : texte normalisé -> séquence de tokens (évite la tokenisation)
+    Niveau 2 : séquence de tokens tronquée à max_len -> score brut (évite le modèle),
+    partagé par les textes qui ne diffèrent que par la ponctuation filtrée.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, ttl_seconds: float = None):
+        # Configuration depuis les variables d'environnement
+        self.max_entries = max_entries or int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "50000"))
+        self.max_bytes = max_bytes or int(float(os.getenv("PREDICTION_CACHE_MAX_MB", "32")) * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+        self._text_tier = OrderedDict()   # texte normalisé -> (expiration, séquence, taille)
+        self._token_tier = OrderedDict()  # (max_len, séquence) -> (expiration, score, taille)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.scope = None  # model_run_id des entrées présentes
+
+        # Statistiques
+        self.stats = {
+            'text_hits': 0,
+            'text_misses': 0,
+            'token_hits': 0,
+            'token_misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def set_scope(self, model_run_id: str):
+        """Associe le cache à un modèle : changer de modèle vide le cache"""
+        with self._lock:
+            if self.scope != model_run_id:
+                if self._text_tier or self._token_tier:
+                    logger.info(f"Cache de prédictions invalidé ({self.scope} -> {model_run_id})")
+                self._clear_locked()
+                self.scope = model_run_id
+
+    def clear(self):
+        """Vide les deux niveaux (ex: remplacement du modèle)"""
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self):
+        if self._text_tier or self._token_tier:
+            self.stats['invalidations'] += 1
+        self._text_tier.clear()
+        self._token_tier.clear()
+        self._bytes = 0
+
+    def _get(self, tier: OrderedDict, key, hit_stat: str, miss_stat: str):
+        with self._lock:
+            entry = tier.get(key)
+            if entry is None:
+                self.stats[miss_stat] += 1
+                return None
+
+            expires, value, size = entry
+            if expires < time.monotonic():
+                del tier[key]
+                self._bytes -= size
+                self.stats['expirations'] += 1
+                self.stats[miss_stat] += 1
+                return None
+
+            tier.move_to_end(key)
+            self.stats[hit_stat] += 1
+            return value
+
+    def _put(self, tier: OrderedDict, key, value, size: int):
+        with self._lock:
+            previous = tier.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+
+            tier[key] = (time.monotonic() + self.ttl_seconds, value, size)
+            self._bytes += size
+
+            # Éviction LRU : d'abord dans le niveau inséré, puis dans l'autre
+            while (len(self._text_tier) + len(self._token_tier) > self.max_entries or self._bytes > self.max_bytes):
+                victim_tier = tier if len(tier) > 1 else (self._token_tier if tier is self._text_tier else self._text_tier)
+                if not victim_tier:
+                    break
+                _, (_, _, victim_size) = victim_tier.popitem(last=False)
+                self._bytes -= victim_size
+                self.stats['evictions'] += 1
+
+    def get_sequence(self, normalized_text: str) -> Optional[List[int]]:
+        return self._get(self._text_tier, normalized_text, 'text_hits', 'text_misses')
+
+    def put_sequence(self, normalized_text: str, sequence: List[int]):
+        size = _ENTRY_OVERHEAD + len(normalized_text) + 8 * len(sequence)
+        self._put(self._text_tier, normalized_text, sequence, size)
+
+    @staticmethod
+    def token_key(sequence: List[int], max_len: int) -> Tuple:
+        """Clé équivalente à la séquence paddée (padding/troncature 'post' déterministes)"""
+        return (max_len, tuple(sequence[:max_len]))
+
+    def get_score(self, token_key: Tuple) -> Optional[float]:
+        return self._get(self._token_tier, token_key, 'token_hits', 'token_misses')
+
+    def put_score(self, token_key: Tuple, raw_score: float):
+        size = _ENTRY_OVERHEAD + 8 * len(token_key[1])
+        self._put(self._token_tier, token_key, raw_score, size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs hit/miss/éviction et occupation"""
+        with self._lock:
+            text_lookups = self.stats['text_hits'] + self.stats['text_misses']
+            token_lookups = self.stats['token_hits'] + self.stats['token_misses']
+            return {
+                'enabled': True,
+                'scope': self.scope,
+                'text_entries': len(self._text_tier),
+                'token_entries': len(self._token_tier),
+                'size_kb': round(self._bytes / 1024, 1),
+                'max_entries': self.max_entries,
+                'max_kb': round(self.max_bytes / 1024, 1),
+                'ttl_seconds': self.ttl_seconds,
+                'text_hit_rate': round(self.stats['text_hits'] / text_lookups, 4) if text_lookups else 0.0,
+                'token_hit_rate': round(self.stats['token_hits'] / token_lookups, 4) if token_lookups else 0.0,
+                **self.stats
+            }
@@ -0,0 +1,217 @@
+# Service multi-processus pré-fork : le modèle est chargé une fois puis partagé (copy-on-write)
+import os
+import gc
+import time
+import signal
+import socket
+import logging
+from typing import Callable, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+# État du processus courant (renseigné dans les workers après le fork)
+_process_state = {
+    'mode': 'single',
+    'worker_id': None,
+    'preload_seconds': None,
+    'forked_at': None,
+    'boot_seconds': None
+}
+
+def _read_memory(pid: str = "self") -> Dict[str, float]:
+    """RSS/PSS d'un processus en Mo (/proc/<pid>/smaps_rollup, sinon /proc/<pid>/status)"""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        fields['Rss'] = int(line.split()[1])
+        except OSError:
+            return {}
+
+    memory = {'rss_mb': round(fields.get('Rss', 0) / 1024, 1)}
+    if 'Pss' in fields:
+        # PSS : pages partagées divisées par le nombre de processus qui les utilisent
+        memory['pss_mb'] = round(fields['Pss'] / 1024, 1)
+        memory['shared_mb'] = round((fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)) / 1024, 1)
+        memory['private_mb'] = round((fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024, 1)
+    return memory
+
+def _sibling_pids() -> List[int]:
+    """PIDs des processus frères (enfants du parent pré-fork)"""
+    parent = os.getppid()
+    try:
+        with open(f"/proc/{parent}/task/{parent}/children") as f:
+            return [int(pid) for pid in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+def mark_worker_ready():
+    """À appeler en fin de démarrage d'un worker (temps écoulé depuis le fork)"""
+    if _process_state['forked_at'] is not None and _process_state['boot_seconds'] is None:
+        _process_state['boot_seconds'] = round(time.monotonic() - _process_state['forked_at'], 3)
+
+def get_process_info() -> Dict[str, Any]:
+    """Mémoire du processus courant et, en mode pré-fork, de l'ensemble des processus"""
+    info = {
+        'mode': _process_state['mode'],
+        'pid': os.getpid(),
+        'worker_id': _process_state['worker_id'],
+        'preload_seconds': _process_state['preload_seconds'],
+        'boot_seconds': _process_state['boot_seconds'],
+        'memory': _read_memory()
+    }
+
+    if _process_state['mode'] == 'prefork':
+        processes = [{'pid': os.getppid(), 'role': 'parent', **_read_memory(str(os.getppid()))}]
+        processes += [{'pid': pid, 'role': 'child', **_read_memory(str(pid))} for pid in _sibling_pids()]
+        info['processes'] = processes
+        info['total_rss_mb'] = round(sum(p.get('rss_mb', 0) for p in processes), 1)
+        if all('pss_mb' in p for p in processes):
+            info['total_pss_mb'] = round(sum(p['pss_mb'] for p in processes), 1)
+
+    return info
+
+class PreforkServer:
+    """Charge l'application une fois dans le parent puis forke N workers uvicorn sur un socket commun
+
+    Les poids du modèle sont partagés en copy-on-write : gc.freeze() avant le fork évite
+    que le ramasse-miettes ne touche (et ne recopie) les pages des objets préchargés.
+    Le parent ne lance aucun thread : il se contente de superviser les workers.
+    """
+
+    def __init__(self, app, host: str, port: int, workers: int, preload: Callable[[], Any] = None,
+                 sidecar: Callable[[], None] = None, log_level: str = "info", preload_seconds: float = None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.preload = preload
+        # Durée d'un préchargement fait par l'appelant avant de construire le serveur (ajoutée à celle de preload)
+        self.preload_seconds = preload_seconds or 0.0
+        self.sidecar = sidecar  # Processus annexe (ex: interface Dash), relancé comme les workers
+        self.log_level = log_level
+
+        self._socket = None
+        self._children = {}  # pid -> identifiant du slot ("worker-0", ..., "sidecar")
+        self._running = False
+        self.restarts = 0
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _run_worker(self, slot: str):
+        """Corps d'un processus enfant (ne retourne jamais)"""
+        exit_code = 0
+        try:
+            # Rétablir les signaux par défaut (uvicorn installe ensuite les siens)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+            if slot == "sidecar":
+                self._socket.close()
+                self.sidecar()
+            else:
+                import uvicorn
+
+                _process_state['worker_id'] = int(slot.split('-')[1])
+                config = uvicorn.Config(self.app, log_level=self.log_level)
+                uvicorn.Server(config).run(sockets=[self._socket])
+        except Exception as e:
+            logger.error(f"[X] Processus {slot} arrêté sur erreur: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _spawn(self, slot: str):
+        _process_state['forked_at'] = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(slot)
+        self._children[pid] = slot
+        logger.info(f"[✓] Processus {slot} démarré (pid {pid})")
+
+    def _handle_stop(self, signum, frame):
+        self._running = False
+
+    def _stop_children(self, timeout: float = 10.0):
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._children.pop(pid, None)
+
+        deadline = time.monotonic() + timeout
+        while self._children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self._children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+
+        for pid in list(self._children):
+            logger.warning(f"[!] Processus {self._children[pid]} (pid {pid}) tué après {timeout}s")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._children.clear()
+
+    def run(self):
+        """Préchargement, fork des workers puis supervision (relance des processus morts)"""
+        start = time.perf_counter()
+        if self.preload:
+            self.preload()
+        _process_state['mode'] = 'prefork'
+        _process_state['preload_seconds'] = round(self.preload_seconds + time.perf_counter() - start, 3)
+        logger.info(f"[✓] Préchargement terminé en {_process_state['preload_seconds']}s "
+                    f"({_read_memory().get('rss_mb', '?')} Mo) - fork de {self.workers} workers")
+
+        # Objets préchargés déplacés en génération permanente : plus de copie au passage du GC
+        gc.collect()
+        gc.freeze()
+
+        self._socket = self._bind()
+        self._running = True
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for worker_id in range(self.workers):
+            self._spawn(f"worker-{worker_id}")
+        if self.sidecar:
+            self._spawn("sidecar")
+
+        try:
+            while self._running:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if not pid:
+                    time.sleep(0.5)
+                    continue
+
+                slot = self._children.pop(pid, None)
+                if slot and self._running:
+                    logger.warning(f"[!] Processus {slot} (pid {pid}) terminé (statut {status}) - relance")
+                    self.restarts += 1
+                    time.sleep(1)
+                    self._spawn(slot)
+        finally:
+            logger.info("Arrêt des workers...")
+            self._stop_children()
+            self._socket.close()
@@ -0,0 +1,67 @@
+# Corpus de référence pour les contrôles de parité des chemins d'inférence
+import os
+import logging
+import numpy as np
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Tweets types (mêmes cas que utils/test_model_accuracy.py + variantes de longueur)
+DEFAULT_REFERENCE_TEXTS = [
+    "Service excellent d'Air Paradis!",
+    "Vol retardé encore une fois!",
+    "Vol parfait, équipage professionnel",
+    "Parfait! Équipage formidable et vol à l'heure",
+    "Catastrophe totale, jamais plus avec cette compagnie",
+    "I love this airline! Great service and comfortable seats.",
+    "Worst flight ever! Delayed for 3 hours and no explanation.",
+    "The food was decent, staff was helpful overall.",
+    "Amazing crew! They were so helpful and friendly.",
+    "Terrible experience. Lost my luggage and rude staff.",
+    "Flight was on time and smooth. Good job!",
+    "Disappointed with the service. Will not fly again.",
+    "Great value for money. Recommended!",
+    "The plane was dirty and the seats uncomfortable.",
+    "Excellent customer service. Thank you!",
+    "Not the worst but could be better.",
+    "Satisfactory service, met my expectations.",
+    "Outstanding experience from start to finish!",
+    "Complete disaster, never again!",
+    "Good enough for the price I paid.",
+    "le vol était en retard, mais j'ai fais de belles rencontres.",
+    "ok",
+    "thanks",
+    "delayed again",
+    "@airline my bag never arrived and nobody at the desk could tell me anything, "
+    "two hours on hold with customer service and still no answer about where it is",
+    "just landed, smooth flight, friendly crew, the coffee was actually good this time, "
+    "and we arrived twenty minutes early which never happens on this route, well done",
+]
+
+def load_reference_texts() -> List[str]:
+    """Corpus de référence : fichier REFERENCE_CORPUS_PATH (un texte par ligne) ou corpus intégré"""
+    corpus_path = os.getenv("REFERENCE_CORPUS_PATH")
+    if corpus_path:
+        try:
+            with open(corpus_path, 'r', encoding='utf-8') as f:
+                texts = [line.strip() for line in f if line.strip()]
+            if texts:
+                return texts
+            logger.warning(f"[!] Corpus de référence vide: {corpus_path}")
+        except Exception as e:
+            logger.warning(f"[!] Corpus de référence illisible ({corpus_path}): {e}")
+
+    return list(DEFAULT_REFERENCE_TEXTS)
+
+def parity_report(reference_scores, candidate_scores) -> Dict[str, Any]:
+    """Compare deux séries de scores sigmoïdes (écart maximal et accord sur les labels)"""
+    reference = np.asarray(reference_scores, dtype=np.float32).reshape(-1)
+    candidate = np.asarray(candidate_scores, dtype=np.float32).reshape(-1)
+    abs_diff = np.abs(reference - candidate)
+
+    return {
+        'samples': int(reference.size),
+        'max_abs_diff': float(abs_diff.max()) if reference.size else 0.0,
+        'mean_abs_diff': float(abs_diff.mean()) if reference.size else 0.0,
+        'label_agreement': float(np.mean((reference > 0.5) == (candidate > 0.5))) if reference.size else 1.0
+    }
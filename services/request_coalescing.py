@@ -0,0 +1,93 @@
+# Regroupement des prédictions identiques en cours (single-flight) devant DagsHubService.predict
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class RequestCoalescer:
+    """Les requêtes concurrentes de même texte normalisé partagent un seul calcul en vol
+
+    Contrairement au cache, rien n'est conservé après le calcul : la clé est libérée dès
+    que le résultat est disponible. Chaque appelant reçoit son propre Future (l'annulation
+    d'une requête n'interrompt pas le calcul partagé) avec son propre texte dans le résultat.
+    """
+
+    def __init__(self, submit_fn: Callable[[str], Future], key_fn: Callable[[str], str]):
+        # Soumission du calcul (ex: MicroBatchScheduler.submit) et clé de regroupement
+        self.submit_fn = submit_fn
+        self.key_fn = key_fn
+
+        self._inflight = {}  # clé -> Future du calcul partagé
+        self._lock = threading.Lock()
+
+        # Statistiques
+        self.stats = {
+            'requests': 0,
+            'computations': 0,
+            'coalesced': 0,
+            'max_waiters': 0
+        }
+        self._waiters = {}  # clé -> nombre d'appelants du calcul en vol
+
+    def submit(self, text: str) -> Future:
+        """Future résolu avec le résultat de text (calcul partagé si le même texte est déjà en vol)"""
+        key = self.key_fn(text)
+        with self._lock:
+            self.stats['requests'] += 1
+            shared = self._inflight.get(key)
+            if shared is None:
+                shared = self.submit_fn(text)  # Exceptions (file pleine) propagées, rien n'est enregistré
+                self._inflight[key] = shared
+                self._waiters[key] = 1
+                self.stats['computations'] += 1
+                leader = True
+            else:
+                self._waiters[key] += 1
+                self.stats['coalesced'] += 1
+                self.stats['max_waiters'] = max(self.stats['max_waiters'], self._waiters[key])
+                leader = False
+
+        if leader:
+            shared.add_done_callback(lambda future: self._release(key, future))
+
+        own = Future()
+        shared.add_done_callback(lambda future: self._fan_out(future, own, text))
+        return own
+
+    def _release(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+                del self._waiters[key]
+
+    @staticmethod
+    def _fan_out(shared: Future, own: Future, text: str):
+        """Transmet le résultat partagé à un appelant, avec son texte d'origine"""
+        if not own.set_running_or_notify_cancel():
+            return
+        if shared.cancelled():
+            own.set_exception(RuntimeError("Calcul partagé annulé"))
+            return
+        error = shared.exception()
+        if error is not None:
+            own.set_exception(error)
+            return
+
+        result = shared.result()
+        if result.get("text") != text:
+            # Même texte normalisé, écriture différente (casse, espaces)
+            result = {**result, "text": text}
+            if isinstance(result.get("preprocessing_info"), dict):
+                result["preprocessing_info"] = {**result["preprocessing_info"], "original_length": len(text)}
+        own.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': True,
+                'in_flight': len(self._inflight),
+                'coalesced_ratio': round(self.stats['coalesced'] / self.stats['requests'], 4) if self.stats['requests'] else 0.0,
+                **self.stats
+            }
@@ -0,0 +1,44 @@
+# Chronométrage par étape du chemin de prédiction (en-tête Server-Timing)
+import os
+import time
+from typing import Dict, Optional
+
+# Désactivé : aucun chronomètre n'est créé, seul un test "is None" reste sur le chemin
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+class StageTimer:
+    """Durées cumulées par étape (ms), mesurées avec l'horloge monotone perf_counter"""
+
+    __slots__ = ("stages", "started")
+
+    def __init__(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+
+    def mark(self, name: str, since: float) -> float:
+        """Ajoute le temps écoulé depuis since à l'étape name - retourne l'instant courant"""
+        now = time.perf_counter()
+        self.add(name, now - since)
+        return now
+
+    def merge(self, stages: Optional[Dict[str, float]]):
+        """Ajoute des durées déjà mesurées (ms), ex: étapes internes de DagsHubService"""
+        for name, ms in (stages or {}).items():
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def as_dict(self, total: bool = True) -> Dict[str, float]:
+        stages = {name: round(ms, 3) for name, ms in self.stages.items()}
+        if total:
+            stages["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        return stages
+
+    def header(self) -> str:
+        """Valeur de l'en-tête Server-Timing (étapes puis total)"""
+        return ", ".join(f"{name};dur={ms:.3f}" for name, ms in self.as_dict().items())
+
+def start_timer() -> Optional[StageTimer]:
+    """Chronomètre d'une requête, ou None si SERVER_TIMING_ENABLED est faux"""
+    return StageTimer() if SERVER_TIMING_ENABLED else None
@@ -0,0 +1,171 @@
+# Backend d'inférence TensorFlow Lite (délégué CPU XNNPACK)
+import os
+import time
+import logging
+import tempfile
+import threading
+import numpy as np
+from typing import Dict, Any, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+class TFLiteBackend:
+    """Sert le modèle via l'interpréteur TFLite au lieu de Keras
+
+    Le LSTM n'est fusionné par le convertisseur qu'avec une forme d'entrée statique :
+    un flatbuffer (et un interpréteur) est donc produit par taille de lot, et les lots
+    sont découpés / complétés vers ces tailles.
+    """
+
+    def __init__(self, model, max_len: int, batch_sizes: Iterable[int], model_dir: str = None,
+                 num_threads: int = None, model_key: str = "model", quantization: str = None):
+        if quantization not in (None, "float16", "int8"):
+            raise ValueError(f"Mode de quantification inconnu: {quantization}")
+        self.model = model
+        self.model_key = model_key  # Préfixe des fichiers en cache (ex: run_id MLflow)
+        self.quantization = quantization  # "float16" (poids float16) ou "int8" (dynamic range)
+        self.max_len = max_len
+        self.batch_sizes = sorted(set(batch_sizes)) or [1]
+        self.model_dir = model_dir
+        self.num_threads = num_threads or int(os.getenv("TFLITE_NUM_THREADS", "0")) or None
+
+        self._interpreters = {}  # (lot, longueur) -> (interpréteur, index entrée, index sortie, verrou)
+        self._build_lock = threading.Lock()
+        self.stats = {'invocations': 0, 'padded_rows': 0, 'converted_shapes': 0, 'loaded_shapes': 0, 'model_bytes': 0}
+
+    @staticmethod
+    def convert_keras_model(model, batch_size: int, max_len: int, optimizations=None, target_types=None) -> bytes:
+        """Convertit le modèle Keras en flatbuffer TFLite d'entrée statique (batch_size, max_len) int32"""
+        import tensorflow as tf
+        import keras
+
+        with tempfile.TemporaryDirectory() as export_dir:
+            archive = keras.export.ExportArchive()
+            archive.track(model)
+            archive.add_endpoint(
+                name="serve",
+                fn=lambda tokens: model(tokens, training=False),
+                input_signature=[tf.TensorSpec(shape=[batch_size, max_len], dtype=tf.int32, name="tokens")]
+            )
+            archive.write_out(export_dir)
+
+            converter = tf.lite.TFLiteConverter.from_saved_model(export_dir, signature_keys=["serve"])
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+            if optimizations:
+                converter.optimizations = optimizations
+            if target_types:
+                converter.target_spec.supported_types = target_types
+            return converter.convert()
+
+    def _conversion_options(self) -> Dict[str, Any]:
+        """Options du convertisseur pour la quantification post-entraînement"""
+        if self.quantization is None:
+            return {}
+        import tensorflow as tf
+        if self.quantization == "float16":
+            return {'optimizations': [tf.lite.Optimize.DEFAULT], 'target_types': [tf.float16]}
+        # Dynamic range : poids int8, activations float32
+        return {'optimizations': [tf.lite.Optimize.DEFAULT]}
+
+    def _flatbuffer_path(self, batch_size: int, length: int) -> str:
+        suffix = f"_{self.quantization}" if self.quantization else ""
+        return os.path.join(self.model_dir, f"{self.model_key}_b{batch_size}_l{length}{suffix}.tflite") if self.model_dir else None
+
+    def _load_flatbuffer(self, batch_size: int, length: int) -> bytes:
+        """Lit le flatbuffer pré-converti si présent, sinon convertit (et met en cache)"""
+        path = self._flatbuffer_path(batch_size, length)
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.stats['loaded_shapes'] += 1
+                return f.read()
+
+        if self.model is None:
+            raise ValueError(f"Pas de flatbuffer TFLite pour {batch_size}x{length} et pas de modèle Keras à convertir")
+
+        start = time.perf_counter()
+        model_content = self.convert_keras_model(self.model, batch_size, length, **self._conversion_options())
+        self.stats['converted_shapes'] += 1
+        logger.info(f"[✓] Conversion TFLite {batch_size}x{length}: {len(model_content) / 1024:.0f} Ko en {time.perf_counter() - start:.1f}s")
+
+        if path:
+            try:
+                os.makedirs(self.model_dir, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(model_content)
+            except Exception as e:
+                logger.warning(f"[!] Impossible de sauvegarder le modèle TFLite: {e}")
+
+        return model_content
+
+    def _get_interpreter(self, batch_size: int, length: int):
+        """Interpréteur pour une forme donnée (créé à la demande)"""
+        key = (batch_size, length)
+        entry = self._interpreters.get(key)
+        if entry is not None:
+            return entry
+
+        with self._build_lock:
+            if key not in self._interpreters:
+                import tensorflow as tf
+
+                model_content = self._load_flatbuffer(batch_size, length)
+                self.stats['model_bytes'] += len(model_content)
+
+                # Le résolveur d'opérations par défaut applique le délégué XNNPACK aux opérations float
+                interpreter = tf.lite.Interpreter(model_content=model_content, num_threads=self.num_threads)
+                interpreter.allocate_tensors()
+                # L'interpréteur n'est pas thread-safe : un verrou par forme
+                self._interpreters[key] = (
+                    interpreter,
+                    interpreter.get_input_details()[0]['index'],
+                    interpreter.get_output_details()[0]['index'],
+                    threading.Lock()
+                )
+            return self._interpreters[key]
+
+    def _invoke(self, tokens: np.ndarray) -> np.ndarray:
+        interpreter, input_index, output_index, lock = self._get_interpreter(*tokens.shape)
+        with lock:
+            interpreter.set_tensor(input_index, tokens)
+            interpreter.invoke()
+            self.stats['invocations'] += 1
+            return interpreter.get_tensor(output_index).copy()
+
+    def _plan_chunks(self, rows: int) -> List[int]:
+        """Découpe n lignes en tailles de lot disponibles (la dernière est complétée)"""
+        largest = self.batch_sizes[-1]
+        chunks = [largest] * (rows // largest)
+        remainder = rows % largest
+        if remainder:
+            chunks.append(next(size for size in self.batch_sizes if size >= remainder))
+        return chunks
+
+    def __call__(self, padded) -> np.ndarray:
+        """Passe avant sur un tableau (n, longueur) - retourne les scores (n, 1)"""
+        tokens = np.asarray(padded, dtype=np.int32)
+        rows, length = tokens.shape
+        outputs = []
+
+        start = 0
+        for chunk_size in self._plan_chunks(rows):
+            chunk = tokens[start:start + chunk_size]
+            missing = chunk_size - len(chunk)
+            if missing:
+                chunk = np.vstack([chunk, np.zeros((missing, length), dtype=np.int32)])
+                self.stats['padded_rows'] += missing
+            outputs.append(self._invoke(chunk)[:chunk_size - missing])
+            start += chunk_size
+
+        return np.vstack(outputs) if outputs else np.zeros((0, 1), dtype=np.float32)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques des interpréteurs"""
+        return {
+            'batch_sizes': self.batch_sizes,
+            'shapes': [f"{b}x{l}" for b, l in self._interpreters],
+            'model_dir': self.model_dir,
+            'num_threads': self.num_threads,
+            'quantization': self.quantization or 'float32',
+            'model_size_kb': round(self.stats['model_bytes'] / 1024, 1),
+            **self.stats
+        }
@@ -0,0 +1,190 @@
+# Configuration des pools de threads CPU (TensorFlow, BLAS, exécuteur d'inférence, anyio, Dash)
+import os
+import re
+import sys
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Variables lues au chargement des bibliothèques BLAS / OpenMP (NumPy, TensorFlow)
+_BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                  "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def _env_int(name: str) -> int:
+    try:
+        return int(os.getenv(name, "0"))
+    except ValueError:
+        logger.warning(f"[!] {name} invalide: {os.getenv(name)}")
+        return 0
+
+def _read_cgroup_quota() -> Optional[float]:
+    """Quota CPU du conteneur en nombre de CPU (cgroup v2 cpu.max, sinon v1 cfs_quota_us)"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+def detect_cpu_limit() -> Dict[str, Any]:
+    """CPU réellement utilisables : affinité du processus bornée par le quota cgroup (Docker --cpus)"""
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = os.cpu_count() or 1
+
+    quota = _read_cgroup_quota()
+    effective = min(affinity, max(1, math.ceil(quota))) if quota else affinity
+    return {
+        'host_cpus': os.cpu_count(),
+        'affinity_cpus': affinity,
+        'cgroup_quota': round(quota, 2) if quota else None,
+        'effective_cpus': effective
+    }
+
+class ThreadingConfig:
+    """Budget de threads unique réparti entre les pools du processus
+
+    Par défaut : CPU/2 workers d'inférence, chacun avec CPU/workers threads TensorFlow (intra-op)
+    et BLAS, 1 thread inter-op. Chaque valeur peut être imposée par variable d'environnement.
+    """
+
+    def __init__(self, cpu_limit: int = None):
+        self.detection = detect_cpu_limit()
+        self.cpus = cpu_limit or _env_int("CPU_LIMIT") or self.detection['effective_cpus']
+
+        self.inference_workers = _env_int("INFERENCE_WORKERS") or max(1, self.cpus // 2)
+        self.intra_op_threads = _env_int("TF_INTRA_OP_THREADS") or max(1, self.cpus // self.inference_workers)
+        self.inter_op_threads = _env_int("TF_INTER_OP_THREADS") or 1
+        self.blas_threads = _env_int("BLAS_THREADS") or self.intra_op_threads
+        self.anyio_threads = _env_int("ANYIO_THREADS") or max(8, 4 * self.cpus)  # Appels d'E/S (Azure)
+        self.dash_threads = _env_int("DASH_THREADS") or max(2, self.cpus)
+        # Chargements de configuration simultanés (registre, rechargement à chaud) : 2 threads de téléchargement chacun
+        self.config_loader_threads = _env_int("CONFIG_LOADER_THREADS") or 1
+        self.config_loader_slots = threading.BoundedSemaphore(self.config_loader_threads)
+
+        self.blas_applied = None
+        self.tensorflow_applied = None
+        self.anyio_applied = False
+        self._tensorflow_lock = threading.Lock()
+
+    def apply_environment(self):
+        """Limites BLAS/OpenMP : à appliquer avant le premier import de NumPy"""
+        if "numpy" in sys.modules:
+            self.blas_applied = False
+            logger.warning("[!] NumPy déjà chargé : limites BLAS/OpenMP sans effet")
+        else:
+            self.blas_applied = True
+
+        for name in _BLAS_ENV_VARS:
+            os.environ.setdefault(name, str(self.blas_threads))
+        os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(self.intra_op_threads))
+        os.environ.setdefault("TF_NUM_INTEROP_THREADS", str(self.inter_op_threads))
+
+    def configure_tensorflow(self) -> bool:
+        """Pools intra-op / inter-op de TensorFlow : une seule tentative par processus, avant la première opération"""
+        with self._tensorflow_lock:
+            # Appels suivants (registre, rechargement à chaud) : le contexte existe, rien à modifier
+            if self.tensorflow_applied is not None:
+                return self.tensorflow_applied
+
+            import tensorflow as tf
+
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+                tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+                self.tensorflow_applied = True
+            except RuntimeError as e:
+                # Contexte TensorFlow déjà initialisé
+                self.tensorflow_applied = False
+                logger.warning(f"[!] Threads TensorFlow non modifiables: {e}")
+            return self.tensorflow_applied
+
+    def _reset_after_fork(self):
+        """Processus enfant : les threads du parent (chargement de configuration) n'y existent plus"""
+        self.config_loader_slots = threading.BoundedSemaphore(self.config_loader_threads)
+        self._tensorflow_lock = threading.Lock()
+
+    def configure_anyio(self):
+        """Taille du pool de threads anyio (run_in_threadpool) - depuis la boucle asyncio"""
+        from anyio.to_thread import current_default_thread_limiter
+
+        current_default_thread_limiter().total_tokens = self.anyio_threads
+        self.anyio_applied = True
+
+    @staticmethod
+    def _live_threads() -> Dict[str, int]:
+        """Threads actifs regroupés par nom (sans les numéros)"""
+        names = (re.sub(r'[-_ ]?\d+.*$', '', thread.name) or thread.name for thread in threading.enumerate())
+        return dict(Counter(names).most_common())
+
+    def get_report(self) -> Dict[str, Any]:
+        """Limites configurées, appliquées et threads effectivement actifs"""
+        tensorflow = {
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            'applied': self.tensorflow_applied
+        }
+        if "tensorflow" in sys.modules:
+            threading_api = sys.modules["tensorflow"].config.threading
+            tensorflow['runtime_intra_op'] = threading_api.get_intra_op_parallelism_threads()
+            tensorflow['runtime_inter_op'] = threading_api.get_inter_op_parallelism_threads()
+
+        anyio = {'limit': self.anyio_threads, 'applied': self.anyio_applied}
+        try:
+            from anyio.to_thread import current_default_thread_limiter
+            limiter = current_default_thread_limiter()
+            anyio.update({'total_tokens': limiter.total_tokens, 'borrowed': limiter.borrowed_tokens})
+        except Exception:
+            pass  # Hors boucle asyncio
+
+        compute_threads = self.inference_workers * max(self.intra_op_threads, self.blas_threads)
+        return {
+            'cpu': {**self.detection, 'budget': self.cpus},
+            'pools': {
+                'inference_executor': self.inference_workers,
+                'tensorflow': tensorflow,
+                'blas': {'threads': self.blas_threads, 'applied': self.blas_applied,
+                         'env': {name: os.environ.get(name) for name in _BLAS_ENV_VARS}},
+                'anyio': anyio,
+                'dash': self.dash_threads,
+                'config_loader': {'concurrent_loads': self.config_loader_threads, 'download_threads_per_load': 2}
+            },
+            'compute_threads': compute_threads,
+            'oversubscription': round(compute_threads / self.cpus, 2),
+            'live_threads': self._live_threads()
+        }
+
+_threading_config = None
+_config_lock = threading.Lock()
+
+def get_threading_config() -> ThreadingConfig:
+    """Configuration partagée par tout le processus"""
+    global _threading_config
+    with _config_lock:
+        if _threading_config is None:
+            _threading_config = ThreadingConfig()
+            logger.info(f"[✓] Budget CPU: {_threading_config.cpus} (quota cgroup: {_threading_config.detection['cgroup_quota']}) - "
+                        f"{_threading_config.inference_workers} workers x {_threading_config.intra_op_threads} threads")
+        return _threading_config
+
+def _after_fork_in_child():
+    global _config_lock
+    _config_lock = threading.Lock()
+    if _threading_config is not None:
+        _threading_config._reset_after_fork()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
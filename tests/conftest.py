@@ -0,0 +1,88 @@
+# Fixtures des tests unitaires : petit modèle Embedding -> LSTM -> Dense et artifacts locaux (sans DagsHub)
+import os
+import sys
+import json
+import pickle
+import pytest
+
+# Modules du projet importables quel que soit le répertoire de lancement de pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+VOCAB_SIZE = 200
+MAX_LEN = 20
+RUN_ID = "test-run"
+
+def build_keras_model(mask_zero: bool = False, seed: int = 0):
+    """Modèle Embedding -> LSTM -> Dense(sigmoid) aléatoire mais déterministe"""
+    tf = pytest.importorskip("tensorflow")
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.Input((None,), dtype="int32"),
+        tf.keras.layers.Embedding(VOCAB_SIZE, 16, mask_zero=mask_zero),
+        tf.keras.layers.LSTM(8),
+        tf.keras.layers.Dense(1, activation="sigmoid")
+    ])
+    # Poids amplifiés : scores éloignés de 0.5, labels variés sur le corpus de référence
+    model.set_weights([weights * 3 for weights in model.get_weights()])
+    return model
+
+def build_tokenizer():
+    """Tokenizer Keras ajusté sur le corpus de référence"""
+    pytest.importorskip("tensorflow")
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    from services.reference_corpus import DEFAULT_REFERENCE_TEXTS
+    
+    tokenizer = Tokenizer(num_words=VOCAB_SIZE, oov_token="<OOV>")
+    tokenizer.fit_on_texts(DEFAULT_REFERENCE_TEXTS)
+    return tokenizer
+
+def write_artifacts(directory, model, tokenizer, max_len: int = MAX_LEN) -> str:
+    """Artifacts au format du run MLflow (model/*.keras, model/*.pkl, model_config.json)"""
+    os.makedirs(os.path.join(directory, "model"), exist_ok=True)
+    model.save(os.path.join(directory, "model", "nn_model_none_lstm.keras"))
+    with open(os.path.join(directory, "model", "nn_model_tokenizer_none_lstm.pkl"), "wb") as f:
+        pickle.dump(tokenizer, f)
+    with open(os.path.join(directory, "model_config.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "metadata": {"model_name": "test_lstm", "run_id": RUN_ID},
+            "hyperparameters": {"max_len": max_len, "max_features": VOCAB_SIZE},
+            "preprocessing": {"mode": "none"}
+        }, f)
+    return str(directory)
+
+@pytest.fixture(scope="session")
+def keras_model():
+    return build_keras_model(mask_zero=False)
+
+@pytest.fixture(scope="session")
+def masked_keras_model():
+    return build_keras_model(mask_zero=True)
+
+@pytest.fixture(scope="session")
+def tokenizer():
+    return build_tokenizer()
+
+@pytest.fixture(scope="session")
+def artifacts_dir(tmp_path_factory, keras_model, tokenizer):
+    return write_artifacts(tmp_path_factory.mktemp("artifacts"), keras_model, tokenizer)
+
+@pytest.fixture(scope="session")
+def masked_artifacts_dir(tmp_path_factory, masked_keras_model, tokenizer):
+    return write_artifacts(tmp_path_factory.mktemp("masked_artifacts"), masked_keras_model, tokenizer)
+
+@pytest.fixture
+def make_service(monkeypatch, artifacts_dir):
+    """Fabrique de DagsHubService chargés depuis les artifacts locaux (variables d'environnement en paramètres)"""
+    def factory(artifacts: str = None, **env):
+        monkeypatch.setenv("MODEL_RUN_ID", RUN_ID)
+        monkeypatch.setenv("MODEL_ARTIFACTS_DIR", artifacts or artifacts_dir)
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        
+        from services.dagshub_service import DagsHubService
+        service = DagsHubService()
+        assert service.load_model()
+        assert service.wait_for_config() == "success"
+        return service
+    return factory
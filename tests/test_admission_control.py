@@ -0,0 +1,57 @@
+import pytest
+
+from services.admission_control import AdmissionController, AdmissionRejectedError, OverloadedError
+
+class FakeExecutor:
+    """Exécuteur dont l'attente estimée est fixée : durée d'une tâche x tâches devant"""
+    
+    def __init__(self, task_seconds: float, queued_tasks: int = 0):
+        self.task_seconds = task_seconds
+        self.queued_tasks = queued_tasks
+    
+    def estimate_wait(self, extra_tasks: int = 0) -> float:
+        return self.task_seconds * (self.queued_tasks + extra_tasks)
+    
+    def get_stats(self):
+        return {'queue_depth': self.queued_tasks, 'rejected': 0}
+
+class FakeScheduler:
+    max_batch_size = 10
+    
+    def __init__(self, depth: int = 0):
+        self.depth = depth
+    
+    def queue_depth(self) -> int:
+        return self.depth
+
+class TestAdmissionControl:
+    """Contrôle d'admission : rejet immédiat au-delà du budget de latence ou de la borne de file"""
+    
+    def test_admitted_within_budget(self):
+        """Attente estimée sous le budget : requête admise"""
+        controller = AdmissionController(FakeExecutor(0.1, queued_tasks=2), FakeScheduler(5), latency_budget_ms=1000)
+        assert controller.admit() == pytest.approx(0.3)  # 2 tâches + 1 lot de micro-batching
+        assert controller.get_stats()["admitted"] == 1
+    
+    def test_rejected_over_budget(self):
+        """Attente au-delà du budget : AdmissionRejectedError avec le délai pour repasser sous le budget"""
+        controller = AdmissionController(FakeExecutor(0.5, queued_tasks=4), FakeScheduler(), latency_budget_ms=1000)
+        with pytest.raises(AdmissionRejectedError) as error:
+            controller.admit()
+        assert isinstance(error.value, OverloadedError)
+        assert error.value.retry_after == pytest.approx(1.0)
+        assert controller.get_stats()["shed_budget"] == 1
+    
+    def test_rejected_when_queue_full(self):
+        """File de micro-batching pleine : rejet même sans budget de latence"""
+        controller = AdmissionController(FakeExecutor(0.0), FakeScheduler(50), latency_budget_ms=0, max_queue=50)
+        with pytest.raises(AdmissionRejectedError) as error:
+            controller.admit()
+        assert error.value.retry_after >= 1.0
+        stats = controller.get_stats()
+        assert stats["shed_queue_full"] == 1 and stats["shed_total"] == 1
+    
+    def test_budget_disabled(self):
+        """Budget 0 : seule la borne de file s'applique"""
+        controller = AdmissionController(FakeExecutor(10.0, queued_tasks=100), FakeScheduler(), latency_budget_ms=0)
+        assert controller.admit() == pytest.approx(1000.0)
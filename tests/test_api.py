@@ -3,7 +3,9 @@ import sys
 import requests
 import json
 import pytest
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 def get_api_base_url():
     """Récupère l'URL de base de l'API avec plusieurs fallbacks"""
@@ -73,6 +75,184 @@ class TestAPIBasic:
             # Vérifier que la confiance est entre 0 et 1
             assert 0 <= data["confidence"] <= 1
     
+    def test_predict_lean_profile(self):
+        """Test du profil de réponse réduit et de la sélection de champs"""
+        payload = {"text": "Great service!", "prediction_id": "test-123"}
+        
+        response = requests.post(f"{API_BASE_URL}/predict?profile=lean", json=payload, timeout=30)
+        assert response.status_code == 200
+        assert set(response.json()) == {"sentiment", "confidence", "prediction_id"}
+        assert response.json()["prediction_id"] == "test-123"
+        
+        response = requests.post(
+            f"{API_BASE_URL}/predict", json=payload, headers={"X-Response-Fields": "sentiment,model_info"}, timeout=30
+        )
+        assert response.status_code == 200
+        assert set(response.json()) == {"sentiment", "model_info"}
+        
+        response = requests.post(f"{API_BASE_URL}/predict?fields=unknown_field", json=payload, timeout=30)
+        assert response.status_code == 400
+    
+    def test_predict_server_timing(self):
+        """Test des durées par étape (en-tête Server-Timing et corps avec timings=true)"""
+        response = requests.post(
+            f"{API_BASE_URL}/predict?profile=lean&timings=true",
+            json={"text": "Great service!"},
+            timeout=30
+        )
+        assert response.status_code == 200
+        assert "total;dur=" in response.headers["Server-Timing"]
+        
+        timings = response.json()["timings"]
+        assert timings["total"] >= timings["queue"] >= 0
+    
+    def test_metrics_endpoint(self):
+        """Test de l'export Prometheus après une prédiction (Azure non requis)"""
+        requests.post(f"{API_BASE_URL}/predict", json={"text": "Great service!"}, timeout=30)
+        
+        response = requests.get(f"{API_BASE_URL}/metrics", timeout=10)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'tweet_api_http_request_duration_seconds_count{method="POST",endpoint="/predict"' in response.text
+        assert "tweet_api_inference_batch_size_bucket" in response.text
+    
+    def test_predict_concurrent_identical(self):
+        """Test de requêtes identiques simultanées : même résultat, chacune avec son propre texte"""
+        texts = ["Viral tweet about delays", "viral tweet  about delays"] * 10
+        
+        def predict(text):
+            return requests.post(f"{API_BASE_URL}/predict", json={"text": text}, timeout=30)
+        
+        with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+            responses = list(executor.map(predict, texts))
+        
+        assert all(response.status_code == 200 for response in responses)
+        results = [response.json() for response in responses]
+        assert [result["text"] for result in results] == texts
+        assert len({(result["sentiment"], result["confidence"]) for result in results}) == 1
+    
+    def test_predict_unknown_model(self):
+        """Test qu'un run absent de MODEL_RUN_IDS est refusé sans chargement"""
+        response = requests.post(
+            f"{API_BASE_URL}/predict",
+            json={"text": "Great service!"},
+            headers={"X-Model-Run-Id": "run-inconnu"},
+            timeout=30
+        )
+        assert response.status_code == 404
+    
+    def test_model_swap_status(self):
+        """Test du statut de rechargement à chaud (snapshot servi)"""
+        response = requests.get(f"{API_BASE_URL}/admin/model", timeout=10)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["current"]["run_id"] is not None
+        assert data["status"] in ["idle", "loading", "validating", "swapped", "failed"]
+    
+    def test_model_reload_requires_admin_token(self):
+        """Test que le rechargement et le retour arrière sont refusés sans jeton d'administration valide"""
+        headers = {"X-Admin-Token": "jeton-invalide"}
+        response = requests.post(f"{API_BASE_URL}/admin/model/reload", json={}, headers=headers, timeout=10)
+        assert response.status_code in [401, 403]
+        
+        response = requests.post(f"{API_BASE_URL}/admin/model/rollback", headers=headers, timeout=10)
+        assert response.status_code in [401, 403]
+    
+    def test_predict_batch_endpoint(self):
+        """Test que l'endpoint batch retourne un résultat par texte, dans l'ordre"""
+        texts = ["Great service!", "Terrible experience", "Great service!"]
+        payload = {"texts": texts, "user_id": "test_user"}
+        
+        response = requests.post(f"{API_BASE_URL}/predict/batch", json=payload, timeout=30)
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["count"] == len(texts)
+        assert [r["text"] for r in data["results"]] == texts
+        for result in data["results"]:
+            assert result["sentiment"] in ["positive", "negative"]
+            assert 0 <= result["confidence"] <= 1
+        # Même texte => même score
+        assert data["results"][0]["raw_score"] == data["results"][2]["raw_score"]
+    
+    def test_predict_batch_msgpack(self):
+        """Test du lot en MessagePack : mêmes résultats que JSON, un tableau par résultat"""
+        msgpack = pytest.importorskip("msgpack")
+        texts = ["Great service!", "Terrible experience"]
+        
+        response = requests.post(
+            f"{API_BASE_URL}/predict/batch",
+            data=msgpack.packb({"texts": texts}),
+            headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+            timeout=30
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        
+        data = msgpack.unpackb(response.content)
+        results = [dict(zip(data["fields"], row)) for row in data["results"]]
+        expected = requests.post(f"{API_BASE_URL}/predict/batch", json={"texts": texts}, timeout=30).json()
+        assert results == expected["results"]
+    
+    def test_predict_stream_endpoint(self):
+        """Test du scoring NDJSON en flux avec erreur signalée sur la ligne concernée"""
+        lines = [
+            json.dumps({"text": "Great service!", "id": "a"}),
+            "not json",
+            json.dumps({"text": "Terrible experience", "id": "b"})
+        ]
+        body = "\n".join(lines) + "\n"
+        
+        response = requests.post(
+            f"{API_BASE_URL}/predict/stream",
+            data=body.encode("utf-8"),
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=30
+        )
+        assert response.status_code == 200
+        
+        results = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        assert [r["line"] for r in results] == [1, 2, 3]
+        assert results[0]["id"] == "a" and results[0]["sentiment"] in ["positive", "negative"]
+        assert "error" in results[1]
+        assert results[2]["id"] == "b" and 0 <= results[2]["confidence"] <= 1
+    
+    def test_scoring_job_lifecycle(self):
+        """Test d'un job asynchrone : soumission, suivi puis téléchargement des résultats"""
+        texts = ["Great service!", "Terrible experience", "Flight was on time"]
+        
+        response = requests.post(f"{API_BASE_URL}/jobs", json={"texts": texts, "user_id": "test_user"}, timeout=30)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        
+        for _ in range(60):
+            job = requests.get(f"{API_BASE_URL}/jobs/{job_id}", timeout=10).json()
+            if job["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.5)
+        assert job["status"] == "completed"
+        assert job["processed"] == len(texts)
+        
+        response = requests.get(f"{API_BASE_URL}/jobs/{job_id}/results", timeout=30)
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["line"] for row in rows] == [1, 2, 3]
+        for row in rows:
+            assert row["sentiment"] in ["positive", "negative"]
+    
+    def test_file_scoring_csv(self):
+        """Test du scoring d'un fichier CSV envoyé : Parquet en retour"""
+        csv_content = "id,text\n1,Great service!\n2,Terrible experience\n3,Flight was on time\n"
+        
+        response = requests.post(
+            f"{API_BASE_URL}/files/score",
+            files={"file": ("tweets.csv", csv_content, "text/csv")},
+            timeout=60
+        )
+        assert response.status_code == 200
+        assert response.headers["x-rows"] == "3"
+        assert response.content[:4] == b"PAR1"  # Signature Parquet
+    
     def test_feedback_endpoint(self):
         """Test que l'endpoint de feedback fonctionne"""
         feedback_data = {
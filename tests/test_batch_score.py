@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from conftest import RUN_ID
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXTS = ["Great service!", "Terrible experience", "Flight was on time", "delayed again", "ok"] * 4
+
+def run_cli(tmp_path, artifacts_dir, workers, backend, **env):
+    """Lance python -m utils.batch_score dans un processus séparé - retourne (lignes NDJSON, stderr)"""
+    source = tmp_path / "tweets.txt"
+    source.write_text("\n".join(TEXTS) + "\n", encoding="utf-8")
+    output = tmp_path / f"scores_{backend}_{workers}.ndjson"
+    result = subprocess.run(
+        [sys.executable, "-m", "utils.batch_score", str(source), "-o", str(output),
+         "--artifacts-dir", artifacts_dir, "--workers", str(workers), "--chunk-size", "3"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, timeout=300,
+        env={**os.environ, "MODEL_RUN_ID": RUN_ID, "INFERENCE_BACKEND": backend, **env}
+    )
+    assert result.returncode == 0, result.stderr
+    return [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()], result.stderr
+
+class TestBatchScoreCLI:
+    """CLI de scoring hors ligne : résultats dans l'ordre d'entrée, identiques quel que soit le nombre de processus"""
+    
+    def test_fork_workers_match_inline(self, tmp_path, artifacts_dir):
+        """Moteur NumPy : export construit hors du processus parent, workers forkés, mêmes scores qu'en un seul processus"""
+        inline, _ = run_cli(tmp_path, artifacts_dir, 1, "numpy")
+        forked, stderr = run_cli(tmp_path, artifacts_dir, 2, "numpy")
+        
+        assert "2 processus fork" in stderr
+        assert [row["line"] for row in forked] == list(range(1, len(TEXTS) + 1))
+        assert [row["text"] for row in forked] == TEXTS
+        assert forked == inline
+        assert {row["model_run_id"] for row in forked} == {RUN_ID}
+        assert not any(row["error"] for row in forked)
+    
+    def test_existing_export_reused(self, tmp_path, artifacts_dir):
+        """NUMPY_ENGINE_PATH fourni : export écrit une fois puis réutilisé"""
+        export_path = tmp_path / "engine.npz"
+        first, _ = run_cli(tmp_path, artifacts_dir, 2, "numpy", NUMPY_ENGINE_PATH=str(export_path))
+        assert export_path.exists()
+        mtime = export_path.stat().st_mtime
+        
+        second, stderr = run_cli(tmp_path, artifacts_dir, 2, "numpy", NUMPY_ENGINE_PATH=str(export_path))
+        assert export_path.stat().st_mtime == mtime
+        assert "fork" in stderr and second == first
+    
+    def test_tensorflow_backend_spawns_workers(self, tmp_path, artifacts_dir):
+        """Backend TensorFlow : processus spawn qui chargent chacun le modèle, mêmes labels que le moteur NumPy"""
+        spawned, stderr = run_cli(tmp_path, artifacts_dir, 2, "compiled")
+        numpy_rows, _ = run_cli(tmp_path, artifacts_dir, 1, "numpy")
+        
+        assert "2 processus spawn" in stderr
+        assert [row["sentiment"] for row in spawned] == [row["sentiment"] for row in numpy_rows]
+        assert [row["confidence"] for row in spawned] == pytest.approx([row["confidence"] for row in numpy_rows], abs=1e-4)
@@ -0,0 +1,72 @@
+import threading
+import pytest
+
+from services.batching_service import MicroBatchScheduler
+
+def _scores(texts):
+    return [{"text": text, "raw_score": len(text) / 100} for text in texts]
+
+class TestMicroBatching:
+    """Micro-batching : requêtes concurrentes regroupées, chacune reçoit son propre résultat"""
+    
+    def test_concurrent_submits_grouped(self):
+        """Requêtes arrivées dans la fenêtre : un seul lot, résultats dans l'ordre de soumission"""
+        batches = []
+        scheduler = MicroBatchScheduler(lambda texts: batches.append(list(texts)) or _scores(texts),
+                                        max_batch_size=8, max_wait_ms=200)
+        scheduler.start()
+        try:
+            texts = [f"tweet {i}" * (i + 1) for i in range(5)]
+            futures = [scheduler.submit(text) for text in texts]
+            results = [future.result(timeout=5) for future in futures]
+        finally:
+            scheduler.stop()
+        
+        assert [result["text"] for result in results] == texts
+        assert batches == [texts]
+        assert scheduler.get_stats()["largest_batch"] == 5
+    
+    def test_batch_size_bounded(self):
+        """Au-delà de max_batch_size : plusieurs lots"""
+        release = threading.Event()
+        batches = []
+        
+        def predict_batch(texts):
+            release.wait(5)
+            batches.append(len(texts))
+            return _scores(texts)
+        
+        scheduler = MicroBatchScheduler(predict_batch, max_batch_size=3, max_wait_ms=100)
+        scheduler.start()
+        try:
+            futures = [scheduler.submit(f"t{i}") for i in range(7)]
+            release.set()
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            scheduler.stop()
+        
+        assert sum(batches) == 7
+        assert max(batches) <= 3
+    
+    def test_batch_error_propagated(self):
+        """Erreur du modèle : toutes les requêtes du lot la reçoivent"""
+        def predict_batch(texts):
+            raise RuntimeError("modèle indisponible")
+        
+        scheduler = MicroBatchScheduler(predict_batch, max_batch_size=4, max_wait_ms=100)
+        scheduler.start()
+        try:
+            futures = [scheduler.submit(f"t{i}") for i in range(3)]
+            for future in futures:
+                with pytest.raises(RuntimeError, match="modèle indisponible"):
+                    future.result(timeout=5)
+        finally:
+            scheduler.stop()
+        assert scheduler.get_stats()["errors_count"] >= 1
+    
+    def test_submit_before_start_refused(self):
+        """File non démarrée : refus explicite"""
+        scheduler = MicroBatchScheduler(_scores)
+        with pytest.raises(RuntimeError):
+            scheduler.submit("tweet")
@@ -0,0 +1,72 @@
+import pytest
+
+from services.file_scoring import FileScoringService
+from services.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+CSV_CONTENT = "id,text\n1,Great service!\n2,Delayed again\n3,Terrible experience\n4,Flight was on time\n5,ok\n"
+
+def fake_predict_batch(texts):
+    return [{"sentiment": "positive", "confidence": 0.75, "raw_score": 0.75} for _ in texts]
+
+class CountingExecutor:
+    """Exécuteur réel dont les lots soumis sont enregistrés (file pleine simulée au premier appel)"""
+    
+    def __init__(self, reject_first=False):
+        self.executor = InferenceExecutor(max_workers=1)
+        self.batches = []
+        self.reject_first = reject_first
+    
+    def submit(self, fn, texts):
+        if self.reject_first:
+            self.reject_first = False
+            raise InferenceQueueFullError("File d'inférence pleine")
+        self.batches.append(len(texts))
+        return self.executor.submit(fn, texts)
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "tweets.csv"
+    path.write_text(CSV_CONTENT, encoding="utf-8")
+    return path
+
+class TestFileScoring:
+    """Scoring de fichiers : lots sur l'exécuteur d'inférence, sortie distincte de l'entrée"""
+    
+    def test_batches_run_on_inference_executor(self, csv_path, tmp_path, monkeypatch):
+        """Paquet découpé en lots de FILE_INFERENCE_BATCH_SIZE, chacun une tâche de l'exécuteur"""
+        monkeypatch.setenv("FILE_INFERENCE_BATCH_SIZE", "2")
+        executor = CountingExecutor()
+        service = FileScoringService(fake_predict_batch, model_run_id=lambda: "run-1", executor=executor)
+        
+        report = service.score_file(str(csv_path), str(tmp_path / "out.parquet"))
+        
+        assert report["rows"] == 5 and report["errors"] == 0
+        assert executor.batches == [2, 2, 1]
+        table = pq.read_table(tmp_path / "out.parquet")
+        assert table.column("id").to_pylist() == ["1", "2", "3", "4", "5"]
+        assert table.column("sentiment").to_pylist() == ["positive"] * 5
+        assert set(table.column("model_run_id").to_pylist()) == {"run-1"}
+    
+    def test_full_queue_retries_batch(self, csv_path, tmp_path, monkeypatch):
+        """File d'inférence pleine : le lot est relancé, aucune ligne en erreur"""
+        monkeypatch.setenv("FILE_YIELD_MS", "1")
+        executor = CountingExecutor(reject_first=True)
+        service = FileScoringService(fake_predict_batch, executor=executor)
+        
+        report = service.score_file(str(csv_path), str(tmp_path / "out.parquet"))
+        
+        assert report["errors"] == 0 and service.get_stats()["yields"] == 1
+        assert executor.batches == [5]
+    
+    def test_output_same_as_input_rejected(self, csv_path, tmp_path):
+        """Sortie identique à l'entrée : refus avant écriture, fichier d'entrée intact"""
+        source = tmp_path / "tweets.parquet"
+        service = FileScoringService(fake_predict_batch)
+        service.score_file(str(csv_path), str(source))
+        content = source.read_bytes()
+        
+        with pytest.raises(ValueError, match="différent de l'entrée"):
+            service.score_file(str(source), str(source))
+        assert source.read_bytes() == content
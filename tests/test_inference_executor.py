@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import pytest
+
+from services.admission_control import OverloadedError
+from services.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+class TestInferenceExecutor:
+    """Exécuteur d'inférence : file bornée, rejet explicite quand elle est pleine"""
+    
+    def test_queue_full_rejected(self):
+        """Workers occupés et file pleine : InferenceQueueFullError (surcharge) avec délai conseillé"""
+        release = threading.Event()
+        started = threading.Event()
+        
+        def blocking():
+            started.set()
+            release.wait(5)
+            return "ok"
+        
+        executor = InferenceExecutor(max_workers=1, max_queue=2)
+        try:
+            running = executor.submit(blocking)
+            assert started.wait(5)
+            queued = [executor.submit(lambda: "ok") for _ in range(2)]
+            
+            with pytest.raises(InferenceQueueFullError) as error:
+                executor.submit(lambda: "ok")
+            assert isinstance(error.value, OverloadedError)
+            assert executor.get_stats()["rejected"] == 1
+            
+            release.set()
+            assert [future.result(timeout=5) for future in [running] + queued] == ["ok"] * 3
+        finally:
+            release.set()
+            executor.shutdown()
+        assert executor.get_stats()["completed"] == 3
+    
+    def test_run_from_event_loop(self):
+        """run() attend la tâche sans bloquer la boucle asyncio ; les erreurs sont propagées"""
+        executor = InferenceExecutor(max_workers=2, max_queue=4)
+        
+        def fail():
+            raise ValueError("échec")
+        
+        async def scenario():
+            assert await executor.run(lambda x: x * 2, 21) == 42
+            with pytest.raises(ValueError):
+                await executor.run(fail)
+        
+        try:
+            asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+        assert executor.get_stats()["failed"] == 1
+    
+    def test_wait_estimate_grows_with_queue(self):
+        """Attente estimée nulle tant qu'un worker est libre, puis proportionnelle à la file"""
+        release = threading.Event()
+        executor = InferenceExecutor(max_workers=1, max_queue=8)
+        try:
+            executor.submit(lambda: None).result(timeout=5)  # Durée moyenne mesurée
+            assert executor.estimate_wait() == 0.0
+            
+            executor.submit(release.wait, 5)
+            executor.submit(lambda: None)
+            assert executor.estimate_wait() > 0.0
+            assert executor.estimate_wait(extra_tasks=3) > executor.estimate_wait()
+        finally:
+            release.set()
+            executor.shutdown()
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from conftest import MAX_LEN
+from services.numpy_lstm_engine import pad_sequences_post
+from services.reference_corpus import DEFAULT_REFERENCE_TEXTS
+
+def _reference_batch(tokenizer, max_len: int = MAX_LEN):
+    return pad_sequences_post(tokenizer.texts_to_sequences(DEFAULT_REFERENCE_TEXTS), max_len)
+
+class TestWarmup:
+    """Préchauffage : formes du max_len configuré, nouveau passage si la configuration le modifie"""
+    
+    def test_warmup_covers_configured_shapes(self, make_service):
+        """Chaque taille de lot est préchauffée sur le max_len de model_config.json"""
+        service = make_service(INFERENCE_BACKEND="compiled", INFERENCE_WARMUP_BATCH_SIZES="1,4", BUCKETING_MODE="off")
+        
+        report = service.warmup_report
+        assert service.warmup_status == "ready"
+        assert report["max_len"] == MAX_LEN
+        assert set(report["shapes_ms"]) == {f"1x{MAX_LEN}", f"4x{MAX_LEN}"}
+    
+    def test_rewarm_when_config_changes_max_len(self, make_service):
+        """Configuration arrivée après le préchauffage : formes du nouveau max_len, instance prête entre-temps"""
+        service = make_service(INFERENCE_BACKEND="compiled", INFERENCE_WARMUP_BATCH_SIZES="2", BUCKETING_MODE="off")
+        
+        service._rewarm_for_config()
+        assert service.warmup_report["max_len"] == MAX_LEN  # max_len inchangé : aucun nouveau passage
+        
+        service.model_config = {**service.model_config, "hyperparameters": {"max_len": MAX_LEN + 7}}
+        service._rewarm_for_config()
+        assert service.warmup_status == "ready"
+        assert service.warmup_report["max_len"] == MAX_LEN + 7
+        assert list(service.warmup_report["shapes_ms"]) == [f"2x{MAX_LEN + 7}"]
+
+
+class TestCompiledInference:
+    """Chemin compilé (tf.function) : mêmes scores que Model.predict, un seul traçage"""
+    
+    def test_parity_with_keras(self, keras_model, tokenizer):
+        """Scores identiques à Model.predict, formes variées sans retraçage"""
+        from services.compiled_inference import CompiledInferenceFunction
+        
+        engine = CompiledInferenceFunction(keras_model)
+        padded = _reference_batch(tokenizer)
+        np.testing.assert_allclose(engine(padded), keras_model.predict(padded, verbose=0), atol=1e-5)
+        
+        engine(padded[:3, :MAX_LEN // 2])
+        assert engine.get_stats()["trace_count"] == 1
+    
+    def test_service_serves_compiled_path(self, make_service, keras_model, tokenizer):
+        """Service configuré en compiled : chemin actif et parité sur predict_batch"""
+        service = make_service(INFERENCE_BACKEND="compiled", BUCKETING_MODE="off", PREDICTION_CACHE_ENABLED="false")
+        assert service.inference_engine_name == "compiled"
+        
+        expected = keras_model.predict(_reference_batch(tokenizer), verbose=0)[:, 0]
+        scores = [result["raw_score"] for result in service.predict_batch(DEFAULT_REFERENCE_TEXTS)]
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+class TestTFLiteBackend:
+    """Backend TFLite : parité avec Keras par forme statique, repli sur le chemin compilé sinon"""
+    
+    def test_parity_with_keras(self, tmp_path, keras_model, tokenizer):
+        """Lots découpés et complétés vers les tailles converties : mêmes scores que Keras, flatbuffers en cache"""
+        from services.tflite_backend import TFLiteBackend
+        
+        padded = _reference_batch(tokenizer)
+        engine = TFLiteBackend(keras_model, MAX_LEN, [1, 8], model_dir=str(tmp_path), model_key="test")
+        np.testing.assert_allclose(engine(padded), keras_model.predict(padded, verbose=0), atol=1e-5)
+        assert engine.get_stats()["padded_rows"] == (-len(padded)) % 8
+        
+        cached = TFLiteBackend(None, MAX_LEN, [1, 8], model_dir=str(tmp_path), model_key="test")
+        np.testing.assert_array_equal(cached(padded), engine(padded))
+        assert cached.get_stats()["converted_shapes"] == 0
+    
+    def test_fallback_when_parity_fails(self, make_service):
+        """Parité hors tolérance : backend TFLite écarté, le service sert le chemin compilé"""
+        service = make_service(INFERENCE_BACKEND="tflite", TFLITE_PARITY_TOLERANCE="-1",
+                               INFERENCE_WARMUP_BATCH_SIZES="1", BUCKETING_MODE="off")
+        assert service.inference_engine_name == "compiled"
+        assert service.backend_parity["passed"] is False
+
+class TestLengthBucketing:
+    """Regroupement par longueur : actif en mode exact seulement si le modèle masque le padding"""
+    
+    def test_exact_active_on_masked_model(self, make_service, masked_artifacts_dir, masked_keras_model, tokenizer):
+        """Modèle masqué : paliers de longueur vérifiés puis servis, mêmes scores que le padding complet"""
+        service = make_service(masked_artifacts_dir, INFERENCE_BACKEND="compiled", BUCKETING_MODE="exact",
+                               INFERENCE_WARMUP_BATCH_SIZES="1", PREDICTION_CACHE_ENABLED="false")
+        assert service.bucketing_report["active"] is True
+        assert service.bucketing_report["model_masks_padding"] is True
+        
+        expected = masked_keras_model.predict(_reference_batch(tokenizer), verbose=0)[:, 0]
+        scores = [result["raw_score"] for result in service.predict_batch(DEFAULT_REFERENCE_TEXTS)]
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+        assert sum(service.bucketer.get_stats()["rows_per_bucket"].values()) == len(DEFAULT_REFERENCE_TEXTS)
+    
+    def test_exact_disabled_on_unmasked_model(self, make_service):
+        """Padding non masqué : mode exact désactivé, raison dans le rapport"""
+        service = make_service(INFERENCE_BACKEND="compiled", BUCKETING_MODE="exact", INFERENCE_WARMUP_BATCH_SIZES="1")
+        assert service.bucketer is None
+        assert service.bucketing_report["active"] is False
+        assert service.bucketing_report["model_masks_padding"] is False
+        assert "masque" in service.bucketing_report["reason"]
+    
+    def test_approximate_refused_below_agreement(self, make_service):
+        """Mode approximatif avec un seuil d'accord inatteignable : refusé après mesure"""
+        service = make_service(INFERENCE_BACKEND="compiled", BUCKETING_MODE="approximate",
+                               BUCKETING_MIN_AGREEMENT="1.01", INFERENCE_WARMUP_BATCH_SIZES="1")
+        assert service.bucketer is None
+        assert service.bucketing_report["active"] is False
+        assert "label_agreement" in service.bucketing_report
+
+class TestQuantization:
+    """Quantification : activée seulement si l'accord des labels avec le moteur float32 atteint le seuil"""
+    
+    @pytest.mark.parametrize("mode", ["float16", "int8"])
+    def test_quantized_engine_close_to_keras(self, keras_model, tokenizer, mode):
+        """Poids quantifiés : scores proches de Keras, poids plus légers"""
+        from services.numpy_lstm_engine import NumpyLSTMEngine
+        
+        engine = NumpyLSTMEngine.from_keras_model(keras_model)
+        quantized = engine.quantize(mode)
+        padded = _reference_batch(tokenizer)
+        np.testing.assert_allclose(quantized(padded), keras_model.predict(padded, verbose=0), atol=0.05)
+        assert quantized.nbytes < engine.nbytes
+    
+    def test_quantization_accepted(self, make_service):
+        """Accord suffisant : moteur quantifié servi, rapport complet"""
+        service = make_service(INFERENCE_BACKEND="numpy", QUANTIZATION_MODE="float16", QUANTIZATION_MIN_AGREEMENT="0.9",
+                               BUCKETING_MODE="off", INFERENCE_WARMUP_BATCH_SIZES="1")
+        report = service.quantization_report
+        assert report["active"] is True
+        assert report["label_agreement"] >= 0.9
+        assert report["quantized_kb"] < report["float32_kb"]
+    
+    def test_quantization_refused_below_agreement(self, make_service):
+        """Seuil d'accord inatteignable : moteur float32 conservé"""
+        service = make_service(INFERENCE_BACKEND="numpy", QUANTIZATION_MODE="int8", QUANTIZATION_MIN_AGREEMENT="1.01",
+                               BUCKETING_MODE="off", INFERENCE_WARMUP_BATCH_SIZES="1")
+        assert service.inference_engine_name == "numpy"
+        assert service.quantization_report["active"] is False
+        assert "seuil" in service.quantization_report["reason"]
+        assert service.inference_engine.get_stats()["quantization"] == "float32"
+    
+    def test_quantization_unavailable_on_compiled(self, make_service):
+        """Chemin compilé : quantification non proposée, raison dans le rapport"""
+        service = make_service(INFERENCE_BACKEND="compiled", QUANTIZATION_MODE="int8",
+                               BUCKETING_MODE="off", INFERENCE_WARMUP_BATCH_SIZES="1")
+        assert service.quantization_report["active"] is False
+        assert "compiled" in service.quantization_report["reason"]
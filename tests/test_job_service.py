@@ -0,0 +1,88 @@
+import time
+
+from services.inference_executor import InferenceExecutor, InferenceQueueFullError
+from services.job_service import JobService
+
+def fake_predict_batch(texts):
+    return [{"sentiment": "positive", "confidence": 0.9, "raw_score": 0.9} for _ in texts]
+
+def wait_for_status(service, job_id, statuses=("completed", "failed"), timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get_job(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    return service.get_job(job_id)
+
+class SaturatedOnceExecutor:
+    """Exécuteur dont la file est pleine au premier appel"""
+    
+    def __init__(self):
+        self.executor = InferenceExecutor(max_workers=1)
+        self.rejected = 0
+    
+    def submit(self, fn, *args):
+        if not self.rejected:
+            self.rejected += 1
+            raise InferenceQueueFullError("File d'inférence pleine")
+        return self.executor.submit(fn, *args)
+
+class TestJobService:
+    """Jobs de scoring : paquets évalués sur l'exécuteur d'inférence, réceptions interrompues nettoyées"""
+    
+    def test_chunks_run_on_inference_executor(self, tmp_path, monkeypatch):
+        """Chaque paquet est une tâche de l'exécuteur borné, pas un appel sur le thread du job"""
+        monkeypatch.setenv("JOB_POLL_SECONDS", "0.02")
+        executor = InferenceExecutor(max_workers=1)
+        service = JobService(fake_predict_batch, db_path=str(tmp_path / "jobs.db"), chunk_size=2, executor=executor)
+        service.start()
+        try:
+            job = service.submit_texts(["a", "b", "c", "d", "e"])
+            job = wait_for_status(service, job["job_id"])
+        finally:
+            service.stop()
+        
+        assert job["status"] == "completed" and job["processed"] == 5 and job["errors"] == 0
+        assert executor.get_stats()["completed"] == 3
+    
+    def test_full_queue_retries_chunk(self, tmp_path, monkeypatch):
+        """File d'inférence pleine : le job cède puis évalue le même paquet, sans ligne en erreur"""
+        monkeypatch.setenv("JOB_POLL_SECONDS", "0.02")
+        monkeypatch.setenv("JOB_YIELD_MS", "5")
+        executor = SaturatedOnceExecutor()
+        service = JobService(fake_predict_batch, db_path=str(tmp_path / "jobs.db"), chunk_size=2, executor=executor)
+        service.start()
+        try:
+            job = wait_for_status(service, service.submit_texts(["a", "b", "c"])["job_id"])
+        finally:
+            service.stop()
+        
+        assert job["status"] == "completed" and job["errors"] == 0
+        assert executor.rejected == 1 and service.stats["yields"] >= 1
+    
+    def test_stale_receiving_jobs_failed_on_start(self, tmp_path, monkeypatch):
+        """Jobs en réception d'un processus arrêté : marqués en échec au démarrage, paquets supprimés"""
+        db_path = str(tmp_path / "jobs.db")
+        crashed = JobService(fake_predict_batch, db_path=db_path)
+        own_job = crashed.create_job()
+        crashed.add_chunk(own_job, 0, [{"line": 1, "id": None, "text": "a"}])
+        
+        other = JobService(fake_predict_batch, db_path=db_path)
+        other.owner = "autre-hote:42"
+        recent_job = other.create_job()   # Envoi en cours dans un autre worker
+        old_job = other.create_job()      # Aucun paquet reçu depuis longtemps
+        with other._conn:
+            other._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 3600, old_job))
+        
+        monkeypatch.setenv("JOB_POLL_SECONDS", "0.02")
+        restarted = JobService(fake_predict_batch, db_path=db_path)
+        restarted.start()
+        restarted.stop()
+        
+        assert restarted.get_job(own_job)["status"] == "failed"
+        assert restarted.get_job(old_job)["status"] == "failed"
+        assert restarted.get_job(recent_job)["status"] == "receiving"
+        assert restarted.get_result_chunk(own_job) is None
+        assert restarted._conn.execute("SELECT COUNT(*) FROM job_chunks WHERE job_id = ?", (own_job,)).fetchone()[0] == 0
+        assert restarted.stats["abandoned_receptions"] == 2
@@ -0,0 +1,45 @@
+import os
+
+from services import metrics, prefork_server
+
+class TestMetricsWorkerLabel:
+    """Étiquette worker : lue une fois par processus, relue dans chaque enfant forké"""
+    
+    def test_worker_label_cached(self, monkeypatch):
+        """Exports successifs : get_process_info n'est appelé qu'une fois"""
+        calls = []
+        
+        def process_info():
+            calls.append(1)
+            return {'worker_id': None}
+        
+        monkeypatch.setattr(metrics, "get_process_info", process_info)
+        monkeypatch.setattr(metrics, "_worker_label", None)
+        registry = metrics.MetricsRegistry("test_")
+        registry.counter("events_total", "Événements").inc()
+        
+        for _ in range(3):
+            assert 'worker="0"' in registry.render()
+        assert len(calls) == 1
+    
+    def test_worker_label_reset_after_fork(self, monkeypatch):
+        """Enfant forké : identifiant du worker relu après le fork"""
+        monkeypatch.setattr(metrics, "_worker_label", None)
+        assert metrics._constant()['worker'] == "0"
+        
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                prefork_server._process_state['worker_id'] = 3
+                os.write(write_fd, metrics._constant()['worker'].encode())
+            finally:
+                os._exit(0)
+        
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            label = f.read()
+        os.waitpid(pid, 0)
+        assert label == "3"
+        assert metrics._constant()['worker'] == "0"
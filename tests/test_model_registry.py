@@ -0,0 +1,50 @@
+import pytest
+
+from services.model_registry import ModelRegistry, ModelLoadError, ModelNotAllowedError
+
+class FakeService:
+    """Modèle par défaut déjà chargé"""
+    
+    model_run_id = "run-default"
+    inference_engine_name = "numpy"
+    load_seconds = 0.0
+    prediction_cache = None
+    
+    def memory_footprint_bytes(self):
+        return 1024
+
+class TestModelRegistry:
+    """Registre multi-modèles : runs autorisés seulement, erreurs de chargement lisibles"""
+    
+    def _registry(self, **kwargs):
+        return ModelRegistry(FakeService(), executor=None, allowed_run_ids=["run-b"], micro_batching=False, **kwargs)
+    
+    def test_unknown_run_refused(self):
+        """Run absent de MODEL_RUN_IDS : refus sans chargement"""
+        with pytest.raises(ModelNotAllowedError):
+            self._registry().get("run-inconnu")
+    
+    def test_missing_credentials_reported(self, monkeypatch):
+        """Run autorisé sans artifacts locaux ni identifiants DagsHub : message explicite, pas l'erreur brute"""
+        monkeypatch.setenv("MODEL_RUN_ID", "run-default")
+        for name in ("MODEL_ARTIFACTS_DIR", "DAGSHUB_USERNAME", "DAGSHUB_TOKEN"):
+            monkeypatch.delenv(name, raising=False)
+        registry = self._registry()
+        
+        with pytest.raises(ModelLoadError, match="identifiants DagsHub absents pour le run run-b"):
+            registry.get("run-b")
+        assert registry.get_stats()["load_failures"] == 1
+    
+    def test_failed_load_reported(self):
+        """Chargement refusé par le service : ModelLoadError, rien n'est enregistré"""
+        class MissingModel(FakeService):
+            def __init__(self, run_id):
+                self.model_run_id = run_id
+            
+            def load_model(self):
+                return False
+        
+        registry = self._registry(service_factory=MissingModel)
+        with pytest.raises(ModelLoadError, match="introuvable"):
+            registry.get("run-b")
+        assert [model["run_id"] for model in registry.get_stats()["loaded"]] == ["run-default"]
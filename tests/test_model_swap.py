@@ -0,0 +1,97 @@
+import time
+
+from services.model_swap import ModelSwapper
+
+class FakeService:
+    """Snapshot minimal : chargement, configuration et scores fixes"""
+    
+    def __init__(self, run_id, score=0.9):
+        self.model_run_id = run_id
+        self.model = object()
+        self.model_info = {}
+        self.inference_engine_name = "numpy"
+        self.config_loading_status = "success"
+        self.numpy_engine_path = f"/tmp/engine.{run_id}.npz"
+        self.tflite_model_dir = "/tmp/tflite"
+        self.warmup_status = "ready"
+        self.loaded_with = None
+        self.score = score
+    
+    def load_model(self):
+        self.loaded_with = (self.numpy_engine_path, self.tflite_model_dir)
+        return True
+    
+    def wait_for_config(self):
+        return "success"
+    
+    def warmup_inference(self):
+        return {}
+    
+    def predict_batch(self, texts):
+        sentiment = "positive" if self.score > 0.5 else "negative"
+        return [{"raw_score": self.score, "sentiment": sentiment} for _ in texts]
+
+def _wait(swapper, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while swapper._thread.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return swapper.status
+
+class TestModelSwapper:
+    """Rechargement à chaud : snapshot chargé sans caches sur disque, publication puis retour arrière"""
+    
+    def _swapper(self):
+        state = {'current': FakeService("run-a")}
+        swapper = ModelSwapper(lambda: state['current'], lambda service: state.update(current=service),
+                               service_factory=FakeService)
+        return swapper, state
+    
+    def test_reload_ignores_disk_caches(self):
+        """Export NumPy et cache TFLite ni lus ni écrits : artifacts mis à jour toujours pris en compte"""
+        swapper, state = self._swapper()
+        swapper.reload("run-a")
+        assert _wait(swapper) == "swapped"
+        assert state['current'].loaded_with == (None, None)
+        assert swapper.previous.model_run_id == "run-a"
+    
+    def test_rollback_restores_previous(self):
+        """Retour arrière : le snapshot remplacé est de nouveau servi"""
+        swapper, state = self._swapper()
+        original = state['current']
+        swapper.reload("run-b")
+        assert _wait(swapper) == "swapped"
+        assert state['current'].model_run_id == "run-b"
+        
+        swapper.rollback()
+        assert state['current'] is original
+    
+    def test_reload_refused_below_agreement(self):
+        """Accord insuffisant avec le modèle servi : snapshot non publié"""
+        swapper, state = self._swapper()
+        swapper.service_factory = lambda run_id: FakeService(run_id, score=0.1)
+        swapper.reload("run-b", min_agreement=0.5)
+        assert _wait(swapper) == "failed"
+        assert state['current'].model_run_id == "run-a"
+
+class TestModelAdminEndpoints:
+    """Endpoints /admin/model/* : jeton d'administration exigé, refus en mode pré-fork"""
+    
+    def test_reload_access_control(self, monkeypatch):
+        """Sans ADMIN_TOKEN : 403 ; jeton invalide : 401 ; worker pré-fork : 409"""
+        from fastapi.testclient import TestClient
+        import main
+        from services import prefork_server
+        
+        client = TestClient(main.app)  # Sans démarrage : aucun modèle chargé
+        monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+        assert client.post("/admin/model/reload", json={}).status_code == 403
+        
+        monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+        assert client.post("/admin/model/rollback", headers={"X-Admin-Token": "autre"}).status_code == 401
+        # Jeton valide, processus unique : swapper non initialisé ici
+        assert client.post("/admin/model/rollback", headers={"X-Admin-Token": "secret"}).status_code == 503
+        
+        monkeypatch.setitem(prefork_server._process_state, "mode", "prefork")
+        response = client.post("/admin/model/reload", json={}, headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 409
+        assert "pré-fork" in response.json()["detail"]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from conftest import MAX_LEN, VOCAB_SIZE
+from services.numpy_lstm_engine import NumpyLSTMEngine, NumpyTokenizer, pad_sequences_post
+from services.reference_corpus import DEFAULT_REFERENCE_TEXTS
+
+class TestNumpyEngine:
+    """Moteur LSTM NumPy : parité avec Keras, export et validation des entrées"""
+    
+    @pytest.mark.parametrize("model_fixture", ["keras_model", "masked_keras_model"])
+    def test_parity_with_keras(self, request, tokenizer, model_fixture):
+        """Mêmes scores que Model.predict sur le corpus de référence (avec et sans masque)"""
+        model = request.getfixturevalue(model_fixture)
+        padded = pad_sequences_post(tokenizer.texts_to_sequences(DEFAULT_REFERENCE_TEXTS), MAX_LEN)
+        
+        expected = model.predict(padded, verbose=0)
+        scores = NumpyLSTMEngine.from_keras_model(model)(padded)
+        assert scores.shape == expected.shape
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+    
+    def test_tokenizer_matches_keras(self, tokenizer):
+        """texts_to_sequences identique au Tokenizer Keras (num_words et OOV compris)"""
+        texts = DEFAULT_REFERENCE_TEXTS + ["mot-inconnu ZZZ, Vol!!"]
+        numpy_tokenizer = NumpyTokenizer.from_keras_tokenizer(tokenizer)
+        assert numpy_tokenizer.texts_to_sequences(texts) == tokenizer.texts_to_sequences(texts)
+    
+    def test_export_roundtrip(self, tmp_path, masked_keras_model, tokenizer):
+        """L'export .npz se recharge sans TensorFlow avec les mêmes scores"""
+        engine = NumpyLSTMEngine.from_keras_model(masked_keras_model)
+        path = str(tmp_path / "engine.npz")
+        engine.save(path, NumpyTokenizer.from_keras_tokenizer(tokenizer), MAX_LEN)
+        
+        loaded, loaded_tokenizer, max_len = NumpyLSTMEngine.load(path)
+        assert max_len == MAX_LEN and loaded.mask_zero
+        padded = pad_sequences_post(loaded_tokenizer.texts_to_sequences(DEFAULT_REFERENCE_TEXTS), MAX_LEN)
+        np.testing.assert_array_equal(loaded(padded), engine(padded))
+    
+    def test_out_of_vocabulary_id_rejected(self, keras_model):
+        """Identifiant au-delà de l'embedding : erreur explicite, pas la dernière ligne"""
+        engine = NumpyLSTMEngine.from_keras_model(keras_model)
+        padded = np.array([[3, VOCAB_SIZE, 0], [2, 1, 0]], dtype=np.int32)
+        with pytest.raises(ValueError, match=f"hors vocabulaire: {VOCAB_SIZE}"):
+            engine(padded)
+        with pytest.raises(ValueError, match="hors vocabulaire"):
+            engine.quantize("int8")(np.array([[-1, 2]], dtype=np.int32))
+    
+    def test_unsupported_architecture_refused(self):
+        """Couche hors Embedding -> LSTM -> Dense : refus à l'export (repli sur un autre backend)"""
+        tf = pytest.importorskip("tensorflow")
+        model = tf.keras.Sequential([
+            tf.keras.Input((None,), dtype="int32"),
+            tf.keras.layers.Embedding(VOCAB_SIZE, 8),
+            tf.keras.layers.GRU(4),
+            tf.keras.layers.Dense(1, activation="sigmoid")
+        ])
+        with pytest.raises(ValueError, match="GRU"):
+            NumpyLSTMEngine.from_keras_model(model)
+    
+    def test_service_falls_back_when_parity_fails(self, make_service):
+        """Parité hors tolérance au chargement : le service sert le chemin compilé"""
+        service = make_service(INFERENCE_BACKEND="numpy", NUMPY_PARITY_TOLERANCE="-1",
+                               BUCKETING_MODE="off", INFERENCE_WARMUP_BATCH_SIZES="1")
+        assert service.inference_engine_name == "compiled"
+        assert service.backend_parity["passed"] is False
@@ -0,0 +1,61 @@
+import time
+
+from services.prediction_cache import PredictionCache, normalize_text
+
+class TestPredictionCache:
+    """Cache à deux niveaux : LRU borné, expiration, invalidation au changement de modèle"""
+    
+    def test_normalization(self):
+        """Casse et espaces multiples sans effet sur la clé"""
+        assert normalize_text("  Great   SERVICE ") == "great service"
+        assert normalize_text("Great  Service", lower=False) == "Great Service"
+    
+    def test_lru_eviction(self):
+        """Au-delà de max_entries : l'entrée la moins récemment lue est évincée"""
+        cache = PredictionCache(max_entries=2, max_bytes=1 << 20, ttl_seconds=60)
+        cache.put_sequence("a", [1])
+        cache.put_sequence("b", [2])
+        assert cache.get_sequence("a") == [1]  # "b" devient la plus ancienne
+        cache.put_sequence("c", [3])
+        
+        assert cache.get_sequence("b") is None
+        assert cache.get_sequence("a") == [1] and cache.get_sequence("c") == [3]
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_token_key_truncates_to_max_len(self):
+        """Séquences identiques après troncature : même score"""
+        cache = PredictionCache(ttl_seconds=60)
+        cache.put_score(PredictionCache.token_key([4, 5, 6, 7], 3), 0.8)
+        assert cache.get_score(PredictionCache.token_key([4, 5, 6, 9], 3)) == 0.8
+        assert cache.get_score(PredictionCache.token_key([4, 5, 6], 4)) is None
+    
+    def test_expiration(self):
+        """Entrée expirée : absente et comptée"""
+        cache = PredictionCache(ttl_seconds=0.01)
+        cache.put_sequence("a", [1])
+        time.sleep(0.05)
+        assert cache.get_sequence("a") is None
+        assert cache.get_stats()["expirations"] == 1
+    
+    def test_scope_change_invalidates(self):
+        """Nouveau run servi : les deux niveaux sont vidés"""
+        cache = PredictionCache(ttl_seconds=60)
+        cache.set_scope("run-a")
+        cache.put_sequence("a", [1])
+        cache.put_score(PredictionCache.token_key([1], 5), 0.3)
+        
+        cache.set_scope("run-a")
+        assert cache.get_sequence("a") == [1]
+        cache.set_scope("run-b")
+        assert cache.get_sequence("a") is None
+        assert cache.get_stats()["invalidations"] == 1
+    
+    def test_service_serves_cached_scores(self, make_service):
+        """Service : texte répété servi par le cache avec le même score"""
+        service = make_service(INFERENCE_BACKEND="compiled", BUCKETING_MODE="off", INFERENCE_WARMUP_BATCH_SIZES="1")
+        first = service.predict("Great service today!")
+        second = service.predict("great   service today!")
+        
+        assert second["raw_score"] == first["raw_score"]
+        stats = service.prediction_cache.get_stats()
+        assert stats["text_hits"] >= 1 and stats["scope"] == service.model_run_id
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import subprocess
+import pytest
+import requests
+
+from conftest import RUN_ID
+from services.reference_corpus import DEFAULT_REFERENCE_TEXTS
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(scope="module")
+def numpy_export(tmp_path_factory, artifacts_dir):
+    """Export NumPy construit par ensure_numpy_export (processus dédié, comme avant le fork)"""
+    from services.dagshub_service import ensure_numpy_export
+    
+    path = str(tmp_path_factory.mktemp("export") / "engine.npz")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MODEL_RUN_ID", RUN_ID)
+        monkeypatch.setenv("MODEL_ARTIFACTS_DIR", artifacts_dir)
+        assert ensure_numpy_export(path) == path
+    return path
+
+class TestPrefork:
+    """Pré-fork : parent chargé sans TensorFlow depuis l'export, workers forkés identiques au parent"""
+    
+    def test_parent_loads_export_without_tensorflow(self, numpy_export, artifacts_dir):
+        """Processus neuf chargé depuis l'export : moteur NumPy et TensorFlow jamais importé"""
+        code = (
+            "import sys, json; from services.dagshub_service import DagsHubService; "
+            "service = DagsHubService(); service.load_model(); "
+            "print(json.dumps([service.inference_engine_name, 'tensorflow' in sys.modules]))"
+        )
+        env = {**os.environ, "MODEL_RUN_ID": RUN_ID, "MODEL_ARTIFACTS_DIR": artifacts_dir,
+               "INFERENCE_BACKEND": "numpy", "NUMPY_ENGINE_PATH": numpy_export}
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, env=env,
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout.splitlines()[-1]) == ["numpy", False]
+    
+    def test_existing_export_reused(self, numpy_export):
+        """Export déjà présent : aucun nouveau processus de conversion"""
+        from services.dagshub_service import ensure_numpy_export
+        
+        modified = os.path.getmtime(numpy_export)
+        assert ensure_numpy_export(numpy_export) == numpy_export
+        assert os.path.getmtime(numpy_export) == modified
+    
+    def test_forked_worker_matches_parent(self, make_service, numpy_export):
+        """Worker forké après le préchargement : mêmes scores que le parent et que le modèle Keras"""
+        service = make_service(INFERENCE_BACKEND="numpy", NUMPY_ENGINE_PATH=numpy_export, QUANTIZATION_MODE="off")
+        assert service.inference_engine_name == "numpy"
+        expected = [result["raw_score"] for result in service.predict_batch(DEFAULT_REFERENCE_TEXTS)]
+        
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                os.close(read_fd)
+                scores = [result["raw_score"] for result in service.predict_batch(DEFAULT_REFERENCE_TEXTS)]
+                with os.fdopen(write_fd, "w") as f:
+                    json.dump(scores, f)
+            except Exception:
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            output = f.read()
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert json.loads(output) == expected
+    
+    def test_health_reports_preload_seconds(self, numpy_export, artifacts_dir, tmp_path):
+        """python main.py avec API_WORKERS=2 : durée du préchargement (export + modèle) dans /health"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = {**os.environ, "MODEL_RUN_ID": RUN_ID, "MODEL_ARTIFACTS_DIR": artifacts_dir, "INFERENCE_BACKEND": "numpy",
+               "NUMPY_ENGINE_PATH": numpy_export, "API_WORKERS": "2", "API_HOST": "127.0.0.1", "API_PORT": str(port),
+               "DASH_UI_ENABLED": "false", "JOBS_DB_PATH": str(tmp_path / "jobs.sqlite3")}
+        server = subprocess.Popen([sys.executable, "main.py"], cwd=PROJECT_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            health = None
+            deadline = time.monotonic() + 120
+            while health is None and time.monotonic() < deadline and server.poll() is None:
+                try:
+                    health = requests.get(f"http://127.0.0.1:{port}/health", timeout=5).json()
+                except requests.RequestException:
+                    time.sleep(0.5)
+            assert health is not None, "API pré-fork non démarrée"
+            
+            process = health["inference"]["process"]
+            assert process["mode"] == "prefork"
+            assert process["worker_id"] in (0, 1)
+            assert process["preload_seconds"] > 0
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+    
+    def test_process_info_single_mode(self):
+        """Hors pré-fork : processus unique, sans identifiant de worker"""
+        from services.prefork_server import get_process_info
+        
+        info = get_process_info()
+        assert info["mode"] == "single"
+        assert info["worker_id"] is None
+        assert info["pid"] == os.getpid()
@@ -0,0 +1,58 @@
+from concurrent.futures import Future
+import pytest
+
+from services.prediction_cache import normalize_text
+from services.request_coalescing import RequestCoalescer
+
+class TestRequestCoalescing:
+    """Regroupement single-flight : un calcul par texte normalisé en vol, un Future par appelant"""
+    
+    def _coalescer(self):
+        computations = []
+        
+        def submit(text):
+            future = Future()
+            computations.append((text, future))
+            return future
+        
+        return RequestCoalescer(submit, normalize_text), computations
+    
+    def test_identical_requests_share_computation(self):
+        """Même texte normalisé : un seul calcul, chaque résultat garde le texte de son appelant"""
+        coalescer, computations = self._coalescer()
+        first = coalescer.submit("Great service")
+        second = coalescer.submit("great   service")
+        assert len(computations) == 1
+        
+        computations[0][1].set_result({"text": "Great service", "raw_score": 0.9})
+        assert first.result()["text"] == "Great service"
+        assert second.result() == {"text": "great   service", "raw_score": 0.9}
+        assert coalescer.get_stats()["coalesced"] == 1
+    
+    def test_key_released_after_completion(self):
+        """Rien n'est conservé : une requête après le calcul en relance un"""
+        coalescer, computations = self._coalescer()
+        coalescer.submit("tweet")
+        computations[0][1].set_result({"text": "tweet"})
+        coalescer.submit("tweet")
+        assert len(computations) == 2
+        assert coalescer.get_stats()["in_flight"] == 1
+    
+    def test_error_propagated_to_all_waiters(self):
+        """Calcul en échec : chaque appelant reçoit l'erreur"""
+        coalescer, computations = self._coalescer()
+        futures = [coalescer.submit("tweet") for _ in range(3)]
+        computations[0][1].set_exception(RuntimeError("modèle indisponible"))
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+    
+    def test_cancelled_waiter_does_not_cancel_computation(self):
+        """Appelant abandonné : le calcul partagé sert encore les autres"""
+        coalescer, computations = self._coalescer()
+        abandoned = coalescer.submit("tweet")
+        waiting = coalescer.submit("tweet")
+        assert abandoned.cancel()
+        
+        computations[0][1].set_result({"text": "tweet", "raw_score": 0.2})
+        assert waiting.result()["raw_score"] == 0.2
@@ -0,0 +1,45 @@
+import pytest
+
+from services.threading_config import ThreadingConfig
+
+class TestThreadingConfig:
+    """Budget de threads : valeurs dérivées du budget CPU, dérogations et application unique à TensorFlow"""
+    
+    def test_defaults_from_cpu_budget(self, monkeypatch):
+        """Budget de 4 CPU : 2 workers d'inférence de 2 threads intra-op chacun"""
+        for name in ("INFERENCE_WORKERS", "TF_INTRA_OP_THREADS", "TF_INTER_OP_THREADS", "BLAS_THREADS", "CONFIG_LOADER_THREADS"):
+            monkeypatch.delenv(name, raising=False)
+        config = ThreadingConfig(cpu_limit=4)
+        
+        assert (config.inference_workers, config.intra_op_threads, config.inter_op_threads) == (2, 2, 1)
+        assert config.blas_threads == config.intra_op_threads
+        assert config.config_loader_threads == 1
+        report = config.get_report()
+        assert report["compute_threads"] == 4 and report["oversubscription"] == 1.0
+    
+    def test_environment_overrides(self, monkeypatch):
+        """Chaque pool peut être imposé par variable d'environnement"""
+        monkeypatch.setenv("CPU_LIMIT", "8")
+        monkeypatch.setenv("INFERENCE_WORKERS", "1")
+        monkeypatch.setenv("CONFIG_LOADER_THREADS", "2")
+        config = ThreadingConfig()
+        
+        assert config.cpus == 8
+        assert (config.inference_workers, config.intra_op_threads) == (1, 8)
+        # Deux chargements de configuration simultanés, le troisième attend
+        assert config.config_loader_slots.acquire(blocking=False)
+        assert config.config_loader_slots.acquire(blocking=False)
+        assert not config.config_loader_slots.acquire(blocking=False)
+    
+    def test_configure_tensorflow_once(self, monkeypatch):
+        """Une seule tentative par processus : les chargements suivants ne touchent plus aux pools"""
+        tf = pytest.importorskip("tensorflow")
+        config = ThreadingConfig(cpu_limit=2)
+        first = config.configure_tensorflow()
+        assert first in (True, False)
+        
+        def fail(_):
+            raise RuntimeError("Intra op parallelism cannot be modified after initialization.")
+        monkeypatch.setattr(tf.config.threading, "set_intra_op_parallelism_threads", fail)
+        assert config.configure_tensorflow() is first
+        assert config.get_report()["pools"]["tensorflow"]["applied"] is first
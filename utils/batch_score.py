@@ -0,0 +1,234 @@
+# Scoring hors ligne multi-cœurs : même chargement du modèle que l'API (DagsHubService), sans HTTP
+#
+# Usage (depuis la racine du projet) :
+#   python -m utils.batch_score tweets.csv -o tweets.scored.parquet
+#   cat tweets.txt | python -m utils.batch_score --artifacts-dir ./artifacts > scores.ndjson
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger("batch_score")
+
+# Service chargé dans chaque processus du pool (hérité par fork ou chargé par l'initialiseur)
+_service = None
+
+def _load_service():
+    """Charge le modèle comme l'API : export NumPy, artifacts locaux ou DagsHub"""
+    from services.dagshub_service import DagsHubService
+
+    service = DagsHubService()
+    if not service.load_model():
+        raise RuntimeError("Chargement du modèle échoué (le modèle fallback n'est pas utilisé hors ligne)")
+    service.wait_for_config()
+    return service
+
+def _init_worker():
+    global _service
+    _service = _load_service()
+
+def _worker_model_run_id():
+    return (_service.model_info or {}).get("run_id") or _service.model_run_id
+
+def _score_chunk(texts):
+    from services.file_scoring import score_texts
+    return score_texts(_service.predict_batch, texts)
+
+def _iter_text_chunks(stream, chunk_size: int, text_column: str, first_line: int = 1):
+    """Une ligne = un texte, regroupées en tables (numéro de ligne, texte)"""
+    import pyarrow as pa
+
+    lines, texts = [], []
+    for line_number, line in enumerate(stream, first_line):
+        lines.append(line_number)
+        texts.append(line.rstrip("\r\n"))
+        if len(texts) >= chunk_size:
+            yield pa.table({"line": lines, text_column: texts})
+            lines, texts = [], []
+    if texts:
+        yield pa.table({"line": lines, text_column: texts})
+
+def _iter_input_tables(inputs, chunk_size: int, text_column: str, input_format: str = None):
+    """Paquets de toutes les entrées, dans l'ordre (stdin si aucune entrée ou "-")"""
+    from services.file_scoring import detect_format, iter_input_chunks
+
+    for source in inputs or ["-"]:
+        if source == "-":
+            yield from _iter_text_chunks(sys.stdin, chunk_size, text_column)
+            continue
+
+        fmt = input_format or ("txt" if Path(source).suffix.lower() in ("", ".txt") else detect_format(source))
+        if fmt == "txt":
+            with open(source, encoding="utf-8") as f:
+                yield from _iter_text_chunks(f, chunk_size, text_column)
+            continue
+
+        for table in iter_input_chunks(source, fmt, chunk_size):
+            if text_column not in table.column_names:
+                raise ValueError(f"{source}: colonne '{text_column}' absente (colonnes: {', '.join(table.column_names)})")
+            yield table
+
+class _OutputWriter:
+    """Écriture des paquets évalués en NDJSON, CSV ou Parquet (fichier ou sortie standard)"""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        self._header = True
+        if fmt == "parquet" and not path:
+            raise ValueError("Sortie Parquet : indiquer un fichier (-o)")
+        self._stream = open(path, "w", encoding="utf-8", newline="") if path and fmt != "parquet" else sys.stdout
+
+    def write(self, table):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        elif self.fmt == "csv":
+            table.to_pandas().to_csv(self._stream, header=self._header, index=False)
+            self._header = False
+        else:
+            for row in table.to_pylist():
+                self._stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._stream is not sys.stdout:
+            self._stream.close()
+        else:
+            sys.stdout.flush()
+
+def _output_format(path: str, fmt: str = None) -> str:
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lower() if path else ""
+    return {".parquet": "parquet", ".pq": "parquet", ".csv": "csv"}.get(suffix, "ndjson")
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Scoring de sentiment hors ligne (stdin, TXT, CSV ou Parquet) sur un pool de processus")
+    p.add_argument("inputs", nargs="*", help="Fichiers d'entrée (.txt : un texte par ligne, .csv, .parquet) - stdin si absent ou '-'")
+    p.add_argument("-o", "--output", help="Fichier de sortie (.ndjson, .csv, .parquet) - sortie standard (NDJSON) si absent")
+    p.add_argument("--output-format", choices=["ndjson", "csv", "parquet"], help="Format de sortie (sinon déduit de l'extension)")
+    p.add_argument("--input-format", choices=["txt", "csv", "parquet"], help="Format des entrées (sinon déduit de l'extension)")
+    p.add_argument("--text-column", default=os.getenv("FILE_TEXT_COLUMN", "text"), help="Colonne des textes (CSV/Parquet)")
+    p.add_argument("--artifacts-dir", help="Répertoire local d'artifacts (model/..., model_config.json) au lieu de DagsHub")
+    p.add_argument("--workers", type=int, help="Processus de scoring (défaut : CPU disponibles, quota cgroup compris)")
+    p.add_argument("--chunk-size", type=int, default=int(os.getenv("FILE_CHUNK_SIZE", "8192")), help="Lignes par paquet")
+    p.add_argument("-v", "--verbose", action="store_true", help="Logs détaillés (stderr)")
+    return p.parse_args(argv)
+
+def main(argv=None) -> int:
+    global _service
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    # Un thread de calcul par processus : le parallélisme vient du pool (avant l'import de NumPy/TensorFlow)
+    if args.workers != 1:
+        for name in ("INFERENCE_WORKERS", "TF_INTRA_OP_THREADS", "TF_INTER_OP_THREADS", "BLAS_THREADS"):
+            os.environ.setdefault(name, "1")
+    if args.artifacts_dir:
+        os.environ["MODEL_ARTIFACTS_DIR"] = os.path.abspath(args.artifacts_dir)
+
+    from dotenv import load_dotenv
+    load_dotenv('/app/.env')
+    load_dotenv()
+
+    from services.threading_config import get_threading_config
+    from services.file_scoring import append_predictions
+
+    workers = max(1, args.workers or get_threading_config().cpus)
+    writer = _OutputWriter(args.output, _output_format(args.output, args.output_format))
+
+    start = time.perf_counter()
+    executor = None
+    temporary_export = None
+
+    if workers > 1 and os.getenv("INFERENCE_BACKEND", "compiled").lower() == "numpy":
+        # Fork : TensorFlow ne doit jamais être chargé dans ce processus (ses pools de threads ne survivent pas au fork).
+        # Le moteur est donc chargé depuis l'export NumPy, construit au besoin dans un processus séparé.
+        from services.dagshub_service import ensure_numpy_export
+
+        export_path = ensure_numpy_export(os.getenv("NUMPY_ENGINE_PATH"))
+        if export_path:
+            if not os.getenv("NUMPY_ENGINE_PATH"):
+                temporary_export = os.path.dirname(export_path)
+            os.environ["NUMPY_ENGINE_PATH"] = export_path
+            _service = _load_service()
+
+    if workers == 1:
+        mode = "inline"
+        _service = _load_service()
+        model_run_id = _worker_model_run_id()
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        if _service is not None and _service.inference_engine_name == "numpy" and "tensorflow" not in sys.modules:
+            # Moteur NumPy sans TensorFlow : modèle partagé en copy-on-write par les processus forkés
+            mode = "fork"
+            model_run_id = _worker_model_run_id()
+            gc.collect()
+            gc.freeze()
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            # Modèle TensorFlow : chaque processus le charge, le processus parent ne le charge pas
+            mode = "spawn"
+            logger.warning(f"[!] Modèle chargé dans chaque processus (INFERENCE_BACKEND=numpy et un modèle "
+                           f"convertible pour le partager)")
+            _service = None
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_init_worker)
+            model_run_id = executor.submit(_worker_model_run_id).result()
+    load_seconds = time.perf_counter() - start
+
+    rows = errors = chunks = 0
+
+    def write_chunk(table, predictions):
+        nonlocal rows, errors, chunks
+        writer.write(append_predictions(table, predictions, model_run_id))
+        rows += table.num_rows
+        errors += sum(1 for p in predictions if p["error"])
+        chunks += 1
+
+    try:
+        # Au plus 2 paquets en vol par processus : mémoire bornée, résultats écrits dans l'ordre d'entrée
+        pending = deque()
+        for table in _iter_input_tables(args.inputs, args.chunk_size, args.text_column, args.input_format):
+            texts = table.column(args.text_column).to_pylist()
+            if executor is None:
+                write_chunk(table, _score_chunk(texts))
+                continue
+
+            pending.append((table, executor.submit(_score_chunk, texts)))
+            while len(pending) >= 2 * workers:
+                table, future = pending.popleft()
+                write_chunk(table, future.result())
+
+        while pending:
+            table, future = pending.popleft()
+            write_chunk(table, future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        writer.close()
+        if temporary_export:
+            shutil.rmtree(temporary_export, ignore_errors=True)
+
+    seconds = time.perf_counter() - start - load_seconds
+    print(f"[✓] {rows} lignes évaluées en {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} lignes/s, "
+          f"{workers} processus {mode}, {chunks} paquets, {errors} erreurs) - modèle chargé en {load_seconds:.1f}s",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())